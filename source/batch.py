@@ -0,0 +1,220 @@
+from array import array
+from collections.abc import Mapping
+from datetime import date
+from itertools import islice
+from typing import NamedTuple
+from source import strumentazione
+from source.codice_fiscale import (codifica_cognome, codifica_nome, codifica_data_nascita, codifica_comune,
+                                   calcola_carattere_controllo, codice_errore_codice_fiscale, valida_sesso,
+                                   CODICE_FISCALE_VALIDO, MESSAGGI_ERRORE_CODICE_FISCALE, OPERAZIONE_GENERA,
+                                   _codice_errore_strumentato, _converti_data_nascita, _decodifica_codice_valido,
+                                   _genera_codice_fiscale_strumentato)
+from source.tabella_date import tabella_segmenti_data
+
+
+############
+# COSTANTI #
+############
+CAMPI_ANAGRAFICA = ("cognome", "nome", "sesso", "data_nascita", "comune")
+CAMPO_PROVINCIA = "provincia"  # Campo facoltativo, necessario solo per i comuni omonimi
+CAMPO_CODICE_FISCALE = "codice_fiscale"
+CAMPO_ANAGRAFICA = "anagrafica"  # Campo degli errori che riguardano l'intera riga (es. numero di valori errato)
+MESSAGGIO_ANAGRAFICA_NON_VALIDA = f"Anagrafica non valida: attesi i valori di {', '.join(CAMPI_ANAGRAFICA)}."
+# Fase della generazione strumentata -> campo dell'anagrafica che l'ha fatta fallire
+CAMPI_PER_FASE = {"codifica_data": "data_nascita"}
+DIMENSIONE_BLOCCO_DECODIFICA = 65536
+SESSO_NON_DISPONIBILE = ord("-")
+ERRORE_TIPO_NON_VALIDO = 0xFF  # Codice di errore per valori che non sono stringhe
+
+
+class ErroreCodiceFiscale(NamedTuple):
+    """Errore strutturato restituito dalle funzioni massive al posto di sollevare un'eccezione.
+
+    Attributes:
+        campo (str): Nome del campo che ha causato l'errore (es. 'cognome' o 'codice_fiscale').
+        messaggio (str): Messaggio di errore, identico a quello della corrispondente ValueError.
+    """
+    campo: str
+    messaggio: str
+
+
+####################
+# FUNZIONI MASSIVE #
+####################
+def genera_codici_fiscali(anagrafiche):
+    """Genera in modo lazy i codici fiscali per una sequenza di anagrafiche.
+
+    Ogni anagrafica può essere un dizionario con le chiavi di `CAMPI_ANAGRAFICA` oppure una
+    sequenza con i valori nello stesso ordine; la provincia (`CAMPO_PROVINCIA`) è facoltativa,
+    come chiave o come sesto valore, e serve a distinguere i comuni omonimi. Le anagrafiche non valide non interrompono
+    l'elaborazione: al loro posto viene restituito un `ErroreCodiceFiscale`. La data odierna
+    usata per validare le date di nascita è calcolata una sola volta e i segmenti della data
+    sono letti dalla tabella precalcolata (`tabella_segmenti_data`).
+
+    Args:
+        anagrafiche (Iterable[Mapping | Sequence]): Anagrafiche da codificare.
+
+    Yields:
+        str | ErroreCodiceFiscale: Codice fiscale generato oppure errore strutturato.
+    """
+    oggi = date.today()
+    segmenti_data = tabella_segmenti_data()
+    for anagrafica in anagrafiche:
+        yield _genera_codice_fiscale_o_errore(anagrafica, oggi, segmenti_data)
+
+
+def valida_codici_fiscali(codici_fiscali):
+    """Valida in modo lazy una sequenza di codici fiscali.
+
+    Args:
+        codici_fiscali (Iterable[str]): Codici fiscali da validare.
+
+    Yields:
+        str | ErroreCodiceFiscale: Codice fiscale in maiuscolo se valido, altrimenti errore strutturato.
+    """
+    for codice_fiscale in codici_fiscali:
+        yield _valida_codice_fiscale_o_errore(codice_fiscale)
+
+
+def decodifica_codici_fiscali(codici_fiscali, dimensione_blocco=DIMENSIONE_BLOCCO_DECODIFICA):
+    """Decodifica in streaming una sequenza di codici fiscali producendo blocchi in formato colonnare.
+
+    Ogni blocco è un dizionario di colonne della stessa lunghezza, con un elemento per codice:
+
+    - `codice_errore` (array 'B'): `CODICE_FISCALE_VALIDO`, una delle costanti `ERRORE_*` o
+      `ERRORE_TIPO_NON_VALIDO`;
+    - `anno` (array 'H'), `mese` (array 'B'), `giorno` (array 'B'): data di nascita, 0 se non valido;
+    - `sesso` (bytearray): b'M', b'F' o b'-' se non valido;
+    - `codice_catastale`, `luogo_nascita` (list[str | None]): luogo di nascita, None se non valido.
+
+    In questo modo un file di milioni di codici non richiede un oggetto per record. Il codice di
+    errore viene da `codice_errore_codice_fiscale`, senza sollevare eccezioni per i codici non
+    validi; solo i codici validi vengono decodificati. La data
+    odierna usata per dedurre il secolo è calcolata una sola volta e le date sono lette dalla
+    tabella precalcolata dei segmenti (`tabella_segmenti_data`).
+
+    Args:
+        codici_fiscali (Iterable[str]): Codici fiscali da decodificare, anche omocodici.
+        dimensione_blocco (int, optional): Numero massimo di codici per blocco.
+
+    Yields:
+        dict: Colonne dei dati decodificati per un blocco di codici.
+    """
+    oggi = date.today()
+    segmenti_data = tabella_segmenti_data()
+    iteratore = iter(codici_fiscali)
+    while blocco_codici := list(islice(iteratore, dimensione_blocco)):
+        colonne = {
+            "codice_errore": array("B"), "anno": array("H"), "mese": array("B"), "giorno": array("B"),
+            "sesso": bytearray(), "codice_catastale": [], "luogo_nascita": [],
+        }
+        for codice_fiscale in blocco_codici:
+            if not isinstance(codice_fiscale, str):
+                codice_errore = ERRORE_TIPO_NON_VALIDO
+            elif strumentazione.attiva:
+                codice_errore = _codice_errore_strumentato(codice_fiscale)
+            else:
+                codice_errore = codice_errore_codice_fiscale(codice_fiscale)
+            if codice_errore == CODICE_FISCALE_VALIDO:
+                codice_errore, decodificato = _decodifica_codice_valido(codice_fiscale, oggi, segmenti_data)
+
+            colonne["codice_errore"].append(codice_errore)
+            if codice_errore == CODICE_FISCALE_VALIDO:
+                data_nascita, sesso, codice_catastale, luogo_nascita = decodificato
+                colonne["anno"].append(data_nascita.year)
+                colonne["mese"].append(data_nascita.month)
+                colonne["giorno"].append(data_nascita.day)
+                colonne["sesso"].append(ord(sesso))
+                colonne["codice_catastale"].append(codice_catastale)
+                colonne["luogo_nascita"].append(luogo_nascita)
+            else:
+                colonne["anno"].append(0)
+                colonne["mese"].append(0)
+                colonne["giorno"].append(0)
+                colonne["sesso"].append(SESSO_NON_DISPONIBILE)
+                colonne["codice_catastale"].append(None)
+                colonne["luogo_nascita"].append(None)
+        yield colonne
+
+
+def _genera_codice_fiscale_o_errore(anagrafica, oggi, segmenti_data=None):
+    """Genera il codice fiscale di una singola anagrafica senza sollevare ValueError.
+
+    Args:
+        anagrafica (Mapping | Sequence): Anagrafica da codificare.
+        oggi (date): Data odierna per la validazione della data di nascita.
+        segmenti_data (TabellaSegmentiData, optional): Tabella precalcolata dei segmenti della data.
+
+    Returns:
+        str | ErroreCodiceFiscale: Codice fiscale generato oppure errore strutturato.
+    """
+    try:
+        if isinstance(anagrafica, Mapping):
+            cognome, nome, sesso, data_nascita, comune, provincia = (
+                anagrafica.get(campo) for campo in (*CAMPI_ANAGRAFICA, CAMPO_PROVINCIA))
+        else:
+            cognome, nome, sesso, data_nascita, comune, *provincia = anagrafica
+            provincia, = provincia or (None,)
+    except (ValueError, TypeError):
+        return ErroreCodiceFiscale(CAMPO_ANAGRAFICA, MESSAGGIO_ANAGRAFICA_NON_VALIDA)
+
+    if strumentazione.attiva:
+        cronometro = strumentazione.Cronometro(OPERAZIONE_GENERA)
+        try:
+            return _genera_codice_fiscale_strumentato(cognome, nome, sesso, data_nascita, comune, oggi, segmenti_data,
+                                                      cronometro, provincia)
+        except (ValueError, TypeError, AttributeError) as e:
+            campo = CAMPI_PER_FASE.get(cronometro.fase, cronometro.fase)
+            return ErroreCodiceFiscale(campo, _messaggio_errore(campo, e))
+
+    campo = "cognome"
+    try:
+        cod_cognome = codifica_cognome(cognome)
+        campo = "nome"
+        cod_nome = codifica_nome(nome)
+        campo = "sesso"
+        sesso = valida_sesso(sesso)
+        campo = "data_nascita"
+        data_nascita = _converti_data_nascita(data_nascita, oggi)
+        cod_data_nascita = codifica_data_nascita(data_nascita, sesso, oggi, segmenti_data)
+        campo = "comune"
+        cod_comune = codifica_comune(comune, data_nascita, provincia)
+    except (ValueError, TypeError, AttributeError) as e:
+        return ErroreCodiceFiscale(campo, _messaggio_errore(campo, e))
+
+    codifica_senza_carattere_controllo = "".join([cod_cognome, cod_nome, cod_data_nascita, cod_comune])
+    return "".join([codifica_senza_carattere_controllo,
+                    calcola_carattere_controllo(codifica_senza_carattere_controllo)])
+
+
+def _valida_codice_fiscale_o_errore(codice_fiscale):
+    """Valida un singolo codice fiscale tramite il codice di errore, senza eccezioni.
+
+    Args:
+        codice_fiscale (str): Codice fiscale da validare.
+
+    Returns:
+        str | ErroreCodiceFiscale: Codice fiscale in maiuscolo se valido, altrimenti errore strutturato.
+    """
+    if not isinstance(codice_fiscale, str):
+        return ErroreCodiceFiscale(CAMPO_CODICE_FISCALE, _messaggio_errore(CAMPO_CODICE_FISCALE, TypeError()))
+    codice_errore = (_codice_errore_strumentato(codice_fiscale) if strumentazione.attiva
+                     else codice_errore_codice_fiscale(codice_fiscale))
+    if codice_errore != CODICE_FISCALE_VALIDO:
+        return ErroreCodiceFiscale(CAMPO_CODICE_FISCALE, MESSAGGI_ERRORE_CODICE_FISCALE[codice_errore])
+    return codice_fiscale.upper()
+
+
+def _messaggio_errore(campo, errore):
+    """Restituisce il messaggio da associare a un errore, anche per valori mancanti o di tipo errato.
+
+    Args:
+        campo (str): Nome del campo che ha causato l'errore.
+        errore (Exception): Eccezione sollevata durante la codifica o la validazione.
+
+    Returns:
+        str: Messaggio dell'errore.
+    """
+    if isinstance(errore, ValueError):
+        return str(errore)
+    return f"Campo '{campo}' mancante o di tipo non valido."
@@ -0,0 +1,34 @@
+"""Confronta la rimozione degli accenti con e senza percorso rapido per ASCII e lettere accentate comuni.
+
+Esecuzione:
+    python -m source.benchmarks.bench_accenti [numero_stringhe]
+"""
+import sys
+import time
+from source.benchmarks.dati import genera_anagrafiche
+from source.utils import _rimuovi_accenti, _rimuovi_accenti_nfd
+
+
+def _misura(descrizione, funzione, stringhe, durata_riferimento=None):
+    inizio = time.perf_counter()
+    for stringa in stringhe:
+        funzione(stringa)
+    durata = time.perf_counter() - inizio
+    confronto = f"  {durata_riferimento / durata:.1f}x" if durata_riferimento else ""
+    print(f"{descrizione:<40} {len(stringhe) / durata:>14,.0f} stringhe/s{confronto}")
+    return durata
+
+
+def main(numero_stringhe=200_000):
+    anagrafiche = genera_anagrafiche(numero_stringhe // 2)
+    ascii_ = [valore for anagrafica in anagrafiche for valore in (anagrafica["cognome"], anagrafica["nome"])]
+    accentate = [stringa + "à" for stringa in ascii_]
+    esotiche = [stringa + "ḉ" for stringa in ascii_]
+    for descrizione, stringhe in (("ASCII", ascii_), ("lettere accentate", accentate), ("altri caratteri", esotiche)):
+        print(descrizione)
+        riferimento = _misura("  decomposizione NFD", _rimuovi_accenti_nfd, stringhe)
+        _misura("  _rimuovi_accenti", _rimuovi_accenti, stringhe, riferimento)
+
+
+if __name__ == "__main__":
+    main(*(int(argomento) for argomento in sys.argv[1:]))
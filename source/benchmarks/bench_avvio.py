@@ -0,0 +1,47 @@
+"""Confronta il caricamento delle tabelle dai CSV e dallo snapshot precompilato.
+
+Esecuzione:
+    python -m source.tabelle                 # compila lo snapshot
+    python -m source.benchmarks.bench_avvio [ripetizioni]
+"""
+import os
+import subprocess
+import sys
+import time
+from source.tabelle import DIRECTORY_DATI, _carica_da_csv, _carica_da_snapshot
+
+DIRECTORY_PROGETTO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _misura_caricamento(funzione, ripetizioni):
+    migliore = float("inf")
+    for _ in range(ripetizioni):
+        inizio = time.perf_counter()
+        funzione(DIRECTORY_DATI)
+        migliore = min(migliore, time.perf_counter() - inizio)
+    return migliore
+
+
+def _misura_import(ripetizioni, istruzione="pass"):
+    comando = [sys.executable, "-c", "import time; t = time.perf_counter(); import source.codice_fiscale as cf; "
+                                     f"{istruzione}; print(time.perf_counter() - t)"]
+    return min(float(subprocess.run(comando, cwd=DIRECTORY_PROGETTO, capture_output=True, text=True,
+                                    check=True).stdout) for _ in range(ripetizioni))
+
+
+def main(ripetizioni=20):
+    durata_csv = _misura_caricamento(_carica_da_csv, ripetizioni)
+    print(f"{'caricamento da CSV':<35} {durata_csv * 1000:>8.2f} ms")
+    if _carica_da_snapshot(DIRECTORY_DATI) is None:
+        print("Snapshot assente o non aggiornato: eseguire 'python -m source.tabelle'.")
+    else:
+        durata_snapshot = _misura_caricamento(_carica_da_snapshot, ripetizioni)
+        print(f"{'caricamento da snapshot':<35} {durata_snapshot * 1000:>8.2f} ms "
+              f"({durata_csv / durata_snapshot:.1f}x)")
+    print(f"{'import source.codice_fiscale':<35} {_misura_import(min(ripetizioni, 5)) * 1000:>8.2f} ms")
+    durata_prima_ricerca = _misura_import(min(ripetizioni, 5), "cf.valida_comune('ROMA')")
+    print(f"{'import + primo valida_comune':<35} {durata_prima_ricerca * 1000:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(argomento) for argomento in sys.argv[1:]))
@@ -0,0 +1,54 @@
+"""Confronta le funzioni massive con le chiamate singole.
+
+Esecuzione:
+    python -m source.benchmarks.bench_batch [numero_record]
+"""
+import sys
+import time
+from source.batch import genera_codici_fiscali, valida_codici_fiscali
+from source.benchmarks.dati import genera_anagrafiche, genera_codici_fiscali_sintetici
+from source.codice_fiscale import genera_codice_fiscale, is_valido_codice_fiscale
+
+
+def _genera_per_chiamata(anagrafiche):
+    risultati = []
+    for anagrafica in anagrafiche:
+        try:
+            risultati.append(genera_codice_fiscale(**anagrafica))
+        except ValueError as e:
+            risultati.append(e)
+    return risultati
+
+
+def _valida_per_chiamata(codici):
+    risultati = []
+    for codice in codici:
+        try:
+            risultati.append(is_valido_codice_fiscale(codice))
+        except ValueError as e:
+            risultati.append(e)
+    return risultati
+
+
+def _misura(descrizione, funzione, dati):
+    inizio = time.perf_counter()
+    funzione(dati)
+    durata = time.perf_counter() - inizio
+    print(f"{descrizione:<40} {len(dati) / durata:>12,.0f} record/s  ({durata:.3f} s)")
+
+
+def main(numero_record=100_000):
+    anagrafiche = genera_anagrafiche(numero_record, percentuale_errori=0.1)
+    codici = genera_codici_fiscali_sintetici(numero_record, percentuale_errori=0.1)
+
+    print(f"Generazione ({numero_record:,} anagrafiche, 10% non valide)")
+    _misura("genera_codice_fiscale per chiamata", _genera_per_chiamata, anagrafiche)
+    _misura("genera_codici_fiscali", lambda dati: list(genera_codici_fiscali(dati)), anagrafiche)
+
+    print(f"Validazione ({numero_record:,} codici, 10% alterati)")
+    _misura("is_valido_codice_fiscale per chiamata", _valida_per_chiamata, codici)
+    _misura("valida_codici_fiscali", lambda dati: list(valida_codici_fiscali(dati)), codici)
+
+
+if __name__ == "__main__":
+    main(*(int(argomento) for argomento in sys.argv[1:]))
@@ -0,0 +1,45 @@
+"""Misura l'effetto della cache sulle codifiche di cognome e nome con nomi a distribuzione di Zipf.
+
+Esecuzione:
+    python -m source.benchmarks.bench_cache [numero_anagrafiche]
+"""
+import sys
+import time
+from source.benchmarks.dati import genera_anagrafiche
+from source.cache import DIMENSIONE_CACHE_PREDEFINITA
+from source.codice_fiscale import (codifica_cognome, codifica_nome, configura_cache_codifiche,
+                                   statistiche_cache_codifiche, svuota_cache_codifiche)
+
+
+def _codifica_tutte(anagrafiche):
+    for anagrafica in anagrafiche:
+        codifica_cognome(anagrafica["cognome"])
+        codifica_nome(anagrafica["nome"])
+
+
+def _misura(descrizione, anagrafiche, dimensione_cache, durata_riferimento=None):
+    configura_cache_codifiche(dimensione_cache)
+    svuota_cache_codifiche()
+    inizio = time.perf_counter()
+    _codifica_tutte(anagrafiche)
+    durata = time.perf_counter() - inizio
+    confronto = f"  {durata_riferimento / durata:.1f}x" if durata_riferimento else ""
+    print(f"{descrizione:<30} {len(anagrafiche) / durata:>12,.0f} anagrafiche/s{confronto}")
+    return durata
+
+
+def main(numero_anagrafiche=200_000):
+    # Le stringhe sono copiate per ogni anagrafica, come avviene leggendo un file
+    anagrafiche = [{"cognome": anagrafica["cognome"].encode().decode(), "nome": anagrafica["nome"].encode().decode()}
+                   for anagrafica in genera_anagrafiche(numero_anagrafiche)]
+    riferimento = _misura("senza cache", anagrafiche, 0)
+    for dimensione_cache in (16, DIMENSIONE_CACHE_PREDEFINITA):
+        _misura(f"cache LRU ({dimensione_cache} voci)", anagrafiche, dimensione_cache, riferimento)
+        for campo, statistiche in statistiche_cache_codifiche().items():
+            print(f"  {campo:<8} hit rate {statistiche['hit_rate']:.1%}, miss {statistiche['miss']:,}, "
+                  f"evizioni {statistiche['evizioni']:,}")
+    configura_cache_codifiche(DIMENSIONE_CACHE_PREDEFINITA)
+
+
+if __name__ == "__main__":
+    main(*(int(argomento) for argomento in sys.argv[1:]))
@@ -0,0 +1,39 @@
+"""Confronta le implementazioni del calcolo del carattere di controllo.
+
+Esecuzione:
+    python -m source.benchmarks.bench_carattere_controllo [numero_codici]
+"""
+import sys
+import time
+from source.benchmarks.dati import genera_codici_fiscali_sintetici
+from source.codice_fiscale import _calcola_carattere_controllo_riferimento, calcola_carattere_controllo
+from source.vettoriale import calcola_caratteri_controllo, np
+
+
+def _misura(descrizione, funzione, numero_codici, durata_riferimento=None):
+    inizio = time.perf_counter()
+    funzione()
+    durata = time.perf_counter() - inizio
+    confronto = f"  {durata_riferimento / durata:.1f}x" if durata_riferimento else ""
+    print(f"{descrizione:<45} {numero_codici / durata:>14,.0f} codici/s{confronto}")
+    return durata
+
+
+def main(numero_codici=200_000):
+    prefissi = [codice[:15] for codice in genera_codici_fiscali_sintetici(numero_codici)]
+    riferimento = _misura("riferimento (dizionario per carattere)",
+                          lambda: [_calcola_carattere_controllo_riferimento(p) for p in prefissi], numero_codici)
+    _misura("calcola_carattere_controllo (bytes.translate)",
+            lambda: [calcola_carattere_controllo(p) for p in prefissi], numero_codici, riferimento)
+    _misura("calcola_caratteri_controllo (lista di str)",
+            lambda: calcola_caratteri_controllo(prefissi), numero_codici, riferimento)
+    if np is not None:
+        array = np.array(prefissi, dtype="S15")
+        _misura("calcola_caratteri_controllo (array 'S15')",
+                lambda: calcola_caratteri_controllo(array), numero_codici, riferimento)
+    else:
+        print("numpy non disponibile: variante vettoriale non misurata.")
+
+
+if __name__ == "__main__":
+    main(*(int(argomento) for argomento in sys.argv[1:]))
@@ -0,0 +1,69 @@
+"""Confronta la generazione massiva con la generazione deduplicata su dati con anagrafiche ripetute.
+
+I duplicati sono misurati in due forme: copie identiche (riconosciute prima della validazione) e
+varianti di formato della stessa anagrafica (spazi nel cognome, data AAAA-MM-GG), che richiedono la
+canonicalizzazione completa e fanno risparmiare solo le fasi di codifica.
+
+Esecuzione:
+    python -m source.benchmarks.bench_deduplicazione [numero_record] [anagrafiche_distinte]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from source.batch import genera_codici_fiscali
+from source.benchmarks.dati import genera_anagrafiche
+from source.codice_fiscale import svuota_cache_codifiche
+from source.deduplicazione import CacheCodiciFiscaliSqlite, GeneratoreDeduplicato
+
+
+def _misura(descrizione, funzione, anagrafiche, durata_riferimento=None):
+    svuota_cache_codifiche()
+    inizio = time.perf_counter()
+    funzione(anagrafiche)
+    durata = time.perf_counter() - inizio
+    confronto = f"  {durata_riferimento / durata:.1f}x" if durata_riferimento else ""
+    print(f"{descrizione:<40} {len(anagrafiche) / durata:>14,.0f} record/s{confronto}")
+    return durata
+
+
+def _genera_deduplicato(anagrafiche, cache=None):
+    generatore = GeneratoreDeduplicato(cache)
+    for _ in generatore.genera(anagrafiche):
+        pass
+    return generatore.statistiche()
+
+
+def _variante(anagrafica, casuale):
+    """Restituisce la stessa anagrafica con uno spazio in coda al cognome o la data in formato AAAA-MM-GG."""
+    variante = dict(anagrafica)
+    if casuale.random() < 0.5:
+        variante["cognome"] += " "
+    else:
+        giorno, mese, anno = variante["data_nascita"].split("/")
+        variante["data_nascita"] = f"{anno}-{mese}-{giorno}"
+    return variante
+
+
+def main(numero_record=200_000, anagrafiche_distinte=20_000):
+    distinte = genera_anagrafiche(anagrafiche_distinte, seme=0)
+    casuale = random.Random(0)
+    anagrafiche = [casuale.choice(distinte) for _ in range(numero_record)]
+    print(f"{numero_record:,} record, {anagrafiche_distinte:,} anagrafiche distinte")
+    riferimento = _misura("genera_codici_fiscali", lambda dati: list(genera_codici_fiscali(dati)), anagrafiche)
+    _misura("deduplicata, copie identiche", _genera_deduplicato, anagrafiche, riferimento)
+    varianti = [_variante(anagrafica, casuale) for anagrafica in anagrafiche]
+    riferimento_varianti = _misura("genera_codici_fiscali, varianti", lambda dati: list(genera_codici_fiscali(dati)),
+                                   varianti)
+    _misura("deduplicata, varianti di formato", _genera_deduplicato, varianti, riferimento_varianti)
+
+    with tempfile.TemporaryDirectory() as directory:
+        percorso = os.path.join(directory, "cache.sqlite")
+        for descrizione in ("copie identiche, cache su disco vuota", "copie identiche, cache su disco piena"):
+            with CacheCodiciFiscaliSqlite(percorso) as cache:
+                _misura(descrizione, lambda dati: _genera_deduplicato(dati, cache), anagrafiche, riferimento)
+
+
+if __name__ == "__main__":
+    main(*(int(argomento) for argomento in sys.argv[1:]))
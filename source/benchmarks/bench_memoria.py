@@ -0,0 +1,38 @@
+"""Misura la memoria per record delle rappresentazioni di anagrafiche e codici fiscali.
+
+Esecuzione:
+    python -m source.benchmarks.bench_memoria [numero_record]
+"""
+import sys
+import tracemalloc
+from source.benchmarks.dati import genera_anagrafiche
+from source.codice_fiscale import genera_codice_fiscale
+from source.record import Anagrafica, CodiciFiscali
+
+
+def _byte_per_record(descrizione, costruisci, numero_record):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    prima = tracemalloc.get_traced_memory()[0]
+    oggetto = costruisci()
+    dopo = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{descrizione:<50} {(dopo - prima) / numero_record:>8.1f} byte/record")
+    return oggetto
+
+
+def main(numero_record=100_000):
+    sorgente = genera_anagrafiche(numero_record)
+    codici = [genera_codice_fiscale(**anagrafica) for anagrafica in sorgente]
+    print(f"Anagrafiche ({numero_record:,}, esclusi i valori stringa condivisi)")
+    _byte_per_record("list[dict] (acquisisci_dati_anagrafici)", lambda: [dict(a) for a in sorgente], numero_record)
+    _byte_per_record("list[Anagrafica] (NamedTuple)", lambda: [Anagrafica(**a) for a in sorgente], numero_record)
+
+    print(f"Codici fiscali ({numero_record:,})")
+    # Ogni codice è una nuova stringa, come avviene leggendo un file
+    _byte_per_record("list[str]", lambda: [codice.encode().decode() for codice in codici], numero_record)
+    _byte_per_record("CodiciFiscali (slot da 16 byte)", lambda: CodiciFiscali(codici), numero_record)
+
+
+if __name__ == "__main__":
+    main(*(int(argomento) for argomento in sys.argv[1:]))
@@ -0,0 +1,42 @@
+"""Misura la scalabilità del motore parallelo al variare del numero di processi.
+
+Esecuzione:
+    python -m source.benchmarks.bench_parallelo [numero_record] [dimensione_chunk]
+"""
+import os
+import sys
+import time
+from source.benchmarks.dati import genera_anagrafiche, genera_codici_fiscali_sintetici
+from source.parallelo import genera_codici_fiscali_in_parallelo, valida_codici_fiscali_in_parallelo
+
+
+def _numeri_di_workers():
+    cpu = os.cpu_count() or 1
+    return sorted({1, 2, 4, 8, cpu})
+
+
+def _misura(funzione, dati, workers, dimensione_chunk):
+    inizio = time.perf_counter()
+    for _ in funzione(dati, workers=workers, dimensione_chunk=dimensione_chunk):
+        pass
+    return time.perf_counter() - inizio
+
+
+def main(numero_record=200_000, dimensione_chunk=2000):
+    anagrafiche = genera_anagrafiche(numero_record, percentuale_errori=0.05)
+    codici = genera_codici_fiscali_sintetici(numero_record, percentuale_errori=0.05)
+    print(f"{numero_record:,} record, chunk da {dimensione_chunk}, {os.cpu_count()} CPU")
+    print(f"{'workers':>8} {'generazione rec/s':>20} {'speedup':>8} {'validazione rec/s':>20} {'speedup':>8}")
+
+    base_generazione = base_validazione = None
+    for workers in _numeri_di_workers():
+        durata_generazione = _misura(genera_codici_fiscali_in_parallelo, anagrafiche, workers, dimensione_chunk)
+        durata_validazione = _misura(valida_codici_fiscali_in_parallelo, codici, workers, dimensione_chunk)
+        base_generazione = base_generazione or durata_generazione
+        base_validazione = base_validazione or durata_validazione
+        print(f"{workers:>8} {numero_record / durata_generazione:>20,.0f} {base_generazione / durata_generazione:>8.2f}"
+              f" {numero_record / durata_validazione:>20,.0f} {base_validazione / durata_validazione:>8.2f}")
+
+
+if __name__ == "__main__":
+    main(*(int(argomento) for argomento in sys.argv[1:]))
@@ -0,0 +1,41 @@
+"""Misura i tempi dei suggerimenti di comuni e stati mentre si digita, rispetto a una scansione lineare.
+
+Esecuzione:
+    python -m source.benchmarks.bench_ricerca_comuni
+"""
+import difflib
+import statistics
+import time
+from source.ricerca_comuni import indice_comuni
+from source.tabelle import tabella_codici_catastali
+
+TESTI = ["reggio emilia", "regio emilia", "san giovani rotondo", "sant elena", "cantù", "l aquila", "frncia",
+         "castelnuovo", "monte san", "germania"]
+
+
+def _misura(descrizione, funzione, interrogazioni):
+    durate = []
+    for testo in interrogazioni:
+        inizio = time.perf_counter()
+        funzione(testo)
+        durate.append(time.perf_counter() - inizio)
+    durate.sort()
+    print(f"{descrizione:<40} mediana {statistics.median(durate) * 1e3:7.3f} ms   "
+          f"massimo {durate[-1] * 1e3:7.3f} ms")
+
+
+def main():
+    inizio = time.perf_counter()
+    indice = indice_comuni()
+    print(f"Costruzione dell'indice ({len(indice.denominazioni):,} denominazioni): "
+          f"{(time.perf_counter() - inizio) * 1e3:.1f} ms")
+    # Ogni testo è digitato un carattere alla volta, come nel campo della GUI
+    interrogazioni = [testo[:fine] for testo in TESTI for fine in range(1, len(testo) + 1)]
+    _misura("IndiceComuni.suggerisci", indice.suggerisci, interrogazioni)
+    denominazioni = list(tabella_codici_catastali().comuni_e_stati)
+    _misura("scansione lineare (difflib)",
+            lambda testo: difflib.get_close_matches(testo.upper(), denominazioni, n=10), interrogazioni[::10])
+
+
+if __name__ == "__main__":
+    main()
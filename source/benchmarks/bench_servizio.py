@@ -0,0 +1,54 @@
+"""Genera carico locale sul servizio HTTP e misura latenza (p50/p99) e richieste al secondo.
+
+Il servizio viene avviato nello stesso processo su una porta libera; ogni client mantiene una
+connessione persistente e invia richieste in sequenza.
+
+Esecuzione:
+    python -m source.benchmarks.bench_servizio [numero_richieste] [client_concorrenti]
+"""
+import asyncio
+import json
+import sys
+import time
+from source.benchmarks.dati import genera_anagrafiche
+from source.servizio import FINESTRA_RAGGRUPPAMENTO, ServizioCodiceFiscale
+
+
+async def _client(porta, corpi, latenze):
+    reader, writer = await asyncio.open_connection("127.0.0.1", porta)
+    for corpo in corpi:
+        inizio = time.perf_counter()
+        writer.write(f"POST /genera HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(corpo)}\r\n\r\n".encode() + corpo)
+        testa = await reader.readuntil(b"\r\n\r\n")
+        lunghezza = int(testa.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+        await reader.readexactly(lunghezza)
+        latenze.append(time.perf_counter() - inizio)
+    writer.close()
+
+
+async def _misura(descrizione, anagrafiche, numero_client, **opzioni):
+    servizio = ServizioCodiceFiscale(porta=0, **opzioni)
+    await servizio.avvia()
+    corpi = [json.dumps(anagrafica).encode() for anagrafica in anagrafiche]
+    latenze = []
+    inizio = time.perf_counter()
+    await asyncio.gather(*(_client(servizio.porta, corpi[i::numero_client], latenze) for i in range(numero_client)))
+    durata = time.perf_counter() - inizio
+    salute = servizio.salute()
+    await servizio.chiudi()
+    latenze.sort()
+    print(f"{descrizione:<32} {len(latenze) / durata:>9,.0f} richieste/s   "
+          f"p50 {latenze[len(latenze) // 2] * 1e3:6.2f} ms   p99 {latenze[int(len(latenze) * 0.99)] * 1e3:6.2f} ms   "
+          f"lotto medio {salute['dimensione_media_lotto']}")
+
+
+def main(numero_richieste=20_000, numero_client=64):
+    anagrafiche = genera_anagrafiche(numero_richieste)
+    print(f"POST /genera: {numero_richieste:,} richieste da {numero_client} client concorrenti")
+    asyncio.run(_misura("senza raggruppamento", anagrafiche, numero_client, dimensione_lotto=1))
+    for finestra in (0, FINESTRA_RAGGRUPPAMENTO):
+        asyncio.run(_misura(f"lotti, finestra {finestra * 1e3:g} ms", anagrafiche, numero_client, finestra=finestra))
+
+
+if __name__ == "__main__":
+    main(*(int(argomento) for argomento in sys.argv[1:]))
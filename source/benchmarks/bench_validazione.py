@@ -0,0 +1,44 @@
+"""Confronta la validazione in un solo passaggio con la validazione a più passaggi precedente.
+
+Esecuzione:
+    python -m source.benchmarks.bench_validazione [numero_codici]
+"""
+import sys
+import time
+from source.batch import valida_codici_fiscali
+from source.benchmarks.dati import genera_codici_fiscali_sintetici
+from source.codice_fiscale import (_codice_errore_codice_fiscale_riferimento, codice_errore_codice_fiscale,
+                                   is_valido_codice_fiscale)
+
+
+def _valida_sollevando(codici):
+    for codice in codici:
+        try:
+            is_valido_codice_fiscale(codice)
+        except ValueError:
+            pass
+
+
+def _misura(descrizione, funzione, codici, durata_riferimento=None):
+    inizio = time.perf_counter()
+    funzione(codici)
+    durata = time.perf_counter() - inizio
+    confronto = f"  {durata_riferimento / durata:.1f}x" if durata_riferimento else ""
+    print(f"{descrizione:<45} {len(codici) / durata:>14,.0f} codici/s{confronto}")
+    return durata
+
+
+def main(numero_codici=200_000):
+    for percentuale_errori in (0.0, 0.5):
+        codici = genera_codici_fiscali_sintetici(numero_codici, percentuale_errori=percentuale_errori)
+        print(f"{numero_codici:,} codici, {percentuale_errori:.0%} alterati")
+        riferimento = _misura("riferimento (più passaggi)",
+                              lambda dati: [_codice_errore_codice_fiscale_riferimento(c) for c in dati], codici)
+        _misura("codice_errore_codice_fiscale", lambda dati: [codice_errore_codice_fiscale(c) for c in dati],
+                codici, riferimento)
+        _misura("is_valido_codice_fiscale (con eccezioni)", _valida_sollevando, codici, riferimento)
+        _misura("valida_codici_fiscali", lambda dati: list(valida_codici_fiscali(dati)), codici, riferimento)
+
+
+if __name__ == "__main__":
+    main(*(int(argomento) for argomento in sys.argv[1:]))
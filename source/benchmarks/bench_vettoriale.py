@@ -0,0 +1,43 @@
+"""Confronta la validazione vettoriale con is_valido_codice_fiscale applicata per elemento.
+
+Esecuzione:
+    python -m source.benchmarks.bench_vettoriale [numero_codici]
+"""
+import sys
+import time
+from source.benchmarks.dati import genera_codici_fiscali_sintetici
+from source.codice_fiscale import is_valido_codice_fiscale
+from source.vettoriale import np, valida_codici_fiscali_array
+
+
+def _valida_per_elemento(codici):
+    maschera = []
+    for codice in codici:
+        try:
+            maschera.append(is_valido_codice_fiscale(codice))
+        except ValueError:
+            maschera.append(False)
+    return maschera
+
+
+def main(numero_codici=200_000):
+    if np is None:
+        print("numpy non disponibile.")
+        return
+    codici = genera_codici_fiscali_sintetici(numero_codici, percentuale_errori=0.1)
+    array = np.array(codici, dtype="S16")
+
+    inizio = time.perf_counter()
+    _valida_per_elemento(codici)
+    durata_scalare = time.perf_counter() - inizio
+    print(f"{'is_valido_codice_fiscale per elemento':<40} {numero_codici / durata_scalare:>14,.0f} codici/s")
+
+    inizio = time.perf_counter()
+    valida_codici_fiscali_array(array)
+    durata_vettoriale = time.perf_counter() - inizio
+    print(f"{'valida_codici_fiscali_array (S16)':<40} {numero_codici / durata_vettoriale:>14,.0f} codici/s"
+          f"  {durata_scalare / durata_vettoriale:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(argomento) for argomento in sys.argv[1:]))
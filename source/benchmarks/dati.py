@@ -0,0 +1,103 @@
+import random
+from source.codice_fiscale import CODICE_CATASTALE_NON_DISPONIBILE, COMUNI_E_STATI_COD_CATASTALI, \
+    genera_codice_fiscale
+from source.storico_comuni import indice_storico_comuni
+
+
+############
+# COSTANTI #
+############
+COGNOMI = [
+    "ROSSI", "RUSSO", "FERRARI", "ESPOSITO", "BIANCHI", "ROMANO", "COLOMBO", "RICCI", "MARINO", "GRECO",
+    "BRUNO", "GALLO", "CONTI", "DE LUCA", "MANCINI", "COSTA", "GIORDANO", "RIZZO", "LOMBARDI", "MORETTI",
+    "BARBIERI", "FONTANA", "SANTORO", "MARIANI", "RINALDI", "CARUSO", "FERRARA", "GALLI", "MARTINI", "LEONE",
+    "LONGO", "GENTILE", "MARTINELLI", "VITALE", "LOMBARDO", "SERRA", "COPPOLA", "DE SANTIS", "D'ANGELO",
+    "MARCHETTI", "PARISI", "VILLA", "CONTE", "FERRARO", "FERRI", "FABBRI", "BIANCO", "MARINI", "GRASSO",
+    "VALENTINI", "MESSINA", "SALA", "DE ANGELIS", "GATTI", "PELLEGRINI", "PALUMBO", "SANNA", "FARINA",
+    "NICCOLÒ", "CATTANEO", "MORELLI", "AMATO", "SILVESTRI", "MAZZA", "TESTA", "GRASSI", "PELLEGRINO",
+]
+NOMI = [
+    ("MARIO", "M"), ("GIUSEPPE", "M"), ("LUCA", "M"), ("FRANCESCO", "M"), ("ANTONIO", "M"), ("ALESSANDRO", "M"),
+    ("ANDREA", "M"), ("MARCO", "M"), ("GIOVANNI", "M"), ("ROBERTO", "M"), ("STEFANO", "M"), ("PAOLO", "M"),
+    ("LORENZO", "M"), ("MATTIA", "M"), ("NICOLÒ", "M"), ("GIAN-LUCA", "M"), ("DAVIDE", "M"), ("SIMONE", "M"),
+    ("MARIA", "F"), ("ANNA", "F"), ("GIULIA", "F"), ("FRANCESCA", "F"), ("SARA", "F"), ("LAURA", "F"),
+    ("CHIARA", "F"), ("ELENA", "F"), ("PAOLA", "F"), ("SOFIA", "F"), ("AURORA", "F"), ("ALESSIA", "F"),
+    ("MARTINA", "F"), ("FEDERICA", "F"), ("SILVIA", "F"), ("ANNA MARIA", "F"), ("NOEMI", "F"), ("ILARIA", "F"),
+]
+
+
+##############################
+# GENERAZIONE DATI SINTETICI #
+##############################
+def genera_anagrafiche(numero, seme=0, percentuale_errori=0.0):
+    """Genera in modo deterministico anagrafiche sintetiche a partire dalle tabelle reali.
+
+    I comuni e gli stati sono estratti da `COMUNI_E_STATI_COD_CATASTALI`, esclusi i comuni omonimi
+    che richiederebbero la provincia, i nomi e i cognomi seguono una distribuzione di Zipf su elenchi
+    di nomi italiani comuni.
+
+    Args:
+        numero (int): Numero di anagrafiche da generare.
+        seme (int, optional): Seme del generatore casuale. Default a 0.
+        percentuale_errori (float, optional): Frazione di anagrafiche con un campo non valido. Default a 0.0.
+
+    Returns:
+        list[dict]: Anagrafiche nel formato accettato da `genera_codice_fiscale`.
+    """
+    generatore = random.Random(seme)
+    omonimi = indice_storico_comuni().collisioni()
+    comuni = sorted(denominazione for denominazione, codice in COMUNI_E_STATI_COD_CATASTALI.items()
+                    if codice != CODICE_CATASTALE_NON_DISPONIBILE and denominazione not in omonimi)
+    pesi_cognomi = _pesi_zipf(len(COGNOMI))
+    pesi_nomi = _pesi_zipf(len(NOMI))
+
+    anagrafiche = []
+    for _ in range(numero):
+        nome, sesso = generatore.choices(NOMI, pesi_nomi)[0]
+        anagrafica = {
+            "cognome": generatore.choices(COGNOMI, pesi_cognomi)[0],
+            "nome": nome,
+            "sesso": sesso,
+            "data_nascita": f"{generatore.randint(1, 28):02d}/{generatore.randint(1, 12):02d}/"
+                            f"{generatore.randint(1900, 2020)}",
+            "comune": generatore.choice(comuni),
+        }
+        if generatore.random() < percentuale_errori:
+            anagrafica[generatore.choice(["cognome", "data_nascita", "comune"])] = "#"
+        anagrafiche.append(anagrafica)
+    return anagrafiche
+
+
+def genera_codici_fiscali_sintetici(numero, seme=0, percentuale_errori=0.0):
+    """Genera in modo deterministico codici fiscali sintetici, validi o alterati.
+
+    Args:
+        numero (int): Numero di codici da generare.
+        seme (int, optional): Seme del generatore casuale. Default a 0.
+        percentuale_errori (float, optional): Frazione di codici con un carattere alterato. Default a 0.0.
+
+    Returns:
+        list[str]: Codici fiscali di 16 caratteri.
+    """
+    generatore = random.Random(seme)
+    codici = []
+    for anagrafica in genera_anagrafiche(numero, seme):
+        codice = genera_codice_fiscale(**anagrafica)
+        if generatore.random() < percentuale_errori:
+            posizione = generatore.randrange(16)
+            codice = codice[:posizione] + generatore.choice("0123456789ABCXYZ") + codice[posizione + 1:]
+        codici.append(codice)
+    return codici
+
+
+def _pesi_zipf(numero, esponente=1.0):
+    """Restituisce i pesi di una distribuzione di Zipf sui primi `numero` ranghi.
+
+    Args:
+        numero (int): Numero di ranghi.
+        esponente (float, optional): Esponente della distribuzione. Default a 1.0.
+
+    Returns:
+        list[float]: Pesi non normalizzati, dal rango 1 al rango `numero`.
+    """
+    return [1 / rango ** esponente for rango in range(1, numero + 1)]
@@ -0,0 +1,256 @@
+"""Suite di benchmark dei percorsi critici con risultati in JSON e confronto tra esecuzioni.
+
+Esecuzione:
+    python -m source.benchmarks.suite esegui [--dataset 10k|1m] [--ripetizioni N] [--output risultati.json]
+    python -m source.benchmarks.suite confronta base.json nuovi.json [--soglia 0.10]
+
+Il confronto termina con codice di uscita 1 se almeno un benchmark è più lento della base oltre la soglia.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from source.benchmarks.bench_avvio import _misura_import
+from source.benchmarks.dati import genera_anagrafiche
+from source.codice_fiscale import (calcola_carattere_controllo, codifica_comune, genera_codice_fiscale,
+                                   is_valido_codice_fiscale, svuota_cache_codifiche)
+from source.tabelle import DIRECTORY_DATI, _carica_da_csv
+from source.utils import _estrai_caratteri, _formatta_stringa
+
+
+############
+# COSTANTI #
+############
+DIMENSIONI_DATASET = {"10k": 10_000, "1m": 1_000_000}
+RIPETIZIONI_PREDEFINITE = 5
+SOGLIA_REGRESSIONE_PREDEFINITA = 0.10
+SEME_DATASET = 0
+VERSIONE_FORMATO = 1
+
+
+###########
+# DATASET #
+###########
+def prepara_dataset(numero_record, seme=SEME_DATASET):
+    """Prepara in modo deterministico gli input di tutti i benchmark dalle tabelle reali.
+
+    Args:
+        numero_record (int): Numero di anagrafiche sintetiche.
+        seme (int, optional): Seme del generatore casuale.
+
+    Returns:
+        dict[str, list]: Anagrafiche, codici fiscali, prefissi di 15 caratteri, stringhe e comuni.
+    """
+    anagrafiche = genera_anagrafiche(numero_record, seme)
+    codici = [genera_codice_fiscale(**anagrafica) for anagrafica in anagrafiche]
+    return {
+        "anagrafiche": anagrafiche,
+        "codici": codici,
+        "prefissi": [codice[:15] for codice in codici],
+        "stringhe": [anagrafica[campo] for anagrafica in anagrafiche for campo in ("cognome", "nome")],
+        "comuni": [anagrafica["comune"] for anagrafica in anagrafiche],
+    }
+
+
+#############
+# BENCHMARK #
+#############
+def _genera(dataset):
+    svuota_cache_codifiche()  # ogni ripetizione parte dalla cache vuota
+    for anagrafica in dataset["anagrafiche"]:
+        genera_codice_fiscale(**anagrafica)
+
+
+def _valida(dataset):
+    for codice in dataset["codici"]:
+        is_valido_codice_fiscale(codice)
+
+
+def _carattere_controllo(dataset):
+    for prefisso in dataset["prefissi"]:
+        calcola_carattere_controllo(prefisso)
+
+
+def _formatta(dataset):
+    for stringa in dataset["stringhe"]:
+        _formatta_stringa(stringa)
+
+
+def _estrai(dataset):
+    for stringa in dataset["stringhe"]:
+        _estrai_caratteri(_formatta_stringa(stringa))
+
+
+def _cerca_comune(dataset):
+    for comune in dataset["comuni"]:
+        codifica_comune(comune)
+
+
+# nome -> (funzione, chiave del dataset che determina il numero di operazioni)
+BENCHMARK = {
+    "genera_codice_fiscale": (_genera, "anagrafiche"),
+    "is_valido_codice_fiscale": (_valida, "codici"),
+    "calcola_carattere_controllo": (_carattere_controllo, "prefissi"),
+    "formatta_stringa": (_formatta, "stringhe"),
+    "estrai_caratteri": (_estrai, "stringhe"),
+    "codifica_comune": (_cerca_comune, "comuni"),
+}
+
+
+def esegui_suite(numero_record, ripetizioni=RIPETIZIONI_PREDEFINITE, nomi=None, includi_avvio=True):
+    """Esegue i benchmark e restituisce i risultati in un dizionario serializzabile in JSON.
+
+    Per ogni benchmark sono riportati il numero di operazioni per ripetizione, la durata migliore
+    e mediana (secondi) e le operazioni al secondo calcolate sulla durata migliore.
+
+    Args:
+        numero_record (int): Numero di record del dataset sintetico.
+        ripetizioni (int, optional): Ripetizioni di ogni benchmark.
+        nomi (Iterable[str], optional): Benchmark da eseguire; default tutti quelli di `BENCHMARK`.
+        includi_avvio (bool, optional): Misura anche l'import del modulo (in un processo separato)
+            e il caricamento delle tabelle dai CSV.
+
+    Returns:
+        dict: Metadati dell'esecuzione e risultati per nome di benchmark.
+    """
+    dataset = prepara_dataset(numero_record)
+    risultati = {}
+    if includi_avvio:
+        risultati["import_codice_fiscale"] = _risultato(1, [_misura_import(1) for _ in range(ripetizioni)])
+        risultati["caricamento_tabelle_csv"] = _risultato(1, _misura_durate(
+            lambda: _carica_da_csv(DIRECTORY_DATI), ripetizioni))
+    for nome in nomi or BENCHMARK:
+        funzione, chiave = BENCHMARK[nome]
+        risultati[nome] = _risultato(len(dataset[chiave]), _misura_durate(lambda: funzione(dataset), ripetizioni))
+    return {
+        "versione_formato": VERSIONE_FORMATO,
+        "metadati": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementazione": platform.python_implementation(),
+            "piattaforma": platform.platform(),
+            "numero_record": numero_record,
+            "ripetizioni": ripetizioni,
+            "seme": SEME_DATASET,
+        },
+        "risultati": risultati,
+    }
+
+
+def _misura_durate(funzione, ripetizioni):
+    durate = []
+    for _ in range(ripetizioni):
+        inizio = time.perf_counter()
+        funzione()
+        durate.append(time.perf_counter() - inizio)
+    return durate
+
+
+def _risultato(operazioni, durate):
+    migliore = min(durate)
+    return {
+        "operazioni": operazioni,
+        "durata_migliore": migliore,
+        "durata_mediana": statistics.median(durate),
+        "operazioni_al_secondo": operazioni / migliore if migliore else None,
+    }
+
+
+#############
+# CONFRONTO #
+#############
+def confronta_risultati(base, nuovi, soglia=SOGLIA_REGRESSIONE_PREDEFINITA):
+    """Confronta due esecuzioni della suite sul tempo per operazione della durata migliore.
+
+    Args:
+        base (dict): Risultati di riferimento (output di `esegui_suite`).
+        nuovi (dict): Risultati da valutare.
+        soglia (float, optional): Rallentamento relativo oltre il quale un benchmark è una regressione.
+
+    Returns:
+        list[dict]: Per ogni benchmark comune: nome, tempi per operazione, rapporto nuovo/base e
+        se si tratta di una regressione; i benchmark presenti in una sola esecuzione sono ignorati.
+    """
+    confronti = []
+    for nome, risultato_base in base["risultati"].items():
+        risultato_nuovo = nuovi["risultati"].get(nome)
+        if risultato_nuovo is None:
+            continue
+        tempo_base = risultato_base["durata_migliore"] / risultato_base["operazioni"]
+        tempo_nuovo = risultato_nuovo["durata_migliore"] / risultato_nuovo["operazioni"]
+        rapporto = tempo_nuovo / tempo_base if tempo_base else float("inf")
+        confronti.append({"nome": nome, "tempo_base": tempo_base, "tempo_nuovo": tempo_nuovo,
+                          "rapporto": rapporto, "regressione": rapporto > 1 + soglia})
+    return confronti
+
+
+##########
+# OUTPUT #
+##########
+def _stampa_risultati(risultati):
+    for nome, risultato in risultati["risultati"].items():
+        tempo = risultato["durata_migliore"] / risultato["operazioni"]
+        print(f"{nome:<30} {_formatta_tempo(tempo):>12}/op  {risultato['operazioni_al_secondo']:>14,.0f} op/s")
+
+
+def _stampa_confronti(confronti, soglia):
+    for confronto in confronti:
+        esito = "REGRESSIONE" if confronto["regressione"] else ""
+        print(f"{confronto['nome']:<30} {_formatta_tempo(confronto['tempo_base']):>12} -> "
+              f"{_formatta_tempo(confronto['tempo_nuovo']):>12}  {confronto['rapporto']:>6.2f}x  {esito}")
+    regressioni = sum(confronto["regressione"] for confronto in confronti)
+    print(f"{regressioni} regressioni oltre il {soglia:.0%}.")
+
+
+def _formatta_tempo(secondi):
+    for unita, fattore in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if secondi * fattore >= 1:
+            return f"{secondi * fattore:.2f} {unita}"
+    return f"{secondi * 1e9:.0f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m source.benchmarks.suite",
+                                     description="Benchmark dei percorsi critici con confronto tra esecuzioni.")
+    sottocomandi = parser.add_subparsers(dest="comando", required=True)
+
+    parser_esegui = sottocomandi.add_parser("esegui", help="esegue la suite e salva i risultati in JSON")
+    parser_esegui.add_argument("--dataset", choices=DIMENSIONI_DATASET, default="10k",
+                               help="dimensione del dataset sintetico (default: 10k)")
+    parser_esegui.add_argument("--record", type=int, help="numero di record, in alternativa a --dataset")
+    parser_esegui.add_argument("--ripetizioni", type=int, default=RIPETIZIONI_PREDEFINITE)
+    parser_esegui.add_argument("--benchmark", nargs="+", choices=BENCHMARK, help="esegue solo i benchmark indicati")
+    parser_esegui.add_argument("--senza-avvio", action="store_true",
+                               help="non misura import del modulo e caricamento delle tabelle")
+    parser_esegui.add_argument("--output", help="file JSON dei risultati")
+
+    parser_confronta = sottocomandi.add_parser("confronta", help="confronta due file di risultati")
+    parser_confronta.add_argument("base")
+    parser_confronta.add_argument("nuovi")
+    parser_confronta.add_argument("--soglia", type=float, default=SOGLIA_REGRESSIONE_PREDEFINITA,
+                                  help="rallentamento relativo tollerato (default: 0.10)")
+
+    argomenti = parser.parse_args(argv)
+    if argomenti.comando == "esegui":
+        risultati = esegui_suite(argomenti.record or DIMENSIONI_DATASET[argomenti.dataset], argomenti.ripetizioni,
+                                 argomenti.benchmark, not argomenti.senza_avvio)
+        _stampa_risultati(risultati)
+        if argomenti.output:
+            with open(argomenti.output, "w", encoding="utf-8") as file:
+                json.dump(risultati, file, indent=2)
+        return 0
+
+    with open(argomenti.base, encoding="utf-8") as file:
+        base = json.load(file)
+    with open(argomenti.nuovi, encoding="utf-8") as file:
+        nuovi = json.load(file)
+    confronti = confronta_risultati(base, nuovi, argomenti.soglia)
+    _stampa_confronti(confronti, argomenti.soglia)
+    return 1 if any(confronto["regressione"] for confronto in confronti) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+import threading
+from collections import OrderedDict
+
+
+############
+# COSTANTI #
+############
+DIMENSIONE_CACHE_PREDEFINITA = 4096
+
+
+#############
+# CACHE LRU #
+#############
+class CacheLRU:
+    """Cache limitata con politica LRU (least recently used) e statistiche di utilizzo.
+
+    Le operazioni sono protette da un lock, così la cache può essere condivisa tra thread.
+    Il valore viene calcolato fuori dal lock: due thread che mancano la stessa chiave la calcolano
+    entrambi, ma il risultato memorizzato è lo stesso. Le eccezioni sollevate dal calcolo non
+    vengono memorizzate.
+
+    Attributes:
+        dimensione_massima (int): Numero massimo di voci; 0 disattiva la cache.
+        hit (int): Richieste servite dalla cache.
+        miss (int): Richieste che hanno richiesto il calcolo del valore.
+        evizioni (int): Voci rimosse per far posto a nuove voci.
+    """
+
+    def __init__(self, dimensione_massima=DIMENSIONE_CACHE_PREDEFINITA):
+        if dimensione_massima < 0:
+            raise ValueError("La dimensione della cache non può essere negativa.")
+        self.dimensione_massima = dimensione_massima
+        self.hit = 0
+        self.miss = 0
+        self.evizioni = 0
+        self._voci = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ottieni(self, chiave, calcola):
+        """Restituisce il valore associato alla chiave, calcolandolo con `calcola(chiave)` se assente.
+
+        Args:
+            chiave (Hashable): Chiave della voce.
+            calcola (Callable): Funzione che calcola il valore a partire dalla chiave.
+
+        Returns:
+            Any: Valore memorizzato o appena calcolato.
+        """
+        with self._lock:
+            try:
+                valore = self._voci[chiave]
+            except KeyError:
+                self.miss += 1
+            else:
+                self._voci.move_to_end(chiave)
+                self.hit += 1
+                return valore
+        valore = calcola(chiave)
+        with self._lock:
+            if self.dimensione_massima:
+                self._voci[chiave] = valore
+                if len(self._voci) > self.dimensione_massima:
+                    self._voci.popitem(last=False)
+                    self.evizioni += 1
+        return valore
+
+    def ridimensiona(self, dimensione_massima):
+        """Cambia la dimensione massima, rimuovendo le voci meno recenti in eccesso.
+
+        Args:
+            dimensione_massima (int): Nuovo numero massimo di voci; 0 disattiva la cache.
+        """
+        if dimensione_massima < 0:
+            raise ValueError("La dimensione della cache non può essere negativa.")
+        with self._lock:
+            self.dimensione_massima = dimensione_massima
+            while len(self._voci) > dimensione_massima:
+                self._voci.popitem(last=False)
+                self.evizioni += 1
+
+    def svuota(self):
+        """Rimuove tutte le voci e azzera le statistiche."""
+        with self._lock:
+            self._voci.clear()
+            self.hit = self.miss = self.evizioni = 0
+
+    def statistiche(self):
+        """Restituisce le statistiche di utilizzo della cache.
+
+        Returns:
+            dict[str, int | float]: Hit, miss, evizioni, voci presenti, dimensione massima e hit rate.
+        """
+        with self._lock:
+            richieste = self.hit + self.miss
+            return {
+                "hit": self.hit,
+                "miss": self.miss,
+                "evizioni": self.evizioni,
+                "voci": len(self._voci),
+                "dimensione_massima": self.dimensione_massima,
+                "hit_rate": self.hit / richieste if richieste else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._voci)
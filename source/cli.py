@@ -0,0 +1,319 @@
+import argparse
+import cProfile
+import csv
+import json
+import pstats
+import sys
+import time
+from collections import Counter, deque
+from typing import NamedTuple
+from source import strumentazione
+from source.batch import CAMPI_ANAGRAFICA, CAMPO_CODICE_FISCALE, CAMPO_PROVINCIA, ErroreCodiceFiscale
+from source.deduplicazione import DIMENSIONE_CACHE_DISCO_PREDEFINITA, CacheCodiciFiscaliSqlite, GeneratoreDeduplicato
+from source.parallelo import DIMENSIONE_CHUNK_PREDEFINITA, elabora_chunk, genera_chunk, suddividi_in_chunk, \
+    valida_chunk
+from source.tabella_mmap import usa_tabella_mmap
+
+
+############
+# COSTANTI #
+############
+FORMATI = ("csv", "jsonl")
+BACKEND_TABELLE = ("dict", "mmap")
+FORMATI_METRICHE = ("json", "prometheus")
+RIGHE_PROFILO = 25
+COLONNA_CAMPO_ERRORE = "campo_errore"
+COLONNA_ERRORE = "errore"
+COLONNA_VALIDO = "valido"
+COLONNA_RIGA = "riga"
+CAMPO_RIGA = "riga"  # campo degli errori per le righe JSONL che non contengono un oggetto JSON
+
+
+class _RigaNonValida(NamedTuple):
+    """Riga JSONL illeggibile, riportata come record di errore senza interrompere l'elaborazione."""
+    numero: int
+    messaggio: str
+
+
+#######################
+# LETTURA E SCRITTURA #
+#######################
+def _leggi_righe(file, formato, delimitatore):
+    """Legge in streaming le righe di un file CSV o JSONL.
+
+    Args:
+        file (TextIO): File di input già aperto.
+        formato (str): 'csv' o 'jsonl'.
+        delimitatore (str): Delimitatore di campo per il formato CSV.
+
+    Returns:
+        tuple[list[str] | None, Iterator[dict | _RigaNonValida]]: Intestazione (solo per CSV) e iteratore delle righe.
+    """
+    if formato == "csv":
+        reader = csv.DictReader(file, delimiter=delimitatore)
+        return reader.fieldnames or [], reader
+    return None, _leggi_jsonl(file)
+
+
+def _leggi_jsonl(file):
+    """Legge le righe JSONL, restituendo una `_RigaNonValida` per il JSON malformato o diverso da un oggetto."""
+    for numero, riga in enumerate(file, 1):
+        if not riga.strip():
+            continue
+        try:
+            valore = json.loads(riga)
+        except json.JSONDecodeError as e:
+            yield _RigaNonValida(numero, f"Riga {numero}: JSON non valido ({e.msg}).")
+            continue
+        if isinstance(valore, dict):
+            yield valore
+        else:
+            yield _RigaNonValida(numero, f"Riga {numero}: atteso un oggetto JSON.")
+
+
+class _ScrittoreRisultati:
+    """Scrive riga per riga i risultati in CSV o JSONL, aggiungendo le colonne dei risultati.
+
+    Le colonne dell'input con lo stesso nome di una colonna dei risultati (ad es. rielaborando
+    un file già prodotto dalla CLI) non vengono ripetute: il loro valore è sostituito dal risultato.
+    """
+
+    def __init__(self, file, formato, delimitatore, intestazione, colonne_risultato):
+        self._formato = formato
+        self._file = file
+        if formato == "csv":
+            intestazione = [colonna for colonna in intestazione if colonna not in colonne_risultato]
+            self._writer = csv.DictWriter(file, fieldnames=intestazione + colonne_risultato,
+                                          delimiter=delimitatore, lineterminator="\n", extrasaction="ignore")
+            self._writer.writeheader()
+
+    def scrivi(self, riga):
+        if self._formato == "csv":
+            self._writer.writerow(riga)
+        else:
+            self._file.write(json.dumps(riga, ensure_ascii=False))
+            self._file.write("\n")
+
+
+#####################
+# ELABORAZIONE DATI #
+#####################
+def _estrai_valori(riga, mappatura, campi):
+    """Estrae dalla riga i valori dei campi richiesti secondo la mappatura delle colonne.
+
+    Per una `_RigaNonValida` restituisce valori vuoti: il suo risultato viene poi sostituito dall'errore di lettura.
+    """
+    if isinstance(riga, _RigaNonValida):
+        return (None,) * len(campi)
+    return tuple(riga.get(mappatura.get(campo, campo)) for campo in campi)
+
+
+def esegui(comando, file_input, file_output, formato="csv", mappatura=None, workers=1,
+           dimensione_chunk=DIMENSIONE_CHUNK_PREDEFINITA, delimitatore=";", deduplicatore=None):
+    """Genera o valida in streaming i codici fiscali di un file CSV o JSONL.
+
+    Args:
+        comando (str): 'generate' per la generazione, 'validate' per la validazione.
+        file_input (TextIO): File di input con le anagrafiche o i codici fiscali.
+        file_output (TextIO): File su cui scrivere i risultati, una riga per record.
+        formato (str, optional): 'csv' o 'jsonl'. Default a 'csv'.
+        mappatura (dict[str, str], optional): Associazione campo -> nome della colonna nel file.
+        workers (int, optional): Numero di processi da usare. Default a 1.
+        dimensione_chunk (int, optional): Numero di record per blocco di elaborazione.
+        delimitatore (str, optional): Delimitatore di campo per il formato CSV. Default a ';'.
+        deduplicatore (GeneratoreDeduplicato, optional): Se indicato, la generazione calcola una sola
+            volta ogni anagrafica distinta nel processo principale (`workers` deve essere 1).
+
+    Returns:
+        dict: Riepilogo con record elaborati, errori per campo, durata e throughput, più le
+        statistiche della deduplicazione se attiva.
+    """
+    mappatura = mappatura or {}
+    if deduplicatore is not None and workers != 1:
+        raise ValueError("La generazione deduplicata richiede un solo worker.")
+    if comando == "generate":
+        funzione_chunk = genera_chunk if deduplicatore is None else deduplicatore.genera_blocco
+        campi, colonne_risultato = (*CAMPI_ANAGRAFICA, CAMPO_PROVINCIA), [CAMPO_CODICE_FISCALE]
+    else:
+        campi, funzione_chunk, colonne_risultato = (CAMPO_CODICE_FISCALE,), valida_chunk, [COLONNA_VALIDO]
+    colonne_risultato += [COLONNA_CAMPO_ERRORE, COLONNA_ERRORE]
+
+    intestazione, righe = _leggi_righe(file_input, formato, delimitatore)
+    scrittore = _ScrittoreRisultati(file_output, formato, delimitatore, intestazione, colonne_risultato)
+
+    inizio = time.perf_counter()
+    elaborati = 0
+    errori = Counter()
+    chunks_righe = deque()
+
+    def chunks_valori():
+        for chunk in suddividi_in_chunk(righe, dimensione_chunk):
+            chunks_righe.append(chunk)
+            if comando == "generate":
+                yield [_estrai_valori(riga, mappatura, campi) for riga in chunk]
+            else:
+                yield [_estrai_valori(riga, mappatura, campi)[0] for riga in chunk]
+
+    for risultati in elabora_chunk(funzione_chunk, chunks_valori(), workers):
+        for riga, risultato in zip(chunks_righe.popleft(), risultati):
+            if isinstance(riga, _RigaNonValida):
+                errori[CAMPO_RIGA] += 1
+                riga = {COLONNA_RIGA: riga.numero, colonne_risultato[0]: None if comando == "generate" else False,
+                        COLONNA_CAMPO_ERRORE: CAMPO_RIGA, COLONNA_ERRORE: riga.messaggio}
+            elif isinstance(risultato, ErroreCodiceFiscale):
+                errori[risultato.campo] += 1
+                riga[colonne_risultato[0]] = None if comando == "generate" else False
+                riga[COLONNA_CAMPO_ERRORE], riga[COLONNA_ERRORE] = risultato
+            else:
+                riga[colonne_risultato[0]] = risultato if comando == "generate" else True
+                riga[COLONNA_CAMPO_ERRORE] = riga[COLONNA_ERRORE] = None
+            scrittore.scrivi(riga)
+        elaborati += len(risultati)
+
+    durata = time.perf_counter() - inizio
+    riepilogo = {
+        "record": elaborati,
+        "errori": sum(errori.values()),
+        "errori_per_campo": dict(errori),
+        "durata_s": round(durata, 3),
+        "record_al_secondo": round(elaborati / durata) if durata else 0,
+    }
+    if deduplicatore is not None and comando == "generate":
+        riepilogo["deduplicazione"] = deduplicatore.statistiche()
+    return riepilogo
+
+
+#################
+# LINEA COMANDO #
+#################
+def _crea_parser():
+    parser = argparse.ArgumentParser(
+        prog="codicefiscale",
+        description="Generazione e validazione massiva di codici fiscali da file CSV o JSONL.")
+    sottocomandi = parser.add_subparsers(dest="comando", required=True)
+    descrizioni = {
+        "generate": "genera i codici fiscali di un file di anagrafiche",
+        "validate": "valida i codici fiscali di un file",
+    }
+    for comando, descrizione in descrizioni.items():
+        sottoparser = sottocomandi.add_parser(comando, help=descrizione, description=descrizione)
+        sottoparser.add_argument("input", nargs="?", default="-",
+                                 help="file di input ('-' o assente per leggere da stdin)")
+        sottoparser.add_argument("--format", choices=FORMATI, dest="formato",
+                                 help="formato dell'input e dell'output (default: dall'estensione, altrimenti csv)")
+        sottoparser.add_argument("--map", action="append", default=[], metavar="CAMPO=COLONNA", dest="mappatura",
+                                 help="associa un campo alla colonna del file (ripetibile), es. cognome=SURNAME")
+        sottoparser.add_argument("--delimiter", default=";", dest="delimitatore",
+                                 help="delimitatore di campo CSV (default: ';')")
+        sottoparser.add_argument("--workers", type=int, default=1,
+                                 help="numero di processi di elaborazione (default: 1)")
+        sottoparser.add_argument("--chunk-size", type=int, default=DIMENSIONE_CHUNK_PREDEFINITA,
+                                 dest="dimensione_chunk", help="record per blocco di elaborazione")
+        sottoparser.add_argument("--backend", choices=BACKEND_TABELLE, default="dict",
+                                 help="tabella dei codici catastali: in memoria o file mmap condiviso tra i "
+                                      "worker (default: dict)")
+        sottoparser.add_argument("--profile", nargs="?", const="-", metavar="FILE", dest="profilo",
+                                 help="profila l'esecuzione con cProfile: senza FILE stampa le funzioni più "
+                                      "costose su stderr, altrimenti salva le statistiche in FILE")
+        sottoparser.add_argument("--metrics", choices=FORMATI_METRICHE, dest="metriche",
+                                 help="raccoglie tempi per fase, errori per causa e statistiche delle cache e li "
+                                      "stampa su stderr (solo per il processo principale, cioè con --workers 1)")
+        if comando == "generate":
+            sottoparser.add_argument("--dedup", action="store_true", dest="deduplica",
+                                     help="calcola una sola volta le anagrafiche equivalenti (nomi normalizzati, "
+                                          "data e codice catastale risolti) e riporta rapporto e tempo risparmiato "
+                                          "su stderr; richiede --workers 1")
+            sottoparser.add_argument("--dedup-cache", metavar="FILE", dest="cache_deduplicazione",
+                                     help="cache SQLite persistente tra le esecuzioni (implica --dedup)")
+            sottoparser.add_argument("--dedup-cache-size", type=int, default=DIMENSIONE_CACHE_DISCO_PREDEFINITA,
+                                     metavar="N", dest="dimensione_cache_deduplicazione",
+                                     help="voci massime della cache SQLite, oltre le quali si eliminano le meno "
+                                          f"recenti (default: {DIMENSIONE_CACHE_DISCO_PREDEFINITA})")
+    return parser
+
+
+def _analizza_mappatura(parser, coppie, campi_validi):
+    mappatura = {}
+    for coppia in coppie:
+        campo, separatore, colonna = coppia.partition("=")
+        if not separatore or campo not in campi_validi or not colonna:
+            parser.error(f"mappatura non valida: '{coppia}'. Campi ammessi: {', '.join(campi_validi)}.")
+        mappatura[campo] = colonna
+    return mappatura
+
+
+def _scrivi_profilo(profilo, destinazione):
+    """Salva le statistiche di cProfile in un file o ne stampa il riepilogo su stderr."""
+    if destinazione != "-":
+        profilo.dump_stats(destinazione)
+        return
+    pstats.Stats(profilo, stream=sys.stderr).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(RIGHE_PROFILO)
+
+
+def main(argomenti=None):
+    """Punto di ingresso della modalità non interattiva.
+
+    Args:
+        argomenti (list[str], optional): Argomenti da riga di comando. Default a `sys.argv[1:]`.
+
+    Returns:
+        int: Codice di uscita del processo.
+    """
+    parser = _crea_parser()
+    opzioni = parser.parse_args(argomenti)
+    campi_validi = (*CAMPI_ANAGRAFICA, CAMPO_PROVINCIA) if opzioni.comando == "generate" else (CAMPO_CODICE_FISCALE,)
+    mappatura = _analizza_mappatura(parser, opzioni.mappatura, campi_validi)
+    if opzioni.workers < 1 or opzioni.dimensione_chunk < 1:
+        parser.error("--workers e --chunk-size devono essere maggiori di zero.")
+    deduplica = opzioni.comando == "generate" and (opzioni.deduplica or opzioni.cache_deduplicazione)
+    if deduplica and opzioni.workers != 1:
+        parser.error("--dedup e --dedup-cache richiedono --workers 1.")
+    if deduplica and opzioni.dimensione_cache_deduplicazione < 1:
+        parser.error("--dedup-cache-size deve essere maggiore di zero.")
+    if opzioni.backend == "mmap":
+        usa_tabella_mmap()
+    formato = opzioni.formato or ("jsonl" if opzioni.input.endswith((".jsonl", ".ndjson")) else "csv")
+
+    if opzioni.metriche:
+        strumentazione.attiva_strumentazione()
+    profilo = cProfile.Profile() if opzioni.profilo else None
+
+    cache = None
+    if deduplica and opzioni.cache_deduplicazione:
+        cache = CacheCodiciFiscaliSqlite(opzioni.cache_deduplicazione, opzioni.dimensione_cache_deduplicazione)
+    deduplicatore = GeneratoreDeduplicato(cache) if deduplica else None
+
+    file_input = sys.stdin if opzioni.input == "-" else open(opzioni.input, encoding="utf-8", newline="")
+    try:
+        if profilo is not None:
+            profilo.enable()
+        riepilogo = esegui(opzioni.comando, file_input, sys.stdout, formato, mappatura, opzioni.workers,
+                           opzioni.dimensione_chunk, opzioni.delimitatore, deduplicatore)
+    finally:
+        if profilo is not None:
+            profilo.disable()
+        if file_input is not sys.stdin:
+            file_input.close()
+        if cache is not None:
+            cache.chiudi()
+    sys.stdout.flush()
+    if profilo is not None:
+        _scrivi_profilo(profilo, opzioni.profilo)
+    if opzioni.metriche:
+        strumentazione.disattiva_strumentazione()
+        print(strumentazione.esporta_json() if opzioni.metriche == "json" else strumentazione.esporta_prometheus(),
+              file=sys.stderr)
+    print(f"Elaborati {riepilogo['record']} record in {riepilogo['durata_s']} s "
+          f"({riepilogo['record_al_secondo']} record/s), errori: {riepilogo['errori']} "
+          f"{riepilogo['errori_per_campo'] or ''}".rstrip(), file=sys.stderr)
+    if "deduplicazione" in riepilogo:
+        statistiche = riepilogo["deduplicazione"]
+        print(f"Deduplicazione: {statistiche['calcolate']} calcolati, {statistiche['da_cache_disco']} dalla cache "
+              f"su disco, {statistiche['riutilizzate']} riutilizzati (rapporto "
+              f"{statistiche['rapporto_deduplicazione']:.2f}x), tempo risparmiato stimato "
+              f"{statistiche['secondi_risparmiati_stimati']:.3f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,10 @@
 import string
-from source.utils import _crea_dict_denominazione_codice_catastale_da_csv, _formatta_stringa, _estrai_caratteri
+from typing import NamedTuple
+from source import strumentazione
+from source.cache import DIMENSIONE_CACHE_PREDEFINITA, CacheLRU
+from source.storico_comuni import PREFISSO_CODICE_STATO_ESTERO, indice_storico_comuni
+from source.tabelle import CODICE_CATASTALE_NON_DISPONIBILE, tabella_codici_catastali
+from source.utils import _formatta_stringa, _estrai_caratteri
 from datetime import datetime, date
 
 
@@ -10,10 +15,17 @@ CONVERSIONE_MESE_LETTERA = {
     '01': 'A', '02': 'B', '03': 'C', '04': 'D', '05': 'E', '06': 'H',
     '07': 'L', '08': 'M', '09': 'P', '10': 'R', '11': 'S', '12': 'T'
 }
+CONVERSIONE_LETTERA_MESE = {lettera: int(mese) for mese, lettera in CONVERSIONE_MESE_LETTERA.items()}
+LETTERE_MESE = tuple(CONVERSIONE_MESE_LETTERA[f"{mese:02d}"] for mese in range(1, 13))  # indice: mese - 1
+DATA_MINIMA = date(1900, 1, 1)
 VAL_SOMMARE_GIORNO_FEMM = 40
-COMUNI_COD_CATASTALI = _crea_dict_denominazione_codice_catastale_da_csv("tabella_comuni.csv")
-STATI_COD_CATASTALI = _crea_dict_denominazione_codice_catastale_da_csv("tabella_stati.csv")
-COMUNI_E_STATI_COD_CATASTALI = COMUNI_COD_CATASTALI | STATI_COD_CATASTALI
+# Tabelle caricate al primo accesso (vedi __getattr__): nome del modulo -> attributo di TabellaCodiciCatastali
+_TABELLE_CODICI_CATASTALI = {
+    "COMUNI_COD_CATASTALI": "comuni",
+    "STATI_COD_CATASTALI": "stati",
+    "COMUNI_E_STATI_COD_CATASTALI": "comuni_e_stati",
+    "CODICI_CATASTALI_DENOMINAZIONI": "denominazioni_per_codice",
+}
 CONVERSIONE_CARATTERI_PARI_DISPARI = {
     "0": (0, 1), "1": (1, 0), "2": (2, 5), "3": (3, 7), "4": (4, 9), "5": (5, 13), "6": (6, 15), "7": (7, 17),
     "8": (8, 19), "9": (9, 21), "A": (0, 1), "B": (1, 0), "C": (2, 5), "D": (3, 7), "E": (4, 9), "F": (5, 13),
@@ -23,34 +35,162 @@ CONVERSIONE_CARATTERI_PARI_DISPARI = {
 }
 VAL_MODULO_CARATTERE_CONTROLLO = 26
 CONVERSIONE_CARATTERE_CONTROLLO = {i: lettera for i, lettera in enumerate(string.ascii_uppercase)}
+# Tabelle di 256 byte indicizzate per codice ASCII: valore del carattere in posizione pari/dispari
+VALORE_CARATTERE_NON_VALIDO = 0xFF
+TABELLA_VALORI_PARI = bytes(
+    CONVERSIONE_CARATTERI_PARI_DISPARI[chr(i)][0] if chr(i) in CONVERSIONE_CARATTERI_PARI_DISPARI
+    else VALORE_CARATTERE_NON_VALIDO for i in range(256))
+TABELLA_VALORI_DISPARI = bytes(
+    CONVERSIONE_CARATTERI_PARI_DISPARI[chr(i)][1] if chr(i) in CONVERSIONE_CARATTERI_PARI_DISPARI
+    else VALORE_CARATTERE_NON_VALIDO for i in range(256))
+
+# Omocodia: le cifre nelle posizioni 7-8, 10-11 e 13-15 possono essere sostituite da lettere (0 -> L, ..., 9 -> V)
+LETTERE_OMOCODIA = "LMNPQRSTUV"
+POSIZIONI_OMOCODIA = (6, 7, 9, 10, 12, 13, 14)
+TRADUZIONE_OMOCODIA_CIFRE = str.maketrans(LETTERE_OMOCODIA, "0123456789")
+CONVERSIONE_CIFRA_LETTERA_OMOCODIA = dict(zip("0123456789", LETTERE_OMOCODIA))
+# Per ciascuna delle 127 varianti, le posizioni sostituite: il bit i indica la i-esima cifra partendo da destra,
+# così le varianti 1, 3, 7, ... (indici 0, 2, 6, ...) seguono le sostituzioni progressive da destra
+POSIZIONI_VARIANTI_OMOCODICHE = tuple(
+    tuple(posizione for i, posizione in enumerate(reversed(POSIZIONI_OMOCODIA)) if maschera >> i & 1)
+    for maschera in range(1, 2 ** len(POSIZIONI_OMOCODIA))
+)
+# Codici di errore della validazione del codice fiscale, nell'ordine in cui i controlli vengono eseguiti
+CODICE_FISCALE_VALIDO = 0
+ERRORE_LUNGHEZZA = 1
+ERRORE_COGNOME = 2
+ERRORE_NOME = 3
+ERRORE_ANNO = 4
+ERRORE_MESE = 5
+ERRORE_GIORNO = 6
+ERRORE_CODICE_CATASTALE = 7
+ERRORE_CARATTERE_CONTROLLO = 8
+MESSAGGI_ERRORE_CODICE_FISCALE = {
+    ERRORE_LUNGHEZZA: "Codice fiscale non valido. Deve essere lungo 16 caratteri.",
+    ERRORE_COGNOME: "Codice fiscale non valido. Posizioni 1-3 devono essere lettere per cognome (RSS per ROSSI).",
+    ERRORE_NOME: "Codice fiscale non valido. Posizioni 4-6 devono essere lettere per nome (MRA per MARIO).",
+    ERRORE_ANNO: "Codice fiscale non valido. Posizioni 7-8 devono essere numeri per anno (98 per 1998)",
+    ERRORE_MESE: "Codice fiscale non valido. Posizione 9 deve essere una lettere per mese (A per GENNAIO)",
+    ERRORE_GIORNO: "Codice fiscale non valido. Posizioni 10-11 devono rappresentare un numero tra 01 e 71 "
+                   "per giorno (01 per 01 se maschio, 41 per 01 se femmina)",
+    ERRORE_CODICE_CATASTALE: "Codice fiscale non valido. Posizioni 12-15 devono rappresentare un valido codice "
+                             "catastale di un luogo geograficico (H501 per ROMA).",
+    ERRORE_CARATTERE_CONTROLLO: "Codice fiscale non valido. Il carattere di controllo non corrisponde.",
+}
+# Nomi delle cause di errore della validazione nelle metriche di `strumentazione`
+CAUSE_ERRORE_CODICE_FISCALE = {
+    ERRORE_LUNGHEZZA: "lunghezza",
+    ERRORE_COGNOME: "cognome",
+    ERRORE_NOME: "nome",
+    ERRORE_ANNO: "anno",
+    ERRORE_MESE: "mese",
+    ERRORE_GIORNO: "giorno",
+    ERRORE_CODICE_CATASTALE: "codice_catastale",
+    ERRORE_CARATTERE_CONTROLLO: "carattere_controllo",
+}
+# Validazione in un solo passaggio: tabelle dei caratteri ammessi e codice di errore per ciascuna posizione
+POSIZIONE_FINE_GIORNO = 11
+POSIZIONE_INIZIO_CODICE_CATASTALE = 11
+_ERRORI_POSIZIONE = (ERRORE_COGNOME,) * 3 + (ERRORE_NOME,) * 3 + (ERRORE_ANNO,) * 2 + (ERRORE_MESE,) + (ERRORE_GIORNO,) * 2
+OPERAZIONE_GENERA = "genera"
+OPERAZIONE_VALIDA = "valida"
+# Cache delle codifiche di cognome e nome: i dati anagrafici reali ripetono spesso gli stessi valori
+_cache_codifica_cognome = CacheLRU(DIMENSIONE_CACHE_PREDEFINITA)
+_cache_codifica_nome = CacheLRU(DIMENSIONE_CACHE_PREDEFINITA)
+strumentazione.registra_cache("codifica_cognome", _cache_codifica_cognome)
+strumentazione.registra_cache("codifica_nome", _cache_codifica_nome)
+
+
+class CodiceFiscaleDecodificato(NamedTuple):
+    """Dati anagrafici ricavati da un codice fiscale.
+
+    Attributes:
+        data_nascita (date): Data di nascita, con il secolo dedotto dalla data odierna.
+        sesso (str): Sesso ('M' o 'F').
+        codice_catastale (str): Codice catastale del luogo di nascita, senza omocodia.
+        luogo_nascita (str): Denominazione del comune o stato di nascita.
+    """
+    data_nascita: date
+    sesso: str
+    codice_catastale: str
+    luogo_nascita: str
+
+
+class ErroreComuneAmbiguo(ValueError):
+    """Il comune indicato corrisponde a più comuni omonimi validi alla data di nascita.
+
+    Attributes:
+        comune (str): Denominazione del comune in maiuscolo.
+        province (tuple[str, ...]): Sigle delle province dei comuni omonimi, da indicare per distinguerli.
+    """
+
+    def __init__(self, comune, province):
+        super().__init__(f"Comune ambiguo. {comune} corrisponde a più comuni ({', '.join(sorted(province))}): "
+                         "indicare la provincia.")
+        self.comune = comune
+        self.province = province
+
+
+def __getattr__(nome):
+    """Espone le tabelle dei codici catastali come costanti del modulo, caricandole solo al primo accesso."""
+    if nome in _TABELLE_CODICI_CATASTALI:
+        return getattr(tabella_codici_catastali(), _TABELLE_CODICI_CATASTALI[nome])
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
 
 #######################
 # FUNZIONE PRINCIPALE #
 #######################
-def genera_codice_fiscale(cognome, nome, sesso, data_nascita, comune):
+def genera_codice_fiscale(cognome, nome, sesso, data_nascita, comune, provincia=None):
     """Genera il codice fiscale completo basato sui dati anagrafici.
 
     Args:
         cognome (str): Cognome della persona.
         nome (str): Nome della persona.
         sesso (str): Sesso ('M' o 'F').
-        data_nascita (str): Data di nascita in formato GG/MM/AAAA.
-        comune (str): Comune o stato di nascita.
+        data_nascita (str | date): Data di nascita in formato GG/MM/AAAA o AAAA-MM-GG, oppure oggetto `date`.
+        comune (str): Comune o stato di nascita; il codice catastale è quello valido alla data di nascita.
+        provincia (str, optional): Sigla della provincia, necessaria per i comuni omonimi (vedi `codifica_comune`).
 
     Returns:
         str: Codice fiscale generato.
     """
+    if strumentazione.attiva:
+        return _genera_codice_fiscale_strumentato(cognome, nome, sesso, data_nascita, comune, provincia=provincia)
+    cod_cognome = codifica_cognome(cognome)
+    cod_nome = codifica_nome(nome)
+    sesso = valida_sesso(sesso)
+    data_nascita = _converti_data_nascita(data_nascita)
     codifica_senza_carattere_controllo = "".join([
-        codifica_cognome(cognome),
-        codifica_nome(nome),
+        cod_cognome,
+        cod_nome,
         codifica_data_nascita(data_nascita, sesso),
-        codifica_comune(comune)
+        codifica_comune(comune, data_nascita, provincia)
     ])
     return "".join([codifica_senza_carattere_controllo,
                     calcola_carattere_controllo(codifica_senza_carattere_controllo)])
 
 
+def _genera_codice_fiscale_strumentato(cognome, nome, sesso, data_nascita, comune, oggi=None, segmenti_data=None,
+                                       cronometro=None, provincia=None):
+    """Come `genera_codice_fiscale`, registrando in `strumentazione` la durata di ogni fase e gli errori.
+
+    Il chiamante può passare il proprio `cronometro` per sapere, in caso di errore, in quale fase è avvenuto.
+    """
+    with cronometro or strumentazione.Cronometro(OPERAZIONE_GENERA) as cronometro:
+        cod_cognome = cronometro.esegui("cognome", codifica_cognome, cognome)
+        cod_nome = cronometro.esegui("nome", codifica_nome, nome)
+        sesso = cronometro.esegui("sesso", valida_sesso, sesso)
+        data_nascita = cronometro.esegui("data_nascita", _converti_data_nascita, data_nascita, oggi)
+        cod_data_nascita = cronometro.esegui("codifica_data", codifica_data_nascita, data_nascita, sesso, oggi,
+                                             segmenti_data)
+        cod_comune = cronometro.esegui("comune", codifica_comune, comune, data_nascita, provincia)
+        codifica_senza_carattere_controllo = "".join([cod_cognome, cod_nome, cod_data_nascita, cod_comune])
+        return "".join([codifica_senza_carattere_controllo,
+                         cronometro.esegui("carattere_controllo", calcola_carattere_controllo,
+                                           codifica_senza_carattere_controllo)])
+
+
 ########################
 # FUNZIONI DI CODIFICA #
 ########################
@@ -63,8 +203,7 @@ def codifica_cognome(cognome):
     Returns:
         str: Codifica a 3 lettere del cognome.
     """
-    cognome = valida_cognome(cognome)
-    return _estrai_caratteri(cognome)
+    return _cache_codifica_cognome.ottieni(cognome, _codifica_cognome)
 
 
 def codifica_nome(nome):
@@ -76,44 +215,114 @@ def codifica_nome(nome):
     Returns:
         str: Codifica a 3 lettere del nome.
     """
-    nome = valida_nome(nome)
-    return _estrai_caratteri(nome, is_nome=True)
+    return _cache_codifica_nome.ottieni(nome, _codifica_nome)
+
+
+def _codifica_cognome(cognome):
+    """Codifica il cognome senza passare dalla cache."""
+    return _estrai_caratteri(valida_cognome(cognome))
+
 
+def _codifica_nome(nome):
+    """Codifica il nome senza passare dalla cache."""
+    return _estrai_caratteri(valida_nome(nome), is_nome=True)
 
-def codifica_data_nascita(data_nascita, sesso):
+
+def codifica_data_nascita(data_nascita, sesso, oggi=None, segmenti_data=None):
     """Codifica la data di nascita e il sesso nel codice fiscale.
 
     Args:
-        data_nascita (str): Data di nascita in formato GG/MM/AAAA.
+        data_nascita (str | date): Data di nascita in formato GG/MM/AAAA o AAAA-MM-GG, oppure oggetto `date`.
         sesso (str): Sesso ('M' o 'F').
+        oggi (date, optional): Data odierna da usare per la validazione; le funzioni massive la calcolano
+            una sola volta. Default a `date.today()`.
+        segmenti_data (TabellaSegmentiData, optional): Tabella precalcolata dei segmenti, usata dalle
+            funzioni massive. Default a None (segmento calcolato).
 
     Returns:
         str: Codifica a 5 caratteri della data di nascita (anno, mese, giorno).
     """
     sesso = valida_sesso(sesso)
-    giorno, mese, anno = valida_data_nascita(data_nascita).split("/")
-    cod_anno = anno[2:]
-    cod_mese = CONVERSIONE_MESE_LETTERA[mese]
-    cod_giorno = str(int(giorno) + VAL_SOMMARE_GIORNO_FEMM) if sesso == 'F' else giorno
-    return "".join([cod_anno, cod_mese, cod_giorno.zfill(2)])
+    data_nascita = _converti_data_nascita(data_nascita, oggi)
+    if segmenti_data is not None and (segmento := segmenti_data.segmento(data_nascita, sesso)) is not None:
+        return segmento
+    giorno = data_nascita.day + VAL_SOMMARE_GIORNO_FEMM if sesso == 'F' else data_nascita.day
+    return f"{data_nascita.year % 100:02d}{LETTERE_MESE[data_nascita.month - 1]}{giorno:02d}"
 
 
-def codifica_comune(comune):
+def codifica_comune(comune, data_nascita=None, provincia=None):
     """Codifica il comune o stato di nascita nel codice fiscale.
 
+    Se il nome corrisponde a più codici catastali di comuni nel tempo, si usa quello valido alla data
+    di nascita (vedi `IndiceStoricoComuni.codice_catastale`). Se alla data (o, senza data, oggi) sono
+    validi più comuni omonimi di province diverse, la provincia è obbligatoria: senza, viene sollevato
+    `ErroreComuneAmbiguo` invece di scegliere uno dei codici. Per gli stati la provincia è ignorata.
+
     Args:
         comune (str): Nome del comune o stato di nascita.
+        data_nascita (str | date, optional): Data di nascita. Default a None (codice più recente).
+        provincia (str, optional): Sigla della provincia del comune, ad es. 'BG'.
 
     Returns:
         str: Codice catastale del comune o stato di nascita.
+
+    Raises:
+        ErroreComuneAmbiguo: Se più comuni omonimi sono validi e la provincia non è indicata.
+        ValueError: Se il comune non esiste o non appartiene alla provincia indicata.
     """
     comune = valida_comune(comune)
-    return COMUNI_E_STATI_COD_CATASTALI[comune]
+    tabella = tabella_codici_catastali()
+    codice_catastale = tabella.codice_catastale(comune)
+    if codice_catastale.startswith(PREFISSO_CODICE_STATO_ESTERO):
+        return codice_catastale
+    if data_nascita is not None and not isinstance(data_nascita, date):
+        data_nascita = _converti_data_nascita(data_nascita)
+    if provincia is not None:
+        provincia = provincia.strip().upper() or None
+    indice = indice_storico_comuni(tabella)
+    periodi = indice.periodi_validi(comune, data_nascita, provincia)
+    if len({periodo.codice_catastale for periodo in periodi}) > 1:
+        raise ErroreComuneAmbiguo(comune, tuple(periodo.provincia for periodo in periodi))
+    if periodi:
+        return periodi[0].codice_catastale
+    codice_storico = indice.codice_catastale(comune, data_nascita, provincia)
+    if codice_storico is None and provincia is not None:
+        raise ValueError(f"Comune non valido. {comune} non è un comune della provincia {provincia}.")
+    return codice_storico or codice_catastale
 
 
 def calcola_carattere_controllo(codice_senza_controllo):
     """Calcola il carattere di controllo del codice fiscale.
 
+    I valori dei caratteri si ottengono con `bytes.translate` sulle tabelle `TABELLA_VALORI_PARI` e
+    `TABELLA_VALORI_DISPARI`, senza cicli Python per carattere.
+
+    Args:
+        codice_senza_controllo (str): Codice fiscale senza carattere di controllo.
+
+    Returns:
+        str: Carattere di controllo calcolato.
+
+    Raises:
+        KeyError: Se il codice contiene caratteri diversi da cifre e lettere maiuscole.
+    """
+    try:
+        codice = codice_senza_controllo.encode("ascii")
+    except UnicodeEncodeError:
+        return _calcola_carattere_controllo_riferimento(codice_senza_controllo)
+    valori_pari = codice[1::2].translate(TABELLA_VALORI_PARI)
+    valori_dispari = codice[::2].translate(TABELLA_VALORI_DISPARI)
+    if VALORE_CARATTERE_NON_VALIDO in valori_pari or VALORE_CARATTERE_NON_VALIDO in valori_dispari:
+        return _calcola_carattere_controllo_riferimento(codice_senza_controllo)
+    return CONVERSIONE_CARATTERE_CONTROLLO[(sum(valori_pari) + sum(valori_dispari)) % VAL_MODULO_CARATTERE_CONTROLLO]
+
+
+def _calcola_carattere_controllo_riferimento(codice_senza_controllo):
+    """Calcola il carattere di controllo carattere per carattere (implementazione di riferimento).
+
+    Usata per i codici con caratteri non validi, per i quali solleva KeyError, e come riferimento
+    nei test e nei benchmark.
+
     Args:
         codice_senza_controllo (str): Codice fiscale senza carattere di controllo.
 
@@ -128,12 +337,236 @@ def calcola_carattere_controllo(codice_senza_controllo):
     return CONVERSIONE_CARATTERE_CONTROLLO[carattere_controllo]
 
 
+#####################################
+# CACHE DELLE CODIFICHE ANAGRAFICHE #
+#####################################
+def configura_cache_codifiche(dimensione_massima):
+    """Imposta il numero massimo di codifiche memorizzate per cognomi e nomi.
+
+    Args:
+        dimensione_massima (int): Voci massime per ciascuna cache; 0 disattiva la memorizzazione.
+    """
+    _cache_codifica_cognome.ridimensiona(dimensione_massima)
+    _cache_codifica_nome.ridimensiona(dimensione_massima)
+
+
+def statistiche_cache_codifiche():
+    """Restituisce le statistiche di utilizzo delle cache di cognomi e nomi.
+
+    Returns:
+        dict[str, dict[str, int | float]]: Statistiche (hit, miss, evizioni, ...) per "cognome" e "nome".
+    """
+    return {"cognome": _cache_codifica_cognome.statistiche(), "nome": _cache_codifica_nome.statistiche()}
+
+
+def svuota_cache_codifiche():
+    """Svuota le cache di cognomi e nomi e ne azzera le statistiche."""
+    _cache_codifica_cognome.svuota()
+    _cache_codifica_nome.svuota()
+
+
+########################
+# FUNZIONI DI OMOCODIA #
+########################
+def normalizza_omocodia(codice_fiscale):
+    """Riporta un codice fiscale omocodico al codice di base, con il relativo carattere di controllo.
+
+    Le lettere sostitutive nelle posizioni numeriche vengono riconvertite in cifre; un codice
+    senza sostituzioni viene restituito invariato (in maiuscolo).
+
+    Args:
+        codice_fiscale (str): Codice fiscale, eventualmente omocodico.
+
+    Returns:
+        str: Codice fiscale di base.
+
+    Raises:
+        ValueError: Se il codice fiscale non è lungo 16 caratteri.
+    """
+    if len(codice_fiscale) != 16:
+        raise ValueError(MESSAGGI_ERRORE_CODICE_FISCALE[ERRORE_LUNGHEZZA])
+    codice_fiscale = codice_fiscale.upper()
+    codice_base = _normalizza_posizioni_omocodia(codice_fiscale[:15])
+    if codice_base == codice_fiscale[:15]:
+        return codice_fiscale
+    return codice_base + calcola_carattere_controllo(codice_base)
+
+
+def varianti_omocodiche(codice_fiscale):
+    """Restituisce le 127 varianti omocodiche di un codice fiscale.
+
+    Le varianti si ottengono sostituendo con `LETTERE_OMOCODIA` ogni sottoinsieme non vuoto delle
+    7 cifre del codice di base, nell'ordine di `POSIZIONI_VARIANTI_OMOCODICHE`.
+
+    Args:
+        codice_fiscale (str): Codice fiscale di base o una sua variante omocodica.
+
+    Returns:
+        list[str]: Le 127 varianti omocodiche, ciascuna con il proprio carattere di controllo.
+
+    Raises:
+        ValueError: Se il codice fiscale non è lungo 16 caratteri.
+    """
+    codice_base = normalizza_omocodia(codice_fiscale)[:15]
+    varianti = []
+    for posizioni in POSIZIONI_VARIANTI_OMOCODICHE:
+        caratteri = list(codice_base)
+        for posizione in posizioni:
+            caratteri[posizione] = CONVERSIONE_CIFRA_LETTERA_OMOCODIA.get(caratteri[posizione], caratteri[posizione])
+        variante = "".join(caratteri)
+        varianti.append(variante + calcola_carattere_controllo(variante))
+    return varianti
+
+
+def _normalizza_posizioni_omocodia(codice_senza_controllo):
+    """Riconverte in cifre le lettere omocodiche delle posizioni numeriche di un codice di 15 caratteri."""
+    return "".join([codice_senza_controllo[:6], codice_senza_controllo[6:8].translate(TRADUZIONE_OMOCODIA_CIFRE),
+                    codice_senza_controllo[8], codice_senza_controllo[9:11].translate(TRADUZIONE_OMOCODIA_CIFRE),
+                    codice_senza_controllo[11], codice_senza_controllo[12:15].translate(TRADUZIONE_OMOCODIA_CIFRE)])
+
+
+##########################
+# FUNZIONI DI DECODIFICA #
+##########################
+def decodifica_comune(codice_catastale):
+    """Restituisce il comune o stato corrispondente a un codice catastale.
+
+    Args:
+        codice_catastale (str): Codice catastale del comune o stato (es. H501).
+
+    Returns:
+        str: Denominazione del comune o stato in maiuscolo.
+
+    Raises:
+        ValueError: Se il codice catastale non corrisponde a nessun comune o stato.
+    """
+    denominazione = _denominazione_codice_catastale(codice_catastale.upper())
+    if denominazione is None:
+        raise ValueError("Codice catastale non valido. Deve corrispondere a un comune o a uno stato estero esistente.")
+    return denominazione
+
+
+def decodifica_codice_fiscale(codice_fiscale, oggi=None, segmenti_data=None):
+    """Ricava data di nascita, sesso e luogo di nascita da un codice fiscale, anche omocodico.
+
+    Il secolo di nascita è il più recente che non porta a una data futura: ad es. '85' è 1985,
+    '05' è 2005 se la data non è successiva a oggi, altrimenti 1905.
+
+    Args:
+        codice_fiscale (str): Codice fiscale da decodificare.
+        oggi (date, optional): Data di riferimento per dedurre il secolo. Default alla data odierna.
+        segmenti_data (TabellaSegmentiData, optional): Tabella precalcolata dei segmenti, usata dalle
+            funzioni massive. Default a None (data calcolata).
+
+    Returns:
+        CodiceFiscaleDecodificato: Dati anagrafici contenuti nel codice.
+
+    Raises:
+        ValueError: Se il codice fiscale non è valido o non rappresenta una data esistente.
+    """
+    is_valido_codice_fiscale(codice_fiscale)
+    codice_errore, decodificato = _decodifica_codice_valido(codice_fiscale, oggi, segmenti_data)
+    if codice_errore != CODICE_FISCALE_VALIDO:
+        raise ValueError(MESSAGGI_ERRORE_CODICE_FISCALE[codice_errore])
+    return decodificato
+
+
+def _decodifica_codice_valido(codice_fiscale, oggi=None, segmenti_data=None):
+    """Decodifica un codice fiscale già validato, restituendo un codice di errore invece di sollevare.
+
+    La validazione non verifica che mese e giorno formino una data esistente: in quel caso viene
+    restituito `ERRORE_MESE` o `ERRORE_GIORNO`, come in `decodifica_codice_fiscale`.
+
+    Returns:
+        tuple[int, CodiceFiscaleDecodificato | None]: `CODICE_FISCALE_VALIDO` e i dati decodificati,
+        oppure il codice di errore e None.
+    """
+    codice_base = _normalizza_posizioni_omocodia(codice_fiscale[:15].upper())
+    oggi = oggi or date.today()
+
+    if segmenti_data is not None and (risultato := segmenti_data.data_nascita(codice_base[6:11], oggi)):
+        data_nascita, sesso = risultato
+    else:
+        codice_errore, data_nascita, sesso = _decodifica_segmento_data(codice_base[6:11], oggi)
+        if codice_errore != CODICE_FISCALE_VALIDO:
+            return codice_errore, None
+
+    codice_catastale = codice_base[11:15]
+    return CODICE_FISCALE_VALIDO, CodiceFiscaleDecodificato(data_nascita, sesso, codice_catastale,
+                                                            _denominazione_codice_catastale(codice_catastale))
+
+
+def _denominazione_codice_catastale(codice_catastale):
+    """Restituisce la denominazione associata al codice catastale, cercando anche tra i codici storici.
+
+    I codici generati per una data di nascita (`codifica_comune`) possono appartenere a periodi di
+    validità non più correnti: devono essere riconosciuti anche in validazione e decodifica.
+    """
+    tabella = tabella_codici_catastali()
+    denominazione = tabella.denominazione(codice_catastale)
+    if denominazione is None:
+        denominazione = indice_storico_comuni(tabella).denominazione(codice_catastale)
+    return denominazione
+
+
+def _decodifica_data_nascita(segmento, oggi):
+    """Ricava data di nascita e sesso dal segmento AAMGG (senza omocodia) di un codice fiscale.
+
+    Raises:
+        ValueError: Se il mese non è valido o giorno e mese non formano una data esistente.
+    """
+    codice_errore, data_nascita, sesso = _decodifica_segmento_data(segmento, oggi)
+    if codice_errore != CODICE_FISCALE_VALIDO:
+        raise ValueError(MESSAGGI_ERRORE_CODICE_FISCALE[codice_errore])
+    return data_nascita, sesso
+
+
+def _decodifica_segmento_data(segmento, oggi):
+    """Come `_decodifica_data_nascita`, restituendo un codice di errore invece di sollevare.
+
+    Returns:
+        tuple[int, date | None, str | None]: `CODICE_FISCALE_VALIDO`, `ERRORE_MESE` o `ERRORE_GIORNO`,
+        data di nascita e sesso (None in caso di errore).
+    """
+    mese = CONVERSIONE_LETTERA_MESE.get(segmento[2])
+    if mese is None:
+        return ERRORE_MESE, None, None
+    giorno = int(segmento[3:])
+    sesso = "F" if giorno > VAL_SOMMARE_GIORNO_FEMM else "M"
+    if sesso == "F":
+        giorno -= VAL_SOMMARE_GIORNO_FEMM
+    data_nascita = _deduci_data_nascita(int(segmento[:2]), mese, giorno, oggi)
+    if data_nascita is None:
+        return ERRORE_GIORNO, None, None
+    return CODICE_FISCALE_VALIDO, data_nascita, sesso
+
+
+def _deduci_data_nascita(anno, mese, giorno, oggi):
+    """Restituisce la data più recente, non successiva a `oggi`, con l'anno a due cifre indicato.
+
+    Returns:
+        date | None: Data di nascita, o None se giorno e mese non formano una data esistente.
+    """
+    for secolo in (2000, 1900):
+        try:
+            data_nascita = date(secolo + anno, mese, giorno)
+        except ValueError:
+            continue
+        if data_nascita <= oggi:
+            return data_nascita
+    return None
+
+
 ###########################
 # FUNZIONI DI VALIDAZIONE #
 ###########################
 def is_valido_codice_fiscale(codice_fiscale: str) -> bool:
     """Valida se il codice fiscale ha un formato corretto, il carattere di controllo è valido e le sezioni rispettano i requisiti specifici.
 
+    I codici omocodici sono accettati: le lettere `LETTERE_OMOCODIA` nelle posizioni numeriche
+    vengono riconvertite in cifre prima dei controlli, mentre il carattere di controllo è
+    verificato sul codice così come è stato fornito.
+
     Args:
         codice_fiscale (str): Codice fiscale da verificare.
 
@@ -143,37 +576,158 @@ def is_valido_codice_fiscale(codice_fiscale: str) -> bool:
     Raises:
         ValueError: Se il codice fiscale è malformato o non valido.
     """
-    # Controllo lunghezza
-    if len(codice_fiscale) != 16:
-        raise ValueError("Codice fiscale non valido. Deve essere lungo 16 caratteri.")
+    codice_errore = (_codice_errore_strumentato(codice_fiscale) if strumentazione.attiva
+                     else codice_errore_codice_fiscale(codice_fiscale))
+    if codice_errore != CODICE_FISCALE_VALIDO:
+        raise ValueError(MESSAGGI_ERRORE_CODICE_FISCALE[codice_errore])
+    return True
+
 
-    # Normalizzazione in maiuscolo per sicurezza
+def codice_errore_codice_fiscale(codice_fiscale):
+    """Valida il codice fiscale in un solo passaggio, restituendo un codice di errore invece di sollevare.
+
+    I 16 caratteri sono letti una sola volta tramite le tabelle per posizione `_CARATTERI_AMMESSI_POSIZIONE`,
+    che danno per ogni carattere ammesso (maiuscolo o minuscolo) il valore per il carattere di
+    controllo e il carattere normalizzato (senza omocodia); la somma di controllo è calcolata nello
+    stesso passaggio. I controlli e il codice restituito seguono lo stesso ordine di
+    `is_valido_codice_fiscale`; i caratteri non ASCII non sono ammessi in nessuna posizione.
+
+    I controlli sono divisi nelle fasi `_verifica_formato`, `_verifica_giorno`,
+    `_verifica_codice_catastale` e `_verifica_carattere_controllo`, condivise con la validazione
+    strumentata (`_codice_errore_strumentato`), che ne misura la durata.
+
+    Args:
+        codice_fiscale (str): Codice fiscale da verificare.
+
+    Returns:
+        int: `CODICE_FISCALE_VALIDO` o una delle costanti `ERRORE_*` (messaggio in `MESSAGGI_ERRORE_CODICE_FISCALE`).
+    """
+    codice_errore, somma, normalizzati = _verifica_formato(codice_fiscale)
+    return (codice_errore
+            or _verifica_giorno(normalizzati)
+            or _verifica_codice_catastale(normalizzati)
+            or _verifica_carattere_controllo(codice_fiscale, somma))
+
+
+def _codice_errore_codice_fiscale_riferimento(codice_fiscale):
+    """Validazione a più passaggi (implementazione precedente), usata come riferimento nei test e nei benchmark.
+
+    Args:
+        codice_fiscale (str): Codice fiscale di soli caratteri ASCII da verificare.
+
+    Returns:
+        int: `CODICE_FISCALE_VALIDO` o una delle costanti `ERRORE_*`.
+    """
+    if len(codice_fiscale) != 16:
+        return ERRORE_LUNGHEZZA
     codice_fiscale = codice_fiscale.upper()
+    codice_base = _normalizza_posizioni_omocodia(codice_fiscale[:15])
+    if not codice_fiscale[:3].isalpha():
+        return ERRORE_COGNOME
+    if not codice_fiscale[3:6].isalpha():
+        return ERRORE_NOME
+    if not codice_base[6:8].isdigit():
+        return ERRORE_ANNO
+    if not codice_fiscale[8].isalpha():
+        return ERRORE_MESE
+    if not (codice_base[9:11].isdigit() and (1 <= int(codice_base[9:11]) <= 71)):
+        return ERRORE_GIORNO
+    if _denominazione_codice_catastale(codice_base[11:15]) is None:
+        return ERRORE_CODICE_CATASTALE
+    if calcola_carattere_controllo(codice_fiscale[:15]) != codice_fiscale[-1]:
+        return ERRORE_CARATTERE_CONTROLLO
+    return CODICE_FISCALE_VALIDO
+
+
+def _codice_errore_strumentato(codice_fiscale):
+    """Come `codice_errore_codice_fiscale`, registrando in `strumentazione` la durata per fase e la causa degli errori.
+
+    Esegue le stesse fasi di `codice_errore_codice_fiscale`: "formato" (lunghezza e caratteri ammessi
+    per posizione, con la somma di controllo), "data" (giorno), "comune" (codice catastale) e
+    "carattere_controllo"; dopo il primo errore le fasi successive non vengono eseguite.
+    """
+    with strumentazione.Cronometro(OPERAZIONE_VALIDA) as cronometro:
+        codice_errore, somma, normalizzati = cronometro.esegui("formato", _verifica_formato, codice_fiscale)
+        codice_errore = (codice_errore
+                         or cronometro.esegui("data", _verifica_giorno, normalizzati)
+                         or cronometro.esegui("comune", _verifica_codice_catastale, normalizzati)
+                         or cronometro.esegui("carattere_controllo", _verifica_carattere_controllo,
+                                              codice_fiscale, somma))
+    if codice_errore != CODICE_FISCALE_VALIDO:
+        strumentazione.registra_errore(OPERAZIONE_VALIDA, CAUSE_ERRORE_CODICE_FISCALE[codice_errore])
+    return codice_errore
 
-    # Controllo formato specifico per ciascun gruppo di caratteri
-    if not (codice_fiscale[:3].isalpha()):
-        raise ValueError("Codice fiscale non valido. Posizioni 1-3 devono essere lettere per cognome (RSS per ROSSI).")
-    if not (codice_fiscale[3:6].isalpha()):
-        raise ValueError("Codice fiscale non valido. Posizioni 4-6 devono essere lettere per nome (MRA per MARIO).")
-    if not (codice_fiscale[6:8].isdigit()):
-        raise ValueError("Codice fiscale non valido. Posizioni 7-8 devono essere numeri per anno (98 per 1998)")
-    if not (codice_fiscale[8].isalpha()):
-        raise ValueError("Codice fiscale non valido. Posizione 9 deve essere una lettere per mese (A per GENNAIO)")
-    if not (codice_fiscale[9:11].isdigit() and (1 <= int(codice_fiscale[9:11]) <= 71)):
-        raise ValueError("Codice fiscale non valido. Posizioni 10-11 devono rappresentare un numero tra 01 e 71 "
-                         "per giorno (01 per 01 se maschio, 41 per 01 se femmina)")
-    if not (codice_fiscale[11:15] in COMUNI_E_STATI_COD_CATASTALI.values()):
-        raise ValueError("Codice fiscale non valido. Posizioni 12-15 devono rappresentare un valido codice catastale "
-                         "di un luogo geograficico (H501 per ROMA).")
-
-    # Verifica il carattere di controllo
-    codifica_senza_carattere_controllo = codice_fiscale[:15]
-    carattere_controllo = codice_fiscale[-1]
-    carattere_controllo_calcolato = calcola_carattere_controllo(codifica_senza_carattere_controllo)
-    if carattere_controllo_calcolato != carattere_controllo:
-        raise ValueError("Codice fiscale non valido. Il carattere di controllo non corrisponde.")
 
-    return True
+def _verifica_formato(codice_fiscale):
+    """Fase "formato" della validazione: lunghezza e caratteri ammessi per posizione, in un solo passaggio.
+
+    Returns:
+        tuple[int, int, list[str]]: Codice di errore (`CODICE_FISCALE_VALIDO` se le posizioni fino al
+        giorno sono ammesse), somma di controllo e caratteri normalizzati letti.
+    """
+    if len(codice_fiscale) != 16:
+        return ERRORE_LUNGHEZZA, 0, []
+    somma = 0
+    normalizzati = []
+    for ammessi, carattere in zip(_CARATTERI_AMMESSI_POSIZIONE, codice_fiscale):
+        voce = ammessi.get(carattere)
+        if voce is None:
+            break  # posizione del primo carattere non ammesso: len(normalizzati)
+        somma += voce[0]
+        normalizzati.append(voce[1])
+    # Il giorno si controlla prima dei caratteri del codice catastale, come in is_valido_codice_fiscale
+    if len(normalizzati) < POSIZIONE_FINE_GIORNO:
+        return _ERRORI_POSIZIONE[len(normalizzati)], somma, normalizzati
+    return CODICE_FISCALE_VALIDO, somma, normalizzati
+
+
+def _verifica_giorno(normalizzati):
+    """Fase "data" della validazione: il giorno deve essere tra 01 e 71."""
+    return CODICE_FISCALE_VALIDO if 1 <= int(normalizzati[9] + normalizzati[10]) <= 71 else ERRORE_GIORNO
+
+
+def _verifica_codice_catastale(normalizzati):
+    """Fase "comune" della validazione: il codice catastale deve esistere."""
+    if len(normalizzati) < 15 or _denominazione_codice_catastale("".join(normalizzati[11:])) is None:
+        return ERRORE_CODICE_CATASTALE
+    return CODICE_FISCALE_VALIDO
+
+
+def _verifica_carattere_controllo(codice_fiscale, somma):
+    """Fase "carattere_controllo" della validazione: confronto con la somma calcolata da `_verifica_formato`."""
+    if CONVERSIONE_CARATTERE_CONTROLLO[somma % VAL_MODULO_CARATTERE_CONTROLLO] != codice_fiscale[15].upper():
+        return ERRORE_CARATTERE_CONTROLLO
+    return CODICE_FISCALE_VALIDO
+
+
+def _crea_caratteri_ammessi_posizione():
+    """Per ciascuna delle prime 15 posizioni: carattere ammesso -> (valore per il controllo, carattere normalizzato).
+
+    Le posizioni di cognome, nome e mese ammettono le lettere; quelle numeriche le cifre e le lettere
+    di omocodia, normalizzate in cifre; la prima del codice catastale lettere e cifre (l'esistenza
+    del codice è verificata a parte). Il valore per il controllo è quello del carattere fornito.
+    """
+    cifre = {cifra: cifra for cifra in string.digits}
+    omocodia = {lettera: cifra for lettera, cifra in zip(LETTERE_OMOCODIA, string.digits)}
+    lettere = {lettera: lettera for lettera in string.ascii_uppercase}
+    tabelle = []
+    for posizione in range(15):
+        if posizione in POSIZIONI_OMOCODIA:
+            ammessi = cifre | omocodia
+        elif posizione == POSIZIONE_INIZIO_CODICE_CATASTALE:
+            ammessi = cifre | lettere
+        else:
+            ammessi = lettere
+        indice_valore = 1 if posizione % 2 == 0 else 0  # le posizioni dispari (1a, 3a, ...) hanno indice pari
+        tabella = {}
+        for carattere, normalizzato in ammessi.items():
+            tabella[carattere] = tabella[carattere.lower()] = (
+                CONVERSIONE_CARATTERI_PARI_DISPARI[carattere][indice_valore], normalizzato)
+        tabelle.append(tabella)
+    return tuple(tabelle)
+
+
+_CARATTERI_AMMESSI_POSIZIONE = _crea_caratteri_ammessi_posizione()
 
 
 
@@ -230,29 +784,62 @@ def valida_sesso(sesso: str) -> str:
     return sesso.upper()
 
 
-def valida_data_nascita(data_nascita):
+def valida_data_nascita(data_nascita, oggi=None):
     """Valida la data di nascita, verificando il formato e che sia antecedente alla data odierna.
 
     Args:
-        data_nascita (str): Data di nascita in formato GG/MM/AAAA.
+        data_nascita (str | date): Data di nascita in formato GG/MM/AAAA o AAAA-MM-GG, oppure oggetto `date`.
+        oggi (date, optional): Data odierna da usare per il confronto. Default a `date.today()`.
 
     Returns:
-        str: Data di nascita validata e formattata.
+        str: Data di nascita validata e formattata come GG/MM/AAAA.
 
     Raises:
         ValueError: Se il formato è errato o la data è futura.
     """
-    try:
-        data_nascita = datetime.strptime(data_nascita, "%d/%m/%Y").date()
-    except ValueError:
-        raise ValueError("Data di nascita non valida. Il formato deve essere del tipo 'DD/MM/YYYY'.")
+    data_nascita = _converti_data_nascita(data_nascita, oggi)
+    return f"{data_nascita.day:02d}/{data_nascita.month:02d}/{data_nascita.year:04d}"
+
+
+def _converti_data_nascita(data_nascita, oggi=None):
+    """Converte e valida la data di nascita, senza passare da `strptime` per i formati canonici.
+
+    Le stringhe GG/MM/AAAA e AAAA-MM-GG di 10 cifre e separatori vengono lette direttamente come interi;
+    le altre (ad es. '1/1/1985') passano da `strptime`, che ne stabilisce la validità come in precedenza.
+
+    Args:
+        data_nascita (str | date): Data di nascita da convertire.
+        oggi (date, optional): Data odierna da usare per il confronto. Default a `date.today()`.
+
+    Returns:
+        date: Data di nascita validata.
+
+    Raises:
+        ValueError: Se il formato è errato, la data non esiste o è fuori dall'intervallo ammesso.
+    """
+    if isinstance(data_nascita, datetime):
+        data_nascita = data_nascita.date()
+    elif not isinstance(data_nascita, date):
+        data_nascita = _leggi_data(data_nascita)
 
-    if data_nascita > date.today():
+    if data_nascita > (oggi or date.today()):
         raise ValueError("Data di nascita non valida. Deve essere antecedente alla data odierna.")
-    elif data_nascita < datetime(1900, 1, 1).date():
+    elif data_nascita < DATA_MINIMA:
         raise ValueError("Data di nascita non valida. Sono valide solo le date che partono dal 01/01/1900.")
+    return data_nascita
+
 
-    return data_nascita.strftime("%d/%m/%Y")
+def _leggi_data(stringa):
+    """Legge una data GG/MM/AAAA o AAAA-MM-GG, con `strptime` come ripiego per le forme non canoniche."""
+    try:
+        if len(stringa) == 10 and stringa.isascii():
+            if stringa[2] == stringa[5] == "/" and (cifre := stringa[:2] + stringa[3:5] + stringa[6:]).isdigit():
+                return date(int(cifre[4:]), int(cifre[2:4]), int(cifre[:2]))
+            if stringa[4] == stringa[7] == "-" and (cifre := stringa[:4] + stringa[5:7] + stringa[8:]).isdigit():
+                return date(int(cifre[:4]), int(cifre[4:6]), int(cifre[6:]))
+        return datetime.strptime(stringa, "%d/%m/%Y").date()
+    except ValueError:
+        raise ValueError("Data di nascita non valida. Il formato deve essere del tipo 'DD/MM/YYYY'.")
 
 
 def valida_comune(comune):
@@ -268,6 +855,6 @@ def valida_comune(comune):
         ValueError: Se il comune non esiste nel database.
     """
     comune = comune.upper()
-    if comune not in COMUNI_E_STATI_COD_CATASTALI:
+    if tabella_codici_catastali().codice_catastale(comune) is None:
         raise ValueError("Comune/Stato non valido. Deve essere presente un comune o uno stato estero esistente.")
     return comune
@@ -0,0 +1,367 @@
+import sqlite3
+import time
+from collections.abc import Mapping
+from datetime import date
+from source.batch import CAMPI_ANAGRAFICA, CAMPO_PROVINCIA, ErroreCodiceFiscale, _genera_codice_fiscale_o_errore
+from source.codice_fiscale import (_converti_data_nascita, calcola_carattere_controllo, codifica_comune,
+                                   codifica_data_nascita, valida_cognome, valida_nome, valida_sesso)
+from source.parallelo import DIMENSIONE_CHUNK_PREDEFINITA, suddividi_in_chunk
+from source.tabella_date import tabella_segmenti_data
+from source.tabelle import tabella_codici_catastali
+from source.utils import _estrai_caratteri
+
+
+############
+# COSTANTI #
+############
+DIMENSIONE_CACHE_DISCO_PREDEFINITA = 1_000_000
+MASSIMO_CHIAVI_IN_MEMORIA = 1_000_000
+MASSIMO_PARAMETRI_SQLITE = 500  # chiavi per interrogazione, sotto il limite di variabili di SQLite
+SEPARATORE_CHIAVE = "|"         # non ammesso in nomi e cognomi validati
+
+
+###########################
+# CACHE SU DISCO (SQLITE) #
+###########################
+class CacheCodiciFiscaliSqlite:
+    """Cache persistente chiave canonica -> codice fiscale, limitata a `dimensione_massima` voci.
+
+    La chiave canonica (vedi `GeneratoreDeduplicato`) determina da sola il codice fiscale, quindi le
+    voci restano valide tra un'esecuzione e l'altra anche se le tabelle vengono aggiornate. Oltre la
+    dimensione massima vengono rimosse le voci usate meno di recente.
+
+    Attributes:
+        percorso (str): File del database SQLite.
+        dimensione_massima (int): Numero massimo di voci conservate.
+    """
+
+    def __init__(self, percorso, dimensione_massima=DIMENSIONE_CACHE_DISCO_PREDEFINITA):
+        if dimensione_massima < 1:
+            raise ValueError("La dimensione della cache su disco deve essere maggiore di zero.")
+        self.percorso = percorso
+        self.dimensione_massima = dimensione_massima
+        self._connessione = sqlite3.connect(percorso)
+        with self._connessione:
+            self._connessione.execute("CREATE TABLE IF NOT EXISTS codici_fiscali ("
+                                      "chiave TEXT PRIMARY KEY, codice_fiscale TEXT NOT NULL, "
+                                      "ultimo_uso INTEGER NOT NULL)")
+            self._connessione.execute("CREATE INDEX IF NOT EXISTS codici_fiscali_ultimo_uso "
+                                      "ON codici_fiscali (ultimo_uso)")
+        # Contatore monotono degli accessi, più affidabile dell'orologio per l'ordine LRU
+        self._ultimo_uso, self._numero_voci = self._connessione.execute(
+            "SELECT COALESCE(MAX(ultimo_uso), 0), COUNT(*) FROM codici_fiscali").fetchone()
+
+    def cerca(self, chiavi):
+        """Restituisce i codici fiscali memorizzati per le chiavi indicate, aggiornandone l'ultimo uso.
+
+        Args:
+            chiavi (Iterable[str]): Chiavi canoniche.
+
+        Returns:
+            dict[str, str]: Chiave -> codice fiscale, solo per le chiavi presenti.
+        """
+        trovati = {}
+        for gruppo in suddividi_in_chunk(chiavi, MASSIMO_PARAMETRI_SQLITE):
+            segnaposto = ",".join("?" * len(gruppo))
+            trovati.update(self._connessione.execute(
+                f"SELECT chiave, codice_fiscale FROM codici_fiscali WHERE chiave IN ({segnaposto})", gruppo))
+        if trovati:
+            self._ultimo_uso += 1
+            with self._connessione:
+                self._connessione.executemany("UPDATE codici_fiscali SET ultimo_uso = ? WHERE chiave = ?",
+                                              ((self._ultimo_uso, chiave) for chiave in trovati))
+        return trovati
+
+    def salva(self, codici_fiscali):
+        """Memorizza nuovi codici fiscali, rimuovendo le voci meno recenti oltre la dimensione massima.
+
+        Args:
+            codici_fiscali (Mapping[str, str]): Chiave canonica -> codice fiscale.
+        """
+        if not codici_fiscali:
+            return
+        self._ultimo_uso += 1
+        with self._connessione:
+            # Una chiave già presente ha lo stesso codice fiscale: viene ignorata e non altera il conteggio
+            self._numero_voci += self._connessione.executemany(
+                "INSERT OR IGNORE INTO codici_fiscali (chiave, codice_fiscale, ultimo_uso) VALUES (?, ?, ?)",
+                ((chiave, codice, self._ultimo_uso) for chiave, codice in codici_fiscali.items())).rowcount
+            eccedenza = self._numero_voci - self.dimensione_massima
+            if eccedenza > 0:
+                self._numero_voci -= self._connessione.execute(
+                    "DELETE FROM codici_fiscali WHERE chiave IN (SELECT chiave FROM codici_fiscali "
+                    "ORDER BY ultimo_uso LIMIT ?)", (eccedenza,)).rowcount
+
+    def chiudi(self):
+        self._connessione.close()
+
+    def __len__(self):
+        return self._numero_voci
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.chiudi()
+
+
+##########################
+# GENERATORE DEDUPLICATO #
+##########################
+class GeneratoreDeduplicato:
+    """Genera i codici fiscali calcolando una sola volta ciascuna anagrafica distinta.
+
+    Ogni riga viene prima cercata per valori grezzi normalizzati senza validarli (vedi
+    `_chiave_valori`, ad es. "rossi"/"ROSSI" o "roma"/"Roma"): i duplicati di questo tipo, che
+    sono il caso più comune, saltano validazione, lettura della data e ricerca del comune. Le
+    altre righe vengono validate e ridotte alla chiave canonica (cognome e nome normalizzati con
+    `_formatta_stringa`, sesso, data di nascita convertita e codice catastale risolto alla data),
+    così anche "Rossi "/"ROSSI" o "01/01/1985"/"1985-01-01" coincidono; per queste il risparmio
+    si limita all'estrazione dei caratteri, alla codifica della data e al carattere di controllo.
+    Le chiavi nuove di un blocco sono cercate nella cache su disco, se presente, e le restanti
+    calcolate una volta e distribuite a tutte le righe duplicate. Le righe non valide producono
+    lo stesso `ErroreCodiceFiscale` di `genera_codici_fiscali`.
+
+    Le chiavi in memoria sono svuotate oltre `massimo_chiavi` e quando la tabella dei codici
+    catastali o la data odierna cambiano.
+
+    Attributes:
+        cache (CacheCodiciFiscaliSqlite | None): Cache persistente opzionale.
+        massimo_chiavi (int): Numero massimo di chiavi mantenute in memoria.
+    """
+
+    def __init__(self, cache=None, massimo_chiavi=MASSIMO_CHIAVI_IN_MEMORIA):
+        self.cache = cache
+        self.massimo_chiavi = massimo_chiavi
+        self._per_valori = {}
+        self._per_chiave = {}
+        self._tabella = None
+        self._oggi = None
+        self._statistiche = {
+            "righe": 0,
+            "calcolate": 0,
+            "da_cache_disco": 0,
+            "riutilizzate": 0,
+            "secondi_calcolo": 0.0,
+            "secondi_sovraccarico": 0.0,
+            "secondi_cache_disco": 0.0,
+        }
+
+    def genera(self, anagrafiche, dimensione_blocco=DIMENSIONE_CHUNK_PREDEFINITA):
+        """Genera in modo lazy i codici fiscali, nello stesso ordine e formato di `genera_codici_fiscali`.
+
+        Args:
+            anagrafiche (Iterable[Mapping | Sequence]): Anagrafiche da codificare.
+            dimensione_blocco (int, optional): Righe elaborate insieme (una consultazione della cache per blocco).
+
+        Yields:
+            str | ErroreCodiceFiscale: Codice fiscale generato oppure errore strutturato.
+        """
+        for blocco in suddividi_in_chunk(anagrafiche, dimensione_blocco):
+            yield from self.genera_blocco(blocco)
+
+    def genera_blocco(self, anagrafiche):
+        """Genera i codici fiscali di un blocco di anagrafiche.
+
+        Args:
+            anagrafiche (list[Mapping | Sequence]): Anagrafiche da codificare.
+
+        Returns:
+            list[str | ErroreCodiceFiscale]: Risultati nello stesso ordine delle anagrafiche.
+        """
+        oggi = date.today()
+        segmenti_data = tabella_segmenti_data()
+        self._controlla_validita(oggi)
+        statistiche = self._statistiche
+        statistiche["righe"] += len(anagrafiche)
+
+        risultati = [None] * len(anagrafiche)
+        chiavi_valori = [None] * len(anagrafiche)
+        da_calcolare = {}  # chiave canonica -> (componenti canoniche, posizioni delle righe, secondi)
+        in_sospeso = {}    # valori normalizzati -> chiave canonica, per i duplicati all'interno del blocco
+        for posizione, anagrafica in enumerate(anagrafiche):
+            inizio = time.perf_counter()
+            valori = _chiave_valori(anagrafica)
+            if valori is None:  # riga malformata o con valori non hashable: errore strutturato, non memorizzato
+                risultati[posizione] = _genera_codice_fiscale_o_errore(anagrafica, oggi, segmenti_data)
+                statistiche["calcolate"] += 1
+                statistiche["secondi_calcolo"] += time.perf_counter() - inizio
+                continue
+            risultato = self._per_valori.get(valori)
+            if risultato is not None:
+                risultati[posizione] = risultato
+                statistiche["riutilizzate"] += 1
+                statistiche["secondi_sovraccarico"] += time.perf_counter() - inizio
+                continue
+            if valori in in_sospeso:
+                da_calcolare[in_sospeso[valori]][1].append(posizione)
+                chiavi_valori[posizione] = valori
+                statistiche["riutilizzate"] += 1
+                statistiche["secondi_sovraccarico"] += time.perf_counter() - inizio
+                continue
+
+            componenti = _componenti_canoniche(valori, oggi)
+            if componenti is None:  # riga non valida: errore strutturato dal percorso di batch
+                risultati[posizione] = self._per_valori[valori] = _genera_codice_fiscale_o_errore(
+                    valori, oggi, segmenti_data)
+                statistiche["calcolate"] += 1
+                statistiche["secondi_calcolo"] += time.perf_counter() - inizio
+                continue
+            chiavi_valori[posizione] = valori
+            chiave = _chiave_canonica(componenti)
+            if chiave in self._per_chiave:
+                risultati[posizione] = self._per_valori[valori] = self._per_chiave[chiave]
+                statistiche["riutilizzate"] += 1
+                statistiche["secondi_sovraccarico"] += time.perf_counter() - inizio
+            elif chiave in da_calcolare:
+                da_calcolare[chiave][1].append(posizione)
+                in_sospeso[valori] = chiave
+                statistiche["riutilizzate"] += 1
+                statistiche["secondi_sovraccarico"] += time.perf_counter() - inizio
+            else:
+                # Il tempo della canonicalizzazione è attribuito solo dopo aver consultato la cache su disco
+                da_calcolare[chiave] = (componenti, [posizione], time.perf_counter() - inizio)
+                in_sospeso[valori] = chiave
+
+        if da_calcolare:
+            self._risolvi(da_calcolare, oggi, segmenti_data)
+            for chiave, (_, posizioni, _) in da_calcolare.items():
+                codice_fiscale = self._per_chiave[chiave]
+                for posizione in posizioni:
+                    risultati[posizione] = self._per_valori[chiavi_valori[posizione]] = codice_fiscale
+        return risultati
+
+    def statistiche(self):
+        """Restituisce le statistiche della deduplicazione.
+
+        Il tempo risparmiato è una stima: righe non calcolate per il costo medio di una riga
+        calcolata, meno il tempo speso per riconoscere i duplicati (comprese le canonicalizzazioni
+        delle righe servite dalla cache su disco) e per consultare la cache su disco.
+
+        Returns:
+            dict: Righe elaborate, calcolate, lette dalla cache su disco e riutilizzate,
+            rapporto di deduplicazione (righe per calcolo) e tempi in secondi.
+        """
+        statistiche = dict(self._statistiche)
+        calcoli = statistiche["calcolate"] + statistiche["da_cache_disco"]
+        statistiche["rapporto_deduplicazione"] = statistiche["righe"] / calcoli if calcoli else 1.0
+        costo_medio = statistiche["secondi_calcolo"] / statistiche["calcolate"] if statistiche["calcolate"] else 0.0
+        statistiche["secondi_risparmiati_stimati"] = (
+            (statistiche["righe"] - statistiche["calcolate"]) * costo_medio
+            - statistiche["secondi_sovraccarico"] - statistiche["secondi_cache_disco"])
+        return statistiche
+
+    def _controlla_validita(self, oggi):
+        """Svuota le chiavi in memoria se la tabella dei codici catastali, la data odierna o il limite cambiano."""
+        tabella = tabella_codici_catastali()
+        if (tabella is not self._tabella or oggi != self._oggi
+                or len(self._per_valori) > self.massimo_chiavi or len(self._per_chiave) > self.massimo_chiavi):
+            self._per_valori.clear()
+            self._per_chiave.clear()
+            self._tabella, self._oggi = tabella, oggi
+
+    def _risolvi(self, da_calcolare, oggi, segmenti_data):
+        """Legge dalla cache su disco o calcola i codici fiscali delle chiavi nuove di un blocco."""
+        statistiche = self._statistiche
+        if self.cache is not None:
+            inizio = time.perf_counter()
+            trovati = self.cache.cerca(list(da_calcolare))
+            statistiche["secondi_cache_disco"] += time.perf_counter() - inizio
+            statistiche["da_cache_disco"] += len(trovati)
+            statistiche["secondi_sovraccarico"] += sum(da_calcolare[chiave][2] for chiave in trovati)
+            self._per_chiave.update(trovati)
+
+        nuovi = {}
+        inizio = time.perf_counter()
+        for chiave, (componenti, _, secondi_canonicalizzazione) in da_calcolare.items():
+            if chiave not in self._per_chiave:
+                nuovi[chiave] = self._per_chiave[chiave] = _codifica_componenti(componenti, oggi, segmenti_data)
+                statistiche["secondi_calcolo"] += secondi_canonicalizzazione
+        if nuovi:
+            statistiche["calcolate"] += len(nuovi)
+            statistiche["secondi_calcolo"] += time.perf_counter() - inizio
+
+        if self.cache is not None and nuovi:
+            inizio = time.perf_counter()
+            self.cache.salva(nuovi)
+            statistiche["secondi_cache_disco"] += time.perf_counter() - inizio
+
+
+def genera_codici_fiscali_deduplicati(anagrafiche, cache=None):
+    """Genera i codici fiscali come `genera_codici_fiscali`, calcolando una volta ogni anagrafica distinta.
+
+    Args:
+        anagrafiche (Iterable[Mapping | Sequence]): Anagrafiche da codificare.
+        cache (CacheCodiciFiscaliSqlite, optional): Cache persistente tra le esecuzioni.
+
+    Yields:
+        str | ErroreCodiceFiscale: Codice fiscale generato oppure errore strutturato.
+    """
+    yield from GeneratoreDeduplicato(cache).genera(anagrafiche)
+
+
+def _chiave_valori(anagrafica):
+    """Restituisce i valori dell'anagrafica, normalizzati senza validarli, come chiave di ricerca.
+
+    Si normalizza solo ciò che non può cambiare l'esito della generazione: il maiuscolo di cognome,
+    nome e sesso ASCII (lunghezza e caratteri ammessi restano invariati, e la validazione li porta
+    comunque in maiuscolo) e il maiuscolo del comune, come in `valida_comune`. La provincia
+    facoltativa è conservata così com'è.
+
+    Returns:
+        tuple | None: Valori nell'ordine di `CAMPI_ANAGRAFICA` seguiti dalla provincia, o None se la
+        riga non ha cinque o sei valori o contiene valori non hashable.
+    """
+    try:
+        if isinstance(anagrafica, Mapping):
+            cognome, nome, sesso, data_nascita, comune, provincia = (
+                anagrafica.get(campo) for campo in (*CAMPI_ANAGRAFICA, CAMPO_PROVINCIA))
+        else:
+            cognome, nome, sesso, data_nascita, comune, *provincia = anagrafica
+            provincia, = provincia or (None,)
+        valori = (_maiuscolo_ascii(cognome), _maiuscolo_ascii(nome), _maiuscolo_ascii(sesso), data_nascita,
+                  comune.upper() if isinstance(comune, str) else comune, provincia)
+        hash(valori)
+    except (ValueError, TypeError):
+        return None
+    return valori
+
+
+def _maiuscolo_ascii(valore):
+    return valore.upper() if isinstance(valore, str) and valore.isascii() else valore
+
+
+def _componenti_canoniche(valori, oggi):
+    """Valida e normalizza i valori di un'anagrafica, restituendo None se non è valida.
+
+    Returns:
+        tuple[str, str, str, date, str] | None: Cognome e nome normalizzati, sesso, data di nascita
+        e codice catastale valido alla data.
+    """
+    try:
+        cognome, nome, sesso, data_nascita, comune, provincia = valori
+        cognome = valida_cognome(cognome)
+        nome = valida_nome(nome)
+        sesso = valida_sesso(sesso)
+        data_nascita = _converti_data_nascita(data_nascita, oggi)
+        return cognome, nome, sesso, data_nascita, codifica_comune(comune, data_nascita, provincia)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def _chiave_canonica(componenti):
+    cognome, nome, sesso, data_nascita, codice_catastale = componenti
+    return SEPARATORE_CHIAVE.join((cognome, nome, sesso, data_nascita.isoformat(), codice_catastale))
+
+
+def _codifica_componenti(componenti, oggi, segmenti_data):
+    """Calcola il codice fiscale a partire dalle componenti canoniche già validate."""
+    cognome, nome, sesso, data_nascita, codice_catastale = componenti
+    codifica_senza_carattere_controllo = "".join([
+        _estrai_caratteri(cognome),
+        _estrai_caratteri(nome, is_nome=True),
+        codifica_data_nascita(data_nascita, sesso, oggi, segmenti_data),
+        codice_catastale,
+    ])
+    return "".join([codifica_senza_carattere_controllo,
+                    calcola_carattere_controllo(codifica_senza_carattere_controllo)])
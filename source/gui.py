@@ -1,48 +1,187 @@
 import customtkinter as ctk
-from tkinter import messagebox
+from tkinter import filedialog, messagebox
 from datetime import datetime
 from codice_fiscale import (genera_codice_fiscale, valida_cognome, valida_nome,
                             valida_sesso, valida_data_nascita, valida_comune)
 from source.codice_fiscale import is_valido_codice_fiscale
-
-
+from source.lavoratore import LavoratoreSfondo, valida_file_codici_fiscali
+from source.ricerca_comuni import indice_comuni, suggerisci_comuni
+
+
+############
+# COSTANTI #
+############
+INTERVALLO_POLLING_MS = 50
+
+lavoratore = None
+lavoratore_suggerimenti = None  # separato, così i suggerimenti non attendono la validazione di un file
+compito_file = None
+compito_suggerimenti = None
+
+
+#####################
+# CALCOLI IN SFONDO #
+#####################
+def _calcola_codice_fiscale(cognome, nome, sesso, data_nascita, comune):
+    """Valida i dati e genera il codice fiscale; eseguita nel thread del lavoratore."""
+    cognome = valida_cognome(cognome)
+    nome = valida_nome(nome)
+    valida_data_nascita(data_nascita)
+    comune = valida_comune(comune)
+    return genera_codice_fiscale(
+        cognome=cognome,
+        nome=nome,
+        sesso=sesso,
+        data_nascita=data_nascita,
+        comune=comune
+    )
+
+
+def _verifica_codice_fiscale(codice_fiscale):
+    """Valida il codice fiscale; eseguita nel thread del lavoratore."""
+    return is_valido_codice_fiscale(codice_fiscale)
+
+
+########################
+# CALLBACK INTERFACCIA #
+########################
 def genera_codice():
-    """Genera il codice fiscale basato sui dati dell'interfaccia grafica."""
-    try:
-        cognome = valida_cognome(entry_cognome.get())
-        nome = valida_nome(entry_nome.get())
-        sesso = "M" if combo_sesso.get() == "Maschio" else "F"
-        giorno = combo_giorno.get().zfill(2)
-        mese = combo_mese.get().zfill(2)
-        anno = combo_anno.get()
-        data_nascita = f"{giorno}/{mese}/{anno}"
-        valida_data_nascita(data_nascita)
-        comune = valida_comune(entry_comune.get())
-        codice_fiscale = genera_codice_fiscale(
-            cognome=cognome,
-            nome=nome,
-            sesso=sesso,
-            data_nascita=data_nascita,
-            comune=comune
-        )
-        label_codice_fiscale.pack(anchor="w", padx=10)
-        entry_output.configure(state="normal")
-        entry_output.delete(0, ctk.END)
-        entry_output.insert(0, codice_fiscale)
-        entry_output.pack(pady=10, padx=10, fill="x")
-        entry_output.configure(state="readonly")
-    except ValueError as e:
-        messagebox.showerror("Errore di validazione", str(e))
+    """Genera in sfondo il codice fiscale basato sui dati dell'interfaccia grafica."""
+    # I widget vanno letti nel thread dell'interfaccia: al lavoratore passano solo i valori
+    sesso = "M" if combo_sesso.get() == "Maschio" else "F"
+    data_nascita = f"{combo_giorno.get().zfill(2)}/{combo_mese.get().zfill(2)}/{combo_anno.get()}"
+    btn_generare.configure(state="disabled")
+    lavoratore.invia(_calcola_codice_fiscale, entry_cognome.get(), entry_nome.get(), sesso, data_nascita,
+                     entry_comune.get(), al_completamento=mostra_codice_fiscale,
+                     in_caso_di_errore=mostra_errore_generazione)
+
+
+def mostra_codice_fiscale(codice_fiscale):
+    """Mostra il codice fiscale generato."""
+    btn_generare.configure(state="normal")
+    label_codice_fiscale.pack(anchor="w", padx=10)
+    entry_output.configure(state="normal")
+    entry_output.delete(0, ctk.END)
+    entry_output.insert(0, codice_fiscale)
+    entry_output.pack(pady=10, padx=10, fill="x")
+    entry_output.configure(state="readonly")
+
+
+def mostra_errore_generazione(errore):
+    """Mostra l'errore di validazione dei dati inseriti."""
+    btn_generare.configure(state="normal")
+    if not isinstance(errore, ValueError):
+        _mostra_errore_inatteso(errore)
+        return
+    messagebox.showerror("Errore di validazione", str(errore))
 
 
 def valida_codice():
-    """Valida il codice fiscale inserito dall'utente."""
-    codice_fiscale = entry_codice_validazione.get().upper()
+    """Valida in sfondo il codice fiscale inserito dall'utente."""
+    lavoratore.invia(_verifica_codice_fiscale, entry_codice_validazione.get().upper(),
+                     al_completamento=mostra_codice_valido, in_caso_di_errore=mostra_codice_non_valido)
+
+
+def mostra_codice_valido(_):
+    messagebox.showinfo("Risultato Validazione", "Codice Fiscale VALIDO")
+
+
+def mostra_codice_non_valido(errore):
+    if not isinstance(errore, ValueError):
+        _mostra_errore_inatteso(errore)
+        return
+    messagebox.showerror("Risultato Validazione", f"Codice Fiscale NON VALIDO: {errore}")
+
+
+def valida_file():
+    """Valida in sfondo i codici fiscali di un file di testo, uno per riga, mostrando l'avanzamento."""
+    global compito_file
+    percorso = filedialog.askopenfilename(title="Seleziona il file dei codici fiscali",
+                                          filetypes=[("File di testo", "*.txt *.csv"), ("Tutti i file", "*.*")])
+    if not percorso:
+        return
+    btn_valida_file.configure(state="disabled")
+    btn_annulla_file.pack(pady=(0, 10))
+    barra_progresso.set(0)
+    barra_progresso.pack(pady=5, padx=10, fill="x")
+    label_progresso.configure(text="Lettura del file...")
+    label_progresso.pack(anchor="w", padx=10)
+    compito_file = lavoratore.invia(valida_file_codici_fiscali, percorso, al_progresso=aggiorna_progresso_file,
+                                    al_completamento=mostra_riepilogo_file, in_caso_di_errore=mostra_errore_file)
+
+
+def annulla_validazione_file():
+    """Interrompe la validazione del file in corso."""
+    if compito_file is not None:
+        compito_file.annulla()
+    _ripristina_validazione_file("Validazione annullata.")
+
+
+def aggiorna_progresso_file(elaborati, totale):
+    barra_progresso.set(elaborati / totale if totale else 1)
+    label_progresso.configure(text=f"{elaborati} / {totale} codici verificati")
+
+
+def mostra_riepilogo_file(riepilogo):
+    """Mostra il numero di codici validi e non validi e i primi errori trovati."""
+    _ripristina_validazione_file(f"{riepilogo['validi']} validi, {riepilogo['non_validi']} non validi "
+                                 f"su {riepilogo['totale']} codici")
+    righe = [f"Codici verificati: {riepilogo['elaborati']}",
+             f"Validi: {riepilogo['validi']}",
+             f"Non validi: {riepilogo['non_validi']}"]
+    righe.extend(f"Riga {numero}: {codice} - {messaggio}" for numero, codice, messaggio in riepilogo["errori"])
+    messagebox.showinfo("Risultato Validazione File", "\n".join(righe))
+
+
+def mostra_errore_file(errore):
+    _ripristina_validazione_file("")
+    if not isinstance(errore, (OSError, UnicodeDecodeError)):
+        _mostra_errore_inatteso(errore)
+        return
+    messagebox.showerror("Errore di lettura", f"Impossibile leggere il file: {errore}")
+
+
+def _ripristina_validazione_file(testo):
+    global compito_file
+    compito_file = None
+    btn_valida_file.configure(state="normal")
+    btn_annulla_file.pack_forget()
+    label_progresso.configure(text=testo)
+
+
+def _mostra_errore_inatteso(errore):
+    """Mostra un errore non previsto senza sollevarlo nel thread di Tk, che interromperebbe il polling."""
+    messagebox.showerror("Errore inatteso", f"{type(errore).__name__}: {errore}")
+
+
+def elabora_eventi_lavoratore():
+    """Consegna all'interfaccia i risultati del lavoratore e si ripianifica con `root.after`.
+
+    La ripianificazione avviene in ogni caso, così un errore in una callback (o di un compito senza
+    gestore d'errore) non interrompe la consegna dei risultati successivi.
+    """
     try:
-        is_valido_codice_fiscale(codice_fiscale)
-        messagebox.showinfo("Risultato Validazione", "Codice Fiscale VALIDO")
-    except ValueError as e:
-        messagebox.showerror("Risultato Validazione", f"Codice Fiscale NON VALIDO: {e}")
+        lavoratore.elabora_eventi()
+        lavoratore_suggerimenti.elabora_eventi()
+    except Exception as errore:
+        _mostra_errore_inatteso(errore)
+    finally:
+        root.after(INTERVALLO_POLLING_MS, elabora_eventi_lavoratore)
+
+
+def aggiorna_suggerimenti_comune(event=None):
+    """Chiede in sfondo i comuni e gli stati simili al testo digitato; conta solo l'ultima richiesta."""
+    global compito_suggerimenti
+    if compito_suggerimenti is not None:
+        compito_suggerimenti.annulla()  # il risultato di un testo già superato non viene mostrato
+    compito_suggerimenti = lavoratore_suggerimenti.invia(suggerisci_comuni, entry_comune.get(),
+                                                         al_completamento=mostra_suggerimenti_comune,
+                                                         in_caso_di_errore=_mostra_errore_inatteso)
+
+
+def mostra_suggerimenti_comune(suggerimenti):
+    """Aggiorna l'elenco a tendina del luogo di nascita con i suggerimenti calcolati in sfondo."""
+    entry_comune.configure(values=suggerimenti)
 
 
 def switch_to_generazione():
@@ -61,7 +200,8 @@ def avvia_gui():
     """Configura e avvia l'interfaccia grafica."""
     global entry_cognome, entry_nome, combo_sesso, combo_giorno, combo_mese, combo_anno
     global entry_comune, entry_output, label_codice_fiscale, entry_codice_validazione
-    global frame_generazione, frame_validazione
+    global frame_generazione, frame_validazione, btn_generare, btn_valida_file, btn_annulla_file
+    global barra_progresso, label_progresso, root, lavoratore, lavoratore_suggerimenti
 
     # Configurazione finestra principale
     ctk.set_appearance_mode("System")
@@ -128,7 +268,9 @@ def avvia_gui():
 
     label_comune = ctk.CTkLabel(frame_generazione, text="LUOGO DI NASCITA", font=("Helvetica", 12, "bold"), text_color="#333333")
     label_comune.pack(anchor="w", padx=10)
-    entry_comune = ctk.CTkEntry(frame_generazione, placeholder_text="Inserisci il comune", font=("Helvetica", 12))
+    entry_comune = ctk.CTkComboBox(frame_generazione, values=[], font=("Helvetica", 12))
+    entry_comune.set("")
+    entry_comune.bind("<KeyRelease>", aggiorna_suggerimenti_comune)
     entry_comune.pack(pady=5, padx=10, fill="x")
 
     btn_generare = ctk.CTkButton(frame_generazione, text="Genera Codice Fiscale", command=genera_codice, fg_color="#4CAF50", font=("Helvetica", 12, "bold"))
@@ -148,9 +290,24 @@ def avvia_gui():
     btn_valida = ctk.CTkButton(frame_validazione, text="Valida Codice Fiscale", command=valida_codice, fg_color="#4CAF50", font=("Helvetica", 12, "bold"))
     btn_valida.pack(pady=20)
 
+    btn_valida_file = ctk.CTkButton(frame_validazione, text="Valida File", command=valida_file, fg_color="#4CAF50", font=("Helvetica", 12, "bold"))
+    btn_valida_file.pack(pady=(0, 10))
+    btn_annulla_file = ctk.CTkButton(frame_validazione, text="Annulla", command=annulla_validazione_file, fg_color="#9E9E9E", font=("Helvetica", 12))
+    barra_progresso = ctk.CTkProgressBar(frame_validazione)
+    label_progresso = ctk.CTkLabel(frame_validazione, text="", font=("Helvetica", 12), text_color="#333333")
+
     switch_to_generazione()
 
+    # Le operazioni lente girano nel lavoratore; i risultati arrivano con il polling di root.after
+    lavoratore = LavoratoreSfondo()
+    lavoratore_suggerimenti = LavoratoreSfondo()
+    # Indice dei suggerimenti (e tabelle dei comuni) costruito all'avvio, non al primo tasto premuto
+    lavoratore_suggerimenti.invia(indice_comuni, in_caso_di_errore=_mostra_errore_inatteso)
+    root.after(INTERVALLO_POLLING_MS, elabora_eventi_lavoratore)
+
     root.mainloop()
+    lavoratore.ferma(timeout=1)
+    lavoratore_suggerimenti.ferma(timeout=1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,179 @@
+import queue
+import threading
+from source.batch import CAMPO_CODICE_FISCALE, ErroreCodiceFiscale, valida_codici_fiscali
+from source.parallelo import suddividi_in_chunk
+
+
+############
+# COSTANTI #
+############
+DIMENSIONE_BLOCCO_PROGRESSO = 1000
+MASSIMO_EVENTI_PER_CICLO = 100
+MASSIMO_ERRORI_RIEPILOGO = 20
+
+_COMPLETATO = "completato"
+_ERRORE = "errore"
+_PROGRESSO = "progresso"
+
+
+###########
+# COMPITO #
+###########
+class Compito:
+    """Lavoro inviato al `LavoratoreSfondo`, con i callback da eseguire nel thread dell'interfaccia."""
+
+    def __init__(self, funzione, argomenti, al_completamento, in_caso_di_errore, al_progresso):
+        self.funzione = funzione
+        self.argomenti = argomenti
+        self.al_completamento = al_completamento
+        self.in_caso_di_errore = in_caso_di_errore
+        self.al_progresso = al_progresso
+        self._annullato = threading.Event()
+        self._terminato = threading.Event()
+
+    def annulla(self):
+        """Annulla il compito: se non è ancora iniziato non viene eseguito e i suoi callback non vengono chiamati."""
+        self._annullato.set()
+
+    @property
+    def annullato(self):
+        return self._annullato.is_set()
+
+    @property
+    def terminato(self):
+        """True quando il risultato (o l'errore) è stato consegnato tramite `elabora_eventi`."""
+        return self._terminato.is_set()
+
+
+#####################
+# LAVORATORE SFONDO #
+#####################
+class LavoratoreSfondo:
+    """Esegue i compiti in un thread separato e ne consegna i risultati al thread dell'interfaccia.
+
+    Tkinter non è thread-safe: il thread di lavoro non tocca mai i widget, ma accoda gli eventi
+    (progresso, risultato, errore); il thread dell'interfaccia li consuma chiamando periodicamente
+    `elabora_eventi`, ad es. con `root.after`, ed esegue lì i callback.
+    """
+
+    def __init__(self):
+        self._compiti = queue.Queue()
+        self._eventi = queue.Queue()
+        self._thread = threading.Thread(target=self._esegui, name="lavoratore-sfondo", daemon=True)
+        self._thread.start()
+
+    def invia(self, funzione, *argomenti, al_completamento=None, in_caso_di_errore=None, al_progresso=None):
+        """Accoda un compito da eseguire nel thread di lavoro.
+
+        Se è indicato `al_progresso`, la funzione viene chiamata anche con gli argomenti
+        `progresso` (callable(completati, totale)) e `annullamento` (threading.Event impostato da
+        `Compito.annulla`), per segnalare l'avanzamento e interrompersi in anticipo.
+
+        Args:
+            funzione (Callable): Funzione da eseguire.
+            *argomenti: Argomenti posizionali della funzione.
+            al_completamento (Callable, optional): Chiamato con il risultato.
+            in_caso_di_errore (Callable, optional): Chiamato con l'eccezione sollevata dalla funzione;
+                se assente, l'eccezione viene risollevata da `elabora_eventi`.
+            al_progresso (Callable, optional): Chiamato con (completati, totale) a ogni avanzamento.
+
+        Returns:
+            Compito: Compito accodato, annullabile.
+        """
+        compito = Compito(funzione, argomenti, al_completamento, in_caso_di_errore, al_progresso)
+        self._compiti.put(compito)
+        return compito
+
+    def elabora_eventi(self, massimo=MASSIMO_EVENTI_PER_CICLO):
+        """Esegue nel thread chiamante i callback degli eventi pronti, senza attendere.
+
+        Args:
+            massimo (int, optional): Numero massimo di eventi da elaborare, per non bloccare l'interfaccia.
+
+        Returns:
+            int: Numero di eventi elaborati.
+        """
+        elaborati = 0
+        while elaborati < massimo:
+            try:
+                compito, tipo, valore = self._eventi.get_nowait()
+            except queue.Empty:
+                break
+            elaborati += 1
+            if tipo == _PROGRESSO:
+                if not compito.annullato:
+                    compito.al_progresso(*valore)
+                continue
+            compito._terminato.set()
+            if compito.annullato:
+                continue
+            if tipo == _COMPLETATO:
+                if compito.al_completamento is not None:
+                    compito.al_completamento(valore)
+            elif compito.in_caso_di_errore is not None:
+                compito.in_caso_di_errore(valore)
+            else:
+                raise valore
+        return elaborati
+
+    def ferma(self, timeout=None):
+        """Termina il thread di lavoro dopo i compiti già accodati."""
+        self._compiti.put(None)
+        self._thread.join(timeout)
+
+    def _esegui(self):
+        while (compito := self._compiti.get()) is not None:
+            if compito.annullato:
+                self._eventi.put((compito, _COMPLETATO, None))
+                continue
+            opzioni = {}
+            if compito.al_progresso is not None:
+                opzioni = {"progresso": lambda *valore, compito=compito: self._eventi.put((compito, _PROGRESSO, valore)),
+                           "annullamento": compito._annullato}
+            try:
+                risultato = compito.funzione(*compito.argomenti, **opzioni)
+            except Exception as e:
+                self._eventi.put((compito, _ERRORE, e))
+            else:
+                self._eventi.put((compito, _COMPLETATO, risultato))
+
+
+##########################
+# VALIDAZIONE DI UN FILE #
+##########################
+def valida_file_codici_fiscali(percorso, progresso=None, annullamento=None,
+                               dimensione_blocco=DIMENSIONE_BLOCCO_PROGRESSO):
+    """Valida i codici fiscali di un file di testo, uno per riga, segnalando l'avanzamento.
+
+    Le righe vuote e un'eventuale intestazione `codice_fiscale` vengono ignorate.
+
+    Args:
+        percorso (str): Percorso del file.
+        progresso (Callable, optional): Chiamato con (codici elaborati, codici totali) dopo ogni blocco.
+        annullamento (threading.Event, optional): Se impostato, la validazione si interrompe al blocco successivo.
+        dimensione_blocco (int, optional): Codici validati tra due segnalazioni di avanzamento.
+
+    Returns:
+        dict: Codici elaborati, validi, non validi, se l'elaborazione è stata interrotta e i primi
+        errori come lista di (numero di riga, codice, messaggio).
+    """
+    with open(percorso, encoding="utf-8-sig") as file:
+        righe = [(numero, riga.strip()) for numero, riga in enumerate(file, start=1)
+                 if riga.strip() and riga.strip().lower() != CAMPO_CODICE_FISCALE]
+    riepilogo = {"totale": len(righe), "elaborati": 0, "validi": 0, "non_validi": 0, "interrotto": False,
+                 "errori": []}
+    for blocco in suddividi_in_chunk(righe, dimensione_blocco):
+        if annullamento is not None and annullamento.is_set():
+            riepilogo["interrotto"] = True
+            break
+        for (numero, codice), risultato in zip(blocco, valida_codici_fiscali(codice for _, codice in blocco)):
+            if isinstance(risultato, ErroreCodiceFiscale):
+                riepilogo["non_validi"] += 1
+                if len(riepilogo["errori"]) < MASSIMO_ERRORI_RIEPILOGO:
+                    riepilogo["errori"].append((numero, codice, risultato.messaggio))
+            else:
+                riepilogo["validi"] += 1
+        riepilogo["elaborati"] += len(blocco)
+        if progresso is not None:
+            progresso(riepilogo["elaborati"], riepilogo["totale"])
+    return riepilogo
@@ -1,7 +1,9 @@
+import sys
 from codice_fiscale import (genera_codice_fiscale, valida_cognome, valida_nome,
                             valida_sesso, valida_data_nascita, valida_comune)
 from gui import avvia_gui
 from source.codice_fiscale import is_valido_codice_fiscale
+from source.cli import main as avvia_cli
 
 
 def acquisisci_dato(messaggio_da_stampare: str, funzione_validazione) -> str:
@@ -95,4 +97,6 @@ def main():
         main()
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(avvia_cli())
     main()
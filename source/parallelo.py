@@ -0,0 +1,146 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from source.batch import genera_codici_fiscali, valida_codici_fiscali
+from source.storico_comuni import imposta_indice_storico_comuni, indice_storico_comuni
+from source.tabelle import imposta_tabella_codici_catastali, tabella_codici_catastali
+
+
+############
+# COSTANTI #
+############
+DIMENSIONE_CHUNK_PREDEFINITA = 1000
+CHUNK_IN_CORSO_PER_WORKER = 2
+
+
+##################
+# FUNZIONI CHUNK #
+##################
+def genera_chunk(anagrafiche):
+    """Genera i codici fiscali di un blocco di anagrafiche (eseguibile in un processo separato)."""
+    return list(genera_codici_fiscali(anagrafiche))
+
+
+def valida_chunk(codici_fiscali):
+    """Valida un blocco di codici fiscali (eseguibile in un processo separato)."""
+    return list(valida_codici_fiscali(codici_fiscali))
+
+
+##########################
+# MOTORE DI ELABORAZIONE #
+##########################
+def suddividi_in_chunk(iterabile, dimensione_chunk=DIMENSIONE_CHUNK_PREDEFINITA):
+    """Suddivide in modo lazy un iterabile in liste di al più `dimensione_chunk` elementi.
+
+    Args:
+        iterabile (Iterable): Elementi da suddividere.
+        dimensione_chunk (int, optional): Numero massimo di elementi per blocco.
+
+    Yields:
+        list: Blocchi consecutivi di elementi.
+    """
+    iteratore = iter(iterabile)
+    while chunk := list(islice(iteratore, dimensione_chunk)):
+        yield chunk
+
+
+def elabora_chunk(funzione_chunk, chunks, workers=None):
+    """Applica `funzione_chunk` a ciascun blocco, su più processi, mantenendo l'ordine dell'input.
+
+    Al più `CHUNK_IN_CORSO_PER_WORKER * workers` blocchi sono in elaborazione contemporaneamente,
+    quindi la memoria resta costante anche per input di dimensione arbitraria. Le tabelle dei
+    codici catastali e l'indice storico dei comuni vengono caricati una sola volta nel processo
+    principale: con `fork` i worker li ereditano, altrimenti li ricevono dall'inizializzatore
+    invece di rileggere i CSV.
+
+    Args:
+        funzione_chunk (callable): Funzione di modulo (serializzabile) che elabora un blocco e ne restituisce i risultati.
+        chunks (Iterable[list]): Blocchi da elaborare.
+        workers (int, optional): Numero di processi. Default al numero di CPU disponibili.
+
+    Yields:
+        Any: Risultato di `funzione_chunk` per ciascun blocco, nello stesso ordine dei blocchi.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(funzione_chunk, chunks)
+        return
+
+    contesto = _contesto_multiprocessing()
+    tabella = tabella_codici_catastali()
+    indice = indice_storico_comuni(tabella)
+    opzioni_pool = {}
+    if contesto.get_start_method() != "fork":
+        opzioni_pool = {"initializer": _inizializza_worker, "initargs": (tabella, indice)}
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=contesto, **opzioni_pool) as executor:
+        in_corso = deque()
+        for chunk in chunks:
+            in_corso.append(executor.submit(funzione_chunk, chunk))
+            if len(in_corso) >= CHUNK_IN_CORSO_PER_WORKER * workers:
+                yield in_corso.popleft().result()
+        while in_corso:
+            yield in_corso.popleft().result()
+
+
+def mappa_in_parallelo(funzione_chunk, iterabile, workers=None, dimensione_chunk=DIMENSIONE_CHUNK_PREDEFINITA):
+    """Applica `funzione_chunk` all'input suddiviso in blocchi e restituisce i risultati in ordine.
+
+    Args:
+        funzione_chunk (callable): Funzione di modulo che elabora una lista e restituisce una lista di risultati.
+        iterabile (Iterable): Elementi da elaborare.
+        workers (int, optional): Numero di processi. Default al numero di CPU disponibili.
+        dimensione_chunk (int, optional): Numero di elementi per blocco.
+
+    Yields:
+        Any: Un risultato per ciascun elemento dell'input, nello stesso ordine.
+    """
+    for risultati in elabora_chunk(funzione_chunk, suddividi_in_chunk(iterabile, dimensione_chunk), workers):
+        yield from risultati
+
+
+def genera_codici_fiscali_in_parallelo(anagrafiche, workers=None, dimensione_chunk=DIMENSIONE_CHUNK_PREDEFINITA):
+    """Versione parallela di `genera_codici_fiscali`, con risultati nello stesso ordine dell'input.
+
+    Args:
+        anagrafiche (Iterable[Mapping | Sequence]): Anagrafiche da codificare.
+        workers (int, optional): Numero di processi. Default al numero di CPU disponibili.
+        dimensione_chunk (int, optional): Numero di anagrafiche per blocco.
+
+    Yields:
+        str | ErroreCodiceFiscale: Codice fiscale generato oppure errore strutturato.
+    """
+    return mappa_in_parallelo(genera_chunk, anagrafiche, workers, dimensione_chunk)
+
+
+def valida_codici_fiscali_in_parallelo(codici_fiscali, workers=None, dimensione_chunk=DIMENSIONE_CHUNK_PREDEFINITA):
+    """Versione parallela di `valida_codici_fiscali`, con risultati nello stesso ordine dell'input.
+
+    Args:
+        codici_fiscali (Iterable[str]): Codici fiscali da validare.
+        workers (int, optional): Numero di processi. Default al numero di CPU disponibili.
+        dimensione_chunk (int, optional): Numero di codici per blocco.
+
+    Yields:
+        str | ErroreCodiceFiscale: Codice fiscale in maiuscolo se valido, altrimenti errore strutturato.
+    """
+    return mappa_in_parallelo(valida_chunk, codici_fiscali, workers, dimensione_chunk)
+
+
+def _inizializza_worker(tabella, indice):
+    """Imposta nel worker la tabella dei codici catastali e l'indice storico del processo principale."""
+    imposta_tabella_codici_catastali(tabella)
+    imposta_indice_storico_comuni(indice)
+
+
+def _contesto_multiprocessing():
+    """Restituisce il contesto multiprocessing con l'avvio dei worker più economico disponibile.
+
+    Con `fork` i worker condividono (copy-on-write) le tabelle già presenti nel processo
+    principale; sulle piattaforme senza `fork` si usa il contesto predefinito.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
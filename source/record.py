@@ -0,0 +1,107 @@
+from typing import NamedTuple
+# CodiceFiscaleDecodificato è il record compatto dei dati decodificati, riesportato insieme agli altri record
+from source.codice_fiscale import CodiceFiscaleDecodificato, ERRORE_LUNGHEZZA, MESSAGGI_ERRORE_CODICE_FISCALE
+
+try:
+    import numpy as np
+except ImportError:  # numpy è una dipendenza opzionale
+    np = None
+
+
+############
+# COSTANTI #
+############
+LUNGHEZZA_CODICE_FISCALE = 16
+
+
+class Anagrafica(NamedTuple):
+    """Dati anagrafici in input alla generazione del codice fiscale.
+
+    Essendo una tupla, occupa molta meno memoria di un dizionario con le stesse chiavi ed è
+    accettata direttamente dalle funzioni massive (`genera_codici_fiscali`) e, con
+    `genera_codice_fiscale(*anagrafica)`, dalla generazione singola.
+    """
+    cognome: str
+    nome: str
+    sesso: str
+    data_nascita: str
+    comune: str
+
+
+######################
+# CONTENITORE CODICI #
+######################
+class CodiciFiscali:
+    """Sequenza compatta di codici fiscali memorizzati in un unico buffer contiguo di slot da 16 byte.
+
+    Ogni codice occupa esattamente 16 byte (contro gli oltre 60 di una stringa Python); le stringhe
+    vengono create solo quando si accede ai singoli elementi. Il buffer può essere esposto senza
+    copie come array numpy 'S16' per `valida_codici_fiscali_array`.
+    """
+
+    __slots__ = ("_buffer",)
+
+    def __init__(self, codici_fiscali=()):
+        self._buffer = bytearray()
+        self.extend(codici_fiscali)
+
+    def append(self, codice_fiscale):
+        """Aggiunge un codice fiscale di 16 caratteri ASCII.
+
+        Raises:
+            ValueError: Se il codice non è lungo 16 caratteri ASCII.
+        """
+        codice = codice_fiscale.encode("ascii") if isinstance(codice_fiscale, str) else bytes(codice_fiscale)
+        if len(codice) != LUNGHEZZA_CODICE_FISCALE:
+            raise ValueError(MESSAGGI_ERRORE_CODICE_FISCALE[ERRORE_LUNGHEZZA])
+        self._buffer += codice
+
+    def extend(self, codici_fiscali):
+        """Aggiunge tutti i codici di un iterabile."""
+        for codice_fiscale in codici_fiscali:
+            self.append(codice_fiscale)
+
+    def __len__(self):
+        return len(self._buffer) // LUNGHEZZA_CODICE_FISCALE
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("indice fuori dall'intervallo")
+        inizio = indice * LUNGHEZZA_CODICE_FISCALE
+        return self._buffer[inizio:inizio + LUNGHEZZA_CODICE_FISCALE].decode("ascii")
+
+    def __iter__(self):
+        buffer = self._buffer
+        for inizio in range(0, len(buffer), LUNGHEZZA_CODICE_FISCALE):
+            yield buffer[inizio:inizio + LUNGHEZZA_CODICE_FISCALE].decode("ascii")
+
+    def __eq__(self, altro):
+        if isinstance(altro, CodiciFiscali):
+            return self._buffer == altro._buffer
+        return NotImplemented
+
+    def __repr__(self):
+        return f"CodiciFiscali({len(self)} codici)"
+
+    @property
+    def buffer(self):
+        """Vista in sola lettura sul buffer contiguo dei codici.
+
+        Finché la vista (o un array ottenuto da `come_array_numpy`) è in uso, non è possibile
+        aggiungere codici: il buffer non può essere ridimensionato.
+        """
+        return memoryview(self._buffer).toreadonly()
+
+    def come_array_numpy(self):
+        """Restituisce i codici come array numpy 'S16' che condivide la memoria del buffer.
+
+        Raises:
+            ImportError: Se numpy non è installato.
+        """
+        if np is None:
+            raise ImportError("CodiciFiscali.come_array_numpy richiede numpy.")
+        return np.frombuffer(self._buffer, dtype=f"S{LUNGHEZZA_CODICE_FISCALE}")
@@ -0,0 +1,212 @@
+import os
+import threading
+import time
+from typing import NamedTuple
+from source.storico_comuni import crea_indice_storico_comuni
+from source.tabella_mmap import TabellaCodiciCatastaliMmap, _scrivi_tabella_mmap, apri_tabella_mmap
+from source.tabelle import (DIRECTORY_DATI, FILE_COMUNI, FILE_STATI, TabellaCodiciCatastali,
+                            _carica_da_csv_con_periodi, _carica_tabelle_e_firme, _firma_file,
+                            imposta_tabella_codici_catastali, tabella_codici_catastali)
+
+
+############
+# COSTANTI #
+############
+INTERVALLO_CONTROLLO_PREDEFINITO = 30.0  # secondi
+
+
+class DifferenzeTabella(NamedTuple):
+    """Differenze tra due versioni di una tabella denominazione -> codice catastale.
+
+    Attributes:
+        aggiunte (dict[str, str]): Denominazioni nuove con il loro codice.
+        rimosse (dict[str, str]): Denominazioni non più presenti con il codice precedente.
+        modificate (dict[str, tuple[str, str]]): Denominazioni con codice cambiato -> (vecchio, nuovo).
+    """
+    aggiunte: dict
+    rimosse: dict
+    modificate: dict
+
+    @property
+    def numero_righe(self):
+        return len(self.aggiunte) + len(self.rimosse) + len(self.modificate)
+
+
+##########################
+# REGISTRO DELLE TABELLE #
+##########################
+class RegistroTabelle:
+    """Ricarica le tabelle dei comuni e degli stati quando i CSV cambiano, senza riavviare il processo.
+
+    `controlla` confronta dimensione e data di modifica dei CSV (e, se sono cambiate, l'hash del
+    contenuto) con quelle registrate al caricamento della tabella corrente; in caso di modifiche
+    rilegge i CSV e costruisce una nuova tabella, insieme al suo indice storico dei comuni, che
+    sostituisce quella corrente con un solo assegnamento. I lettori (`tabella_codici_catastali`) non
+    acquisiscono lock e vedono sempre tabella e indice precedenti o quelli nuovi, mai una combinazione
+    parziale. Le differenze rispetto alla tabella precedente sono calcolate solo per le metriche.
+
+    La nuova tabella usa lo stesso backend di quella corrente: con `TabellaCodiciCatastaliMmap` il
+    file a record fissi viene ricompilato e riaperto, così i processi continuano a condividerlo.
+    Se la tabella corrente non proviene da `directory`, il registro la carica da lì alla creazione.
+
+    Attributes:
+        directory (str): Directory contenente i CSV.
+    """
+
+    def __init__(self, directory=DIRECTORY_DATI):
+        self.directory = directory
+        tabella = tabella_codici_catastali()
+        if tabella.firme is None or tabella.directory is None or \
+                os.path.abspath(tabella.directory) != os.path.abspath(directory):
+            if isinstance(tabella, TabellaCodiciCatastaliMmap):
+                tabella = apri_tabella_mmap(directory)
+            else:
+                comuni, stati, firme = _carica_tabelle_e_firme(directory)
+                tabella = TabellaCodiciCatastali(comuni, stati, directory, firme)
+            imposta_tabella_codici_catastali(tabella)
+        self._firme = tabella.firme
+        self._lock = threading.Lock()
+        self._evento_arresto = threading.Event()
+        self._thread = None
+        self._metriche = {
+            "controlli": 0,
+            "ricaricamenti": 0,
+            "errori": 0,
+            "ultimo_errore": None,
+            "ultimo_ricaricamento": None,
+            "durata_ultimo_ricaricamento": 0.0,
+            "righe_aggiunte": 0,
+            "righe_rimosse": 0,
+            "righe_modificate": 0,
+            "righe_cambiate_totali": 0,
+        }
+
+    def controlla(self):
+        """Verifica se i CSV sono cambiati e, in tal caso, aggiorna la tabella corrente.
+
+        Gli errori di lettura dei CSV non interrompono il servizio: la tabella corrente resta in uso
+        e l'errore viene registrato nelle metriche.
+
+        Returns:
+            dict[str, DifferenzeTabella] | None: Differenze per "comuni" e "stati" rispetto alla tabella
+            precedente, o None
+            se i CSV non sono cambiati o non è stato possibile rileggerli.
+        """
+        with self._lock:
+            self._metriche["controlli"] += 1
+            try:
+                firme = self._firme_cambiate()
+                if not firme:
+                    return None
+                return self._ricarica(firme)
+            except (OSError, ValueError, KeyError) as e:
+                self._metriche["errori"] += 1
+                self._metriche["ultimo_errore"] = f"{type(e).__name__}: {e}"
+                return None
+
+    def avvia(self, intervallo=INTERVALLO_CONTROLLO_PREDEFINITO):
+        """Avvia un thread daemon che esegue `controlla` ogni `intervallo` secondi.
+
+        Args:
+            intervallo (float, optional): Secondi tra due controlli.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._evento_arresto.clear()
+        self._thread = threading.Thread(target=self._esegui_controlli, args=(intervallo,),
+                                        name="registro-tabelle", daemon=True)
+        self._thread.start()
+
+    def ferma(self):
+        """Ferma il thread dei controlli periodici, se avviato."""
+        self._evento_arresto.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def metriche(self):
+        """Restituisce le metriche dei controlli e dei ricaricamenti.
+
+        Returns:
+            dict: Numero di controlli, ricaricamenti ed errori, durata dell'ultimo ricaricamento in
+            secondi e righe aggiunte/rimosse/modificate nell'ultimo ricaricamento e in totale.
+        """
+        with self._lock:
+            return dict(self._metriche)
+
+    def _esegui_controlli(self, intervallo):
+        while not self._evento_arresto.wait(intervallo):
+            self.controlla()
+
+    def _firma(self, nome_file, con_hash=False):
+        return _firma_file(os.path.join(self.directory, nome_file), con_hash=con_hash)
+
+    def _firme_cambiate(self):
+        """Restituisce le nuove firme dei CSV se almeno uno è cambiato nel contenuto, altrimenti None."""
+        cambiate = False
+        firme = {}
+        for nome_file, firma_precedente in self._firme.items():
+            firma = self._firma(nome_file)
+            if (firma["dimensione"], firma["mtime_ns"]) == (firma_precedente["dimensione"],
+                                                            firma_precedente["mtime_ns"]):
+                firme[nome_file] = firma_precedente
+                continue
+            firma = self._firma(nome_file, con_hash=True)
+            cambiate = cambiate or firma["sha256"] != firma_precedente["sha256"]
+            firme[nome_file] = firma
+        if not cambiate:
+            self._firme = firme  # solo la data di modifica è cambiata (ad es. dopo un checkout)
+            return None
+        return firme
+
+    def _ricarica(self, firme):
+        """Rilegge i CSV e rende corrente una nuova tabella con il suo indice storico dei comuni.
+
+        Le firme sono calcolate prima della lettura: una modifica successiva viene riconosciuta al
+        controllo seguente. Il CSV dei comuni è letto una sola volta per la tabella e per l'indice.
+        """
+        inizio = time.perf_counter()
+        comuni, stati, periodi = _carica_da_csv_con_periodi(self.directory)
+        tabella = tabella_codici_catastali()
+        differenze = {"comuni": confronta_tabelle(tabella.comuni, comuni),
+                      "stati": confronta_tabelle(tabella.stati, stati)}
+        if isinstance(tabella, TabellaCodiciCatastaliMmap):
+            nuova_tabella = TabellaCodiciCatastaliMmap(_scrivi_tabella_mmap(self.directory, comuni, stati, firme))
+            nuova_tabella.indice_storico = crea_indice_storico_comuni(periodi)
+        else:
+            nuova_tabella = TabellaCodiciCatastali(comuni, stati, self.directory, firme,
+                                                   crea_indice_storico_comuni(periodi))
+        imposta_tabella_codici_catastali(nuova_tabella)
+        self._firme = firme
+
+        durata = time.perf_counter() - inizio
+        self._metriche["ricaricamenti"] += 1
+        self._metriche["ultimo_ricaricamento"] = time.time()
+        self._metriche["durata_ultimo_ricaricamento"] = durata
+        for chiave, campo in (("righe_aggiunte", "aggiunte"), ("righe_rimosse", "rimosse"),
+                              ("righe_modificate", "modificate")):
+            self._metriche[chiave] = sum(len(getattr(differenza, campo)) for differenza in differenze.values())
+        self._metriche["righe_cambiate_totali"] += sum(differenza.numero_righe for differenza in differenze.values())
+        return differenze
+
+
+##########################
+# DIFFERENZE TRA TABELLE #
+##########################
+def confronta_tabelle(vecchia, nuova):
+    """Calcola le differenze tra due tabelle denominazione -> codice catastale.
+
+    Args:
+        vecchia (Mapping[str, str]): Tabella corrente.
+        nuova (Mapping[str, str]): Tabella aggiornata.
+
+    Returns:
+        DifferenzeTabella: Denominazioni aggiunte, rimosse e con codice modificato.
+    """
+    return DifferenzeTabella(
+        aggiunte={denominazione: codice for denominazione, codice in nuova.items() if denominazione not in vecchia},
+        rimosse={denominazione: codice for denominazione, codice in vecchia.items() if denominazione not in nuova},
+        modificate={denominazione: (codice, nuova[denominazione]) for denominazione, codice in vecchia.items()
+                    if denominazione in nuova and nuova[denominazione] != codice},
+    )
+
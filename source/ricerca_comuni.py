@@ -0,0 +1,145 @@
+import bisect
+import heapq
+from collections import Counter
+from source.tabelle import tabella_codici_catastali
+from source.utils import _formatta_stringa
+
+
+############
+# COSTANTI #
+############
+LIMITE_SUGGERIMENTI = 10
+SOGLIA_SOMIGLIANZA = 0.35
+CANDIDATI_PER_RISULTATO = 5
+LUNGHEZZA_NGRAMMA = 3
+RIEMPIMENTO_NGRAMMI = "$"
+
+_cache_indice = (None, None)
+
+
+#################
+# INDICE COMUNI #
+#################
+class IndiceComuni:
+    """Indice di ricerca delle denominazioni di comuni e stati per prefisso e per somiglianza.
+
+    Le chiavi di ricerca ignorano maiuscole, accenti, spazi, apostrofi e trattini, così
+    "reggio nell emilia" e "REGGIO NELL'EMILIA" coincidono. Le ricerche per prefisso usano
+    `bisect` sulle chiavi ordinate; quelle tolleranti agli errori di battitura un indice
+    inverso di trigrammi, con punteggio di Dice sui trigrammi in comune.
+
+    Attributes:
+        denominazioni (tuple[str, ...]): Denominazioni indicizzate, nell'ordine delle chiavi.
+    """
+
+    def __init__(self, denominazioni):
+        voci = sorted((_chiave_ricerca(denominazione), denominazione) for denominazione in denominazioni)
+        self._chiavi = [chiave for chiave, _ in voci]
+        self.denominazioni = tuple(denominazione for _, denominazione in voci)
+
+        indice_ngrammi = {}
+        self._numero_ngrammi = []
+        for posizione, chiave in enumerate(self._chiavi):
+            ngrammi = _ngrammi(chiave)
+            self._numero_ngrammi.append(len(ngrammi))
+            for ngramma in ngrammi:
+                indice_ngrammi.setdefault(ngramma, []).append(posizione)
+        self._indice_ngrammi = {ngramma: tuple(posizioni) for ngramma, posizioni in indice_ngrammi.items()}
+
+    def cerca_prefisso(self, testo, limite=LIMITE_SUGGERIMENTI):
+        """Restituisce le denominazioni la cui chiave inizia con quella del testo, in ordine alfabetico.
+
+        Args:
+            testo (str): Testo digitato dall'utente.
+            limite (int, optional): Numero massimo di risultati.
+
+        Returns:
+            list[str]: Denominazioni trovate.
+        """
+        prefisso = _chiave_ricerca(testo)
+        if not prefisso:
+            return []
+        risultati = []
+        for posizione in range(bisect.bisect_left(self._chiavi, prefisso), len(self._chiavi)):
+            if len(risultati) == limite or not self._chiavi[posizione].startswith(prefisso):
+                break
+            risultati.append(self.denominazioni[posizione])
+        return risultati
+
+    def cerca_simili(self, testo, limite=LIMITE_SUGGERIMENTI, soglia=SOGLIA_SOMIGLIANZA):
+        """Restituisce le denominazioni più simili al testo, tollerando errori di battitura.
+
+        Args:
+            testo (str): Testo digitato dall'utente.
+            limite (int, optional): Numero massimo di risultati.
+            soglia (float, optional): Somiglianza minima (coefficiente di Dice tra 0 e 1).
+
+        Returns:
+            list[str]: Denominazioni trovate, dalla più simile.
+        """
+        ngrammi = _ngrammi(_chiave_ricerca(testo))
+        if not ngrammi:
+            return []
+        in_comune = Counter()
+        for ngramma in ngrammi:
+            in_comune.update(self._indice_ngrammi.get(ngramma, ()))
+        # Il punteggio è calcolato solo per i candidati con più trigrammi in comune; a parità di
+        # punteggio prevale l'ordine alfabetico (posizione minore)
+        numero_ngrammi = len(ngrammi)
+        punteggi = [(2 * conteggio / (numero_ngrammi + self._numero_ngrammi[posizione]), -posizione)
+                    for posizione, conteggio in in_comune.most_common(limite * CANDIDATI_PER_RISULTATO)]
+        return [self.denominazioni[-posizione_negata]
+                for punteggio, posizione_negata in heapq.nlargest(limite, punteggi) if punteggio >= soglia]
+
+    def suggerisci(self, testo, limite=LIMITE_SUGGERIMENTI):
+        """Restituisce i suggerimenti per il testo digitato: prima i prefissi, poi le denominazioni simili.
+
+        Args:
+            testo (str): Testo digitato dall'utente.
+            limite (int, optional): Numero massimo di risultati.
+
+        Returns:
+            list[str]: Denominazioni suggerite, senza duplicati.
+        """
+        suggerimenti = self.cerca_prefisso(testo, limite)
+        if len(suggerimenti) < limite:
+            gia_presenti = set(suggerimenti)
+            suggerimenti.extend(denominazione for denominazione in self.cerca_simili(testo, limite)
+                                if denominazione not in gia_presenti)
+        return suggerimenti[:limite]
+
+
+##################
+# ACCESSO INDICE #
+##################
+def indice_comuni():
+    """Restituisce l'indice di ricerca della tabella corrente, ricostruito se la tabella cambia.
+
+    Returns:
+        IndiceComuni: Indice delle denominazioni di comuni e stati.
+    """
+    global _cache_indice
+    tabella = tabella_codici_catastali()
+    tabella_in_cache, indice = _cache_indice
+    if tabella_in_cache is not tabella:
+        indice = IndiceComuni(tabella.comuni_e_stati)
+        _cache_indice = (tabella, indice)
+    return indice
+
+
+def suggerisci_comuni(testo, limite=LIMITE_SUGGERIMENTI):
+    """Restituisce i comuni e gli stati suggeriti per il testo digitato (vedi `IndiceComuni.suggerisci`)."""
+    return indice_comuni().suggerisci(testo, limite)
+
+
+def _chiave_ricerca(testo):
+    """Chiave di ricerca: maiuscolo, senza accenti, spazi e caratteri diversi da lettere e cifre."""
+    return "".join(carattere for carattere in _formatta_stringa(testo) if carattere.isalnum())
+
+
+def _ngrammi(chiave):
+    """Restituisce l'insieme dei trigrammi della chiave, con il riempimento iniziale che favorisce i prefissi."""
+    if not chiave:
+        return set()
+    chiave = RIEMPIMENTO_NGRAMMI * (LUNGHEZZA_NGRAMMA - 1) + chiave + RIEMPIMENTO_NGRAMMI
+    return {chiave[i:i + LUNGHEZZA_NGRAMMA] for i in range(len(chiave) - LUNGHEZZA_NGRAMMA + 1)}
@@ -0,0 +1,360 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from source.batch import CAMPI_ANAGRAFICA, CAMPO_CODICE_FISCALE, CAMPO_PROVINCIA, ErroreCodiceFiscale
+from source.parallelo import genera_chunk, valida_chunk
+
+
+############
+# COSTANTI #
+############
+HOST_PREDEFINITO = "127.0.0.1"
+PORTA_PREDEFINITA = 8080
+FINESTRA_RAGGRUPPAMENTO = 0.002  # secondi di attesa per riunire le richieste concorrenti in un lotto
+DIMENSIONE_MASSIMA_LOTTO = 256
+LIMITE_RICHIESTE_IN_CORSO = 1024
+DIMENSIONE_MASSIMA_CORPO = 64 * 1024
+TIMEOUT_LETTURA_PREDEFINITO = 30.0  # secondi per ricevere una richiesta completa prima di chiudere la connessione
+EXECUTOR = ("thread", "process")
+PERCORSO_GENERA = "/genera"
+PERCORSO_VALIDA = "/valida"
+PERCORSO_SALUTE = "/salute"
+
+_log = logging.getLogger(__name__)
+
+
+class _ErroreRichiesta(Exception):
+    """Richiesta HTTP non valida, da segnalare al client con lo stato indicato."""
+
+    def __init__(self, stato, messaggio):
+        super().__init__(messaggio)
+        self.stato = stato
+
+
+############################
+# RAGGRUPPAMENTO RICHIESTE #
+############################
+class RaggruppatoreRichieste:
+    """Riunisce le richieste concorrenti in lotti elaborati da una funzione massiva in un executor.
+
+    La prima richiesta di un lotto avvia un timer di `finestra` secondi; allo scadere, o quando il
+    lotto raggiunge `dimensione_massima`, il lotto viene passato a `funzione_lotto` nell'executor,
+    così il ciclo di eventi resta libero di accettare altre richieste.
+
+    Attributes:
+        lotti (int): Numero di lotti elaborati.
+        elementi (int): Numero totale di elementi elaborati.
+    """
+
+    def __init__(self, funzione_lotto, executor, finestra=FINESTRA_RAGGRUPPAMENTO,
+                 dimensione_massima=DIMENSIONE_MASSIMA_LOTTO):
+        self._funzione_lotto = funzione_lotto
+        self._executor = executor
+        self._finestra = finestra
+        self._dimensione_massima = dimensione_massima
+        self._in_attesa = []
+        self._timer = None
+        self.lotti = 0
+        self.elementi = 0
+
+    async def elabora(self, valore):
+        """Accoda un valore e ne attende il risultato, calcolato insieme al resto del lotto.
+
+        Args:
+            valore (Any): Elemento da passare alla funzione del lotto.
+
+        Returns:
+            Any: Risultato della funzione del lotto per questo elemento.
+        """
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        self._in_attesa.append((valore, futuro))
+        if len(self._in_attesa) >= self._dimensione_massima:
+            self._avvia_lotto()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._finestra, self._avvia_lotto)
+        return await futuro
+
+    def _avvia_lotto(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        lotto, self._in_attesa = self._in_attesa, []
+        if not lotto:
+            return
+        self.lotti += 1
+        self.elementi += len(lotto)
+        try:
+            risultati = asyncio.get_running_loop().run_in_executor(
+                self._executor, self._funzione_lotto, [valore for valore, _ in lotto])
+        except Exception as e:  # ad es. RuntimeError con l'executor già chiuso
+            for _, futuro in lotto:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+        risultati.add_done_callback(lambda completato: _distribuisci_risultati(completato, lotto))
+
+
+def _distribuisci_risultati(completato, lotto):
+    """Assegna a ciascuna richiesta del lotto il proprio risultato, o l'eccezione dell'intero lotto."""
+    eccezione = None if completato.cancelled() else completato.exception()
+    for indice, (_, futuro) in enumerate(lotto):
+        if futuro.done():  # richiesta annullata, ad es. per disconnessione del client
+            continue
+        if completato.cancelled():
+            futuro.cancel()
+        elif eccezione is not None:
+            futuro.set_exception(eccezione)
+        else:
+            futuro.set_result(completato.result()[indice])
+
+
+########################
+# SERVIZIO HTTP / JSON #
+########################
+class ServizioCodiceFiscale:
+    """Servizio HTTP/JSON asincrono per la generazione e la validazione dei codici fiscali.
+
+    Endpoint:
+        - `POST /genera` con un oggetto con i campi di `CAMPI_ANAGRAFICA` e, facoltativa, `provincia`:
+          200 con `codice_fiscale`, oppure 422 con `campo` ed `errore`;
+        - `POST /valida` con `{"codice_fiscale": ...}`: 200 con `valido` ed eventuale `errore`;
+        - `GET /salute`: stato del servizio e metriche.
+
+    Oltre `limite_richieste` richieste in elaborazione il servizio risponde subito 503 con
+    `Retry-After`, invece di accumulare una coda illimitata. Le connessioni che non completano una
+    richiesta entro `timeout_lettura` secondi vengono chiuse; gli errori inattesi dell'elaborazione
+    (ad es. executor chiuso o pool di processi interrotto) sono registrati nel log e restituiti come 500.
+    """
+
+    def __init__(self, host=HOST_PREDEFINITO, porta=PORTA_PREDEFINITA, finestra=FINESTRA_RAGGRUPPAMENTO,
+                 dimensione_lotto=DIMENSIONE_MASSIMA_LOTTO, limite_richieste=LIMITE_RICHIESTE_IN_CORSO,
+                 executor=None, timeout_lettura=TIMEOUT_LETTURA_PREDEFINITO):
+        self.host = host
+        self.porta = porta
+        self.limite_richieste = limite_richieste
+        self.timeout_lettura = timeout_lettura
+        self._executor = executor or ThreadPoolExecutor(max_workers=1)
+        self._executor_proprio = executor is None
+        self._generazione = RaggruppatoreRichieste(genera_chunk, self._executor, finestra, dimensione_lotto)
+        self._validazione = RaggruppatoreRichieste(valida_chunk, self._executor, finestra, dimensione_lotto)
+        self._server = None
+        self._in_corso = 0
+        self._richieste = 0
+        self._rifiutate = 0
+
+    async def avvia(self):
+        """Avvia il server; con `porta=0` la porta effettiva è disponibile in `self.porta`."""
+        self._server = await asyncio.start_server(self._gestisci_connessione, self.host, self.porta)
+        self.porta = self._server.sockets[0].getsockname()[1]
+
+    async def servi(self):
+        """Avvia il server, se necessario, e lo mantiene attivo fino alla cancellazione."""
+        if self._server is None:
+            await self.avvia()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def chiudi(self):
+        """Chiude il server e, se creato dal servizio, l'executor."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._executor_proprio:
+            self._executor.shutdown(wait=False)
+
+    def salute(self):
+        """Restituisce lo stato del servizio e le metriche di raggruppamento e backpressure."""
+        lotti = self._generazione.lotti + self._validazione.lotti
+        elementi = self._generazione.elementi + self._validazione.elementi
+        return {
+            "stato": "ok",
+            "richieste": self._richieste,
+            "in_corso": self._in_corso,
+            "rifiutate": self._rifiutate,
+            "lotti": lotti,
+            "dimensione_media_lotto": round(elementi / lotti, 2) if lotti else 0,
+        }
+
+    async def _gestisci_connessione(self, reader, writer):
+        try:
+            while True:
+                try:
+                    richiesta = await asyncio.wait_for(_leggi_richiesta(reader), self.timeout_lettura)
+                except _ErroreRichiesta as e:
+                    await _scrivi_risposta(writer, e.stato, {"errore": str(e)}, chiudi=True)
+                    break
+                except asyncio.TimeoutError:
+                    break
+                if richiesta is None:
+                    break
+                metodo, percorso, corpo, mantieni_connessione = richiesta
+                stato, risposta, intestazioni = await self._instrada(metodo, percorso, corpo)
+                await _scrivi_risposta(writer, stato, risposta, intestazioni, chiudi=not mantieni_connessione)
+                if not mantieni_connessione:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):  # ValueError: riga troppo lunga
+            pass
+        finally:
+            writer.close()
+
+    async def _instrada(self, metodo, percorso, corpo):
+        """Esegue la richiesta e restituisce stato HTTP, corpo JSON e intestazioni aggiuntive."""
+        if percorso == PERCORSO_SALUTE:
+            if metodo != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"errore": "Metodo non consentito."}, {"Allow": "GET"}
+            return HTTPStatus.OK, self.salute(), {}
+        if percorso not in (PERCORSO_GENERA, PERCORSO_VALIDA):
+            return HTTPStatus.NOT_FOUND, {"errore": "Percorso non trovato."}, {}
+        if metodo != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"errore": "Metodo non consentito."}, {"Allow": "POST"}
+        try:
+            dati = json.loads(corpo)
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {"errore": "Il corpo della richiesta deve essere JSON."}, {}
+        if not isinstance(dati, dict):
+            return HTTPStatus.BAD_REQUEST, {"errore": "Il corpo della richiesta deve essere un oggetto JSON."}, {}
+        if self._in_corso >= self.limite_richieste:
+            self._rifiutate += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"errore": "Servizio sovraccarico, riprovare."}, \
+                {"Retry-After": "1"}
+
+        self._richieste += 1
+        self._in_corso += 1
+        try:
+            if percorso == PERCORSO_GENERA:
+                anagrafica = {campo: dati.get(campo) for campo in (*CAMPI_ANAGRAFICA, CAMPO_PROVINCIA)}
+                risultato = await self._generazione.elabora(anagrafica)
+                if isinstance(risultato, ErroreCodiceFiscale):
+                    return HTTPStatus.UNPROCESSABLE_ENTITY, {"campo": risultato.campo,
+                                                            "errore": risultato.messaggio}, {}
+                return HTTPStatus.OK, {"codice_fiscale": risultato}, {}
+            risultato = await self._validazione.elabora(dati.get(CAMPO_CODICE_FISCALE))
+            if isinstance(risultato, ErroreCodiceFiscale):
+                return HTTPStatus.OK, {"valido": False, "errore": risultato.messaggio}, {}
+            return HTTPStatus.OK, {"valido": True, "codice_fiscale": risultato}, {}
+        except Exception:
+            _log.exception("Errore inatteso nell'elaborazione di %s", percorso)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"errore": "Errore interno del servizio."}, {}
+        finally:
+            self._in_corso -= 1
+
+
+#######################
+# PROTOCOLLO HTTP/1.1 #
+#######################
+async def _leggi_richiesta(reader):
+    """Legge una richiesta HTTP/1.1.
+
+    Returns:
+        tuple[str, str, bytes, bool] | None: Metodo, percorso, corpo e se mantenere la connessione,
+        oppure None se il client ha chiuso la connessione.
+
+    Raises:
+        _ErroreRichiesta: Se la richiesta non è ben formata o il corpo è troppo grande.
+    """
+    riga = await reader.readline()
+    if not riga.strip():
+        return None
+    try:
+        metodo, percorso, versione = riga.decode("latin1").split()
+    except ValueError:
+        raise _ErroreRichiesta(HTTPStatus.BAD_REQUEST, "Riga di richiesta non valida.")
+    intestazioni = {}
+    while (riga := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        nome, _, valore = riga.decode("latin1").partition(":")
+        intestazioni[nome.strip().lower()] = valore.strip()
+    try:
+        lunghezza = int(intestazioni.get("content-length", 0))
+    except ValueError:
+        raise _ErroreRichiesta(HTTPStatus.BAD_REQUEST, "Content-Length non valido.")
+    if lunghezza > DIMENSIONE_MASSIMA_CORPO:
+        raise _ErroreRichiesta(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Corpo della richiesta troppo grande.")
+    corpo = await reader.readexactly(lunghezza) if lunghezza > 0 else b""
+    connessione = intestazioni.get("connection", "").lower()
+    mantieni_connessione = connessione != "close" and (versione == "HTTP/1.1" or connessione == "keep-alive")
+    return metodo, percorso.split("?", 1)[0], corpo, mantieni_connessione
+
+
+async def _scrivi_risposta(writer, stato, corpo, intestazioni=None, chiudi=False):
+    """Scrive una risposta HTTP/1.1 con corpo JSON."""
+    dati = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+    righe = [f"HTTP/1.1 {stato.value} {stato.phrase}",
+             "Content-Type: application/json; charset=utf-8",
+             f"Content-Length: {len(dati)}"]
+    righe.extend(f"{nome}: {valore}" for nome, valore in (intestazioni or {}).items())
+    if chiudi:
+        righe.append("Connection: close")
+    writer.write(("\r\n".join(righe) + "\r\n\r\n").encode("latin1") + dati)
+    await writer.drain()
+
+
+#################
+# LINEA COMANDO #
+#################
+def _crea_parser():
+    parser = argparse.ArgumentParser(
+        prog="codicefiscale-servizio",
+        description="Servizio HTTP/JSON per la generazione e la validazione dei codici fiscali.")
+    parser.add_argument("--host", default=HOST_PREDEFINITO, help=f"indirizzo di ascolto (default: {HOST_PREDEFINITO})")
+    parser.add_argument("--port", type=int, default=PORTA_PREDEFINITA, dest="porta",
+                        help=f"porta di ascolto (default: {PORTA_PREDEFINITA})")
+    parser.add_argument("--window-ms", type=float, default=FINESTRA_RAGGRUPPAMENTO * 1000, dest="finestra_ms",
+                        help="attesa massima in millisecondi per riunire le richieste in un lotto")
+    parser.add_argument("--batch-size", type=int, default=DIMENSIONE_MASSIMA_LOTTO, dest="dimensione_lotto",
+                        help=f"richieste massime per lotto (default: {DIMENSIONE_MASSIMA_LOTTO})")
+    parser.add_argument("--max-pending", type=int, default=LIMITE_RICHIESTE_IN_CORSO, dest="limite_richieste",
+                        help="richieste in elaborazione oltre le quali si risponde 503 "
+                             f"(default: {LIMITE_RICHIESTE_IN_CORSO})")
+    parser.add_argument("--executor", choices=EXECUTOR, default="thread",
+                        help="esecuzione dei lotti in un thread o in processi separati (default: thread)")
+    parser.add_argument("--workers", type=int, default=1, help="thread o processi dell'executor (default: 1)")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_LETTURA_PREDEFINITO, dest="timeout_lettura",
+                        help="secondi per ricevere una richiesta prima di chiudere la connessione "
+                             f"(default: {TIMEOUT_LETTURA_PREDEFINITO:g})")
+    return parser
+
+
+def main(argomenti=None):
+    """Avvia il servizio fino all'interruzione da tastiera.
+
+    Args:
+        argomenti (list[str], optional): Argomenti da riga di comando. Default a `sys.argv[1:]`.
+
+    Returns:
+        int: Codice di uscita del processo.
+    """
+    parser = _crea_parser()
+    opzioni = parser.parse_args(argomenti)
+    if opzioni.workers < 1 or opzioni.dimensione_lotto < 1 or opzioni.limite_richieste < 1 or \
+            opzioni.timeout_lettura <= 0:
+        parser.error("--workers, --batch-size, --max-pending e --timeout devono essere maggiori di zero.")
+    tipo_executor = ProcessPoolExecutor if opzioni.executor == "process" else ThreadPoolExecutor
+    executor = tipo_executor(max_workers=opzioni.workers)
+    servizio = ServizioCodiceFiscale(opzioni.host, opzioni.porta, opzioni.finestra_ms / 1000,
+                                     opzioni.dimensione_lotto, opzioni.limite_richieste, executor,
+                                     opzioni.timeout_lettura)
+
+    async def esegui():
+        await servizio.avvia()
+        print(f"Servizio in ascolto su http://{servizio.host}:{servizio.porta}", file=sys.stderr)
+        try:
+            await servizio.servi()
+        finally:
+            await servizio.chiudi()
+
+    try:
+        asyncio.run(esegui())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+import sys
+import threading
+from datetime import date
+from typing import NamedTuple
+from source.tabelle import DIRECTORY_DATI, carica_periodi_comuni, tabella_codici_catastali
+
+
+############
+# COSTANTI #
+############
+PREFISSO_CODICE_STATO_ESTERO = "Z"
+
+_lock_caricamento = threading.Lock()
+
+
+class PeriodoComune(NamedTuple):
+    """Periodo di validità del codice catastale di un comune.
+
+    Attributes:
+        codice_catastale (str): Codice catastale del comune nel periodo.
+        provincia (str): Sigla della provincia.
+        inizio (date): Data di costituzione (inclusa).
+        fine (date | None): Data di cessazione (esclusa), None se il comune è ancora attivo.
+    """
+    codice_catastale: str
+    provincia: str
+    inizio: date
+    fine: date | None
+
+
+#############################
+# INDICE STORICO DEI COMUNI #
+#############################
+class IndiceStoricoComuni:
+    """Indice dei periodi di validità dei codici catastali dei comuni, per denominazione.
+
+    Per ogni denominazione (in maiuscolo) i periodi sono ordinati per data di costituzione, a parità
+    nell'ordine del file; i periodi validi a una data si trovano scorrendo quelli della denominazione,
+    al più pochi. Le denominazioni con più codici validi nello stesso periodo (ad es. comuni omonimi
+    di province diverse) sono riportate da `collisioni` e, per una data, da `periodi_validi`.
+    """
+
+    def __init__(self, periodi_per_denominazione):
+        self._periodi = {denominazione: tuple(sorted(periodi, key=lambda periodo: periodo.inizio))
+                         for denominazione, periodi in periodi_per_denominazione.items()}
+        self._denominazioni = {periodo.codice_catastale: denominazione
+                               for denominazione, periodi in self._periodi.items() for periodo in periodi}
+
+    def periodi(self, denominazione):
+        """Restituisce i periodi di validità di un comune (denominazione in maiuscolo), dal meno recente."""
+        return self._periodi.get(denominazione, ())
+
+    def codice_catastale(self, denominazione, data_nascita=None, provincia=None):
+        """Restituisce il codice catastale di un comune valido alla data indicata.
+
+        Tra i periodi che comprendono la data prevale quello costituito più di recente. Se nessun
+        periodo comprende la data (ad es. nascita precedente alla costituzione) o la data non è
+        indicata, si usa il periodo più recente, come nella tabella dei codici catastali. Per
+        sapere se la scelta è ambigua (comuni omonimi) si usa `periodi_validi`.
+
+        Args:
+            denominazione (str): Denominazione del comune in maiuscolo.
+            data_nascita (date, optional): Data a cui il codice deve essere valido.
+            provincia (str, optional): Sigla della provincia in maiuscolo, per considerare solo i suoi periodi.
+
+        Returns:
+            str | None: Codice catastale, o None se il comune non è presente (nella provincia indicata).
+        """
+        if data_nascita is not None and (validi := self.periodi_validi(denominazione, data_nascita, provincia)):
+            return validi[0].codice_catastale
+        periodi = [periodo for periodo in self._periodi.get(denominazione, ())
+                   if provincia is None or periodo.provincia == provincia]
+        return periodi[-1].codice_catastale if periodi else None
+
+    def periodi_validi(self, denominazione, data_nascita=None, provincia=None):
+        """Restituisce i periodi di un comune validi alla data indicata, dal costituito più di recente.
+
+        Più periodi con codici diversi indicano comuni omonimi ancora da distinguere per provincia.
+
+        Args:
+            denominazione (str): Denominazione del comune in maiuscolo.
+            data_nascita (date, optional): Data a cui i periodi devono essere validi. Default ai
+                periodi non cessati.
+            provincia (str, optional): Sigla della provincia in maiuscolo, per considerare solo i suoi periodi.
+
+        Returns:
+            list[PeriodoComune]: Periodi validi, vuota se nessun periodo comprende la data.
+        """
+        return [periodo for periodo in reversed(self._periodi.get(denominazione, ()))
+                if (provincia is None or periodo.provincia == provincia)
+                and (periodo.fine is None if data_nascita is None
+                     else periodo.inizio <= data_nascita and (periodo.fine is None or data_nascita < periodo.fine))]
+
+    def denominazione(self, codice_catastale):
+        """Restituisce la denominazione del comune a cui il codice catastale è stato assegnato, anche se cessato.
+
+        Args:
+            codice_catastale (str): Codice catastale in maiuscolo.
+
+        Returns:
+            str | None: Denominazione del comune, o None se il codice non compare nella tabella.
+        """
+        return self._denominazioni.get(codice_catastale)
+
+    def codici_catastali(self):
+        """Restituisce tutti i codici catastali presenti nell'indice, compresi quelli cessati."""
+        return self._denominazioni.keys()
+
+    def collisioni(self):
+        """Restituisce le denominazioni con più codici catastali validi nello stesso periodo.
+
+        Returns:
+            dict[str, tuple[PeriodoComune, ...]]: Denominazione -> periodi sovrapposti.
+        """
+        return {denominazione: periodi for denominazione, periodi in self._periodi.items()
+                if any(_is_sovrapposto(precedente, successivo)
+                       for i, precedente in enumerate(periodi) for successivo in periodi[i + 1:])}
+
+    def __len__(self):
+        return len(self._periodi)
+
+
+##################
+# ACCESSO INDICE #
+##################
+def indice_storico_comuni(tabella=None):
+    """Restituisce l'indice storico dei comuni associato a una tabella, caricandolo al primo utilizzo.
+
+    L'indice è memorizzato sulla tabella stessa (`TabellaCodiciCatastali.indice_storico`), quindi
+    chi legge tabella e indice dalla stessa tabella non vede mai un indice di un'altra versione.
+
+    Args:
+        tabella (TabellaCodiciCatastali, optional): Tabella di riferimento. Default alla tabella corrente.
+
+    Returns:
+        IndiceStoricoComuni: Indice della tabella.
+    """
+    tabella = tabella or tabella_codici_catastali()
+    indice = tabella.indice_storico
+    if indice is None:
+        with _lock_caricamento:
+            if tabella.indice_storico is None:
+                tabella.indice_storico = carica_indice_storico_comuni(tabella.directory or DIRECTORY_DATI)
+            indice = tabella.indice_storico
+    return indice
+
+
+def imposta_indice_storico_comuni(indice, tabella=None):
+    """Associa a una tabella un indice già pronto (None per ricaricarlo al prossimo utilizzo).
+
+    Args:
+        indice (IndiceStoricoComuni | None): Indice da usare per le ricerche.
+        tabella (TabellaCodiciCatastali, optional): Tabella a cui associarlo. Default alla tabella corrente.
+    """
+    tabella = tabella or tabella_codici_catastali()
+    with _lock_caricamento:
+        tabella.indice_storico = indice
+
+
+def carica_indice_storico_comuni(directory=DIRECTORY_DATI, usa_snapshot=True):
+    """Costruisce l'indice dalle date di costituzione (e di cessazione, se presenti) dei comuni.
+
+    Le righe dei periodi sono lette dallo snapshot precompilato, se aggiornato, altrimenti dal CSV.
+
+    Args:
+        directory (str, optional): Directory contenente il CSV dei comuni. Default a `DIRECTORY_DATI`.
+        usa_snapshot (bool, optional): Se False, legge sempre il CSV. Default a True.
+
+    Returns:
+        IndiceStoricoComuni: Indice dei periodi di validità per denominazione.
+    """
+    return crea_indice_storico_comuni(carica_periodi_comuni(directory, usa_snapshot))
+
+
+def crea_indice_storico_comuni(periodi):
+    """Crea l'indice dalle righe restituite da `carica_periodi_comuni`.
+
+    Args:
+        periodi (Iterable[tuple[str, str, str, int, int]]): Denominazione, codice catastale, provincia,
+            ordinali delle date di costituzione e di cessazione (0 se assenti).
+
+    Returns:
+        IndiceStoricoComuni: Indice dei periodi di validità per denominazione.
+    """
+    periodi_per_denominazione = {}
+    for denominazione, codice_catastale, provincia, costituzione, cessazione in periodi:
+        periodi_per_denominazione.setdefault(denominazione, []).append(PeriodoComune(
+            codice_catastale, provincia, date.fromordinal(costituzione) if costituzione else date.min,
+            date.fromordinal(cessazione) if cessazione else None))
+    return IndiceStoricoComuni(periodi_per_denominazione)
+
+
+def _is_sovrapposto(primo, secondo):
+    """Indica se due periodi di validità hanno almeno un giorno in comune."""
+    return ((primo.fine is None or secondo.inizio < primo.fine)
+            and (secondo.fine is None or primo.inizio < secondo.fine))
+
+
+if __name__ == "__main__":
+    collisioni = carica_indice_storico_comuni(*sys.argv[1:]).collisioni()
+    for denominazione, periodi in sorted(collisioni.items()):
+        print(f"{denominazione}: " + ", ".join(
+            f"{periodo.codice_catastale} ({periodo.provincia}, dal {periodo.inizio:%d/%m/%Y})" for periodo in periodi))
+    print(f"{len(collisioni)} denominazioni con più codici catastali validi nello stesso periodo.")
@@ -0,0 +1,181 @@
+import json
+import threading
+import time
+from collections import Counter
+
+
+############
+# COSTANTI #
+############
+PREFISSO_METRICHE = "codicefiscale"
+FASE_TOTALE = "totale"
+
+# Letto dai percorsi critici prima di ogni chiamata: con la strumentazione disattivata il costo è
+# un solo accesso ad attributo, senza misurazioni né lock
+attiva = False
+
+_lock = threading.Lock()
+_fasi = {}          # (operazione, fase) -> [chiamate, secondi]
+_errori = Counter()  # (operazione, causa) -> errori
+_cache = {}         # nome -> oggetto con metodo statistiche() (es. CacheLRU)
+
+
+#######################
+# ATTIVAZIONE E STATO #
+#######################
+def attiva_strumentazione():
+    """Attiva la raccolta dei tempi per fase e dei contatori di errore."""
+    global attiva
+    attiva = True
+
+
+def disattiva_strumentazione():
+    """Disattiva la raccolta; i dati già raccolti restano disponibili fino ad `azzera_strumentazione`."""
+    global attiva
+    attiva = False
+
+
+def azzera_strumentazione():
+    """Azzera i tempi per fase e i contatori di errore (le statistiche delle cache restano alle cache)."""
+    with _lock:
+        _fasi.clear()
+        _errori.clear()
+
+
+def registra_cache(nome, cache):
+    """Include le statistiche di una cache nell'istantanea.
+
+    Args:
+        nome (str): Nome della cache nell'istantanea e nelle metriche.
+        cache (CacheLRU): Cache con metodo `statistiche()`.
+    """
+    _cache[nome] = cache
+
+
+def registra_fase(operazione, fase, durata):
+    """Aggiunge una chiamata e la sua durata (secondi) ai contatori della fase."""
+    with _lock:
+        contatori = _fasi.get((operazione, fase))
+        if contatori is None:
+            _fasi[(operazione, fase)] = [1, durata]
+        else:
+            contatori[0] += 1
+            contatori[1] += durata
+
+
+def registra_errore(operazione, causa):
+    """Incrementa il contatore degli errori di un'operazione per la causa indicata."""
+    with _lock:
+        _errori[(operazione, causa)] += 1
+
+
+##############
+# CRONOMETRO #
+##############
+class Cronometro:
+    """Misura le fasi di una singola operazione (ad es. una generazione) e ne registra l'esito.
+
+    Usato come context manager: `esegui` misura ogni fase, all'uscita viene registrata la fase
+    `FASE_TOTALE` e, se l'operazione termina con un'eccezione, un errore con il nome della fase in
+    corso come causa.
+
+    Attributes:
+        operazione (str): Nome dell'operazione (es. 'genera').
+        fase (str | None): Ultima fase avviata.
+    """
+
+    __slots__ = ("operazione", "fase", "_inizio")
+
+    def __init__(self, operazione):
+        self.operazione = operazione
+        self.fase = None
+        self._inizio = None
+
+    def __enter__(self):
+        self._inizio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, errore, traceback):
+        registra_fase(self.operazione, FASE_TOTALE, time.perf_counter() - self._inizio)
+        if errore is not None:
+            registra_errore(self.operazione, self.fase)
+        return False
+
+    def esegui(self, fase, funzione, *argomenti):
+        """Esegue `funzione(*argomenti)` registrandone la durata come fase `fase`."""
+        self.fase = fase
+        inizio = time.perf_counter()
+        try:
+            return funzione(*argomenti)
+        finally:
+            registra_fase(self.operazione, fase, time.perf_counter() - inizio)
+
+
+##############
+# ISTANTANEA #
+##############
+def istantanea():
+    """Restituisce una copia coerente delle metriche raccolte.
+
+    Returns:
+        dict: `fasi` (operazione -> fase -> chiamate, secondi totali e medi), `errori`
+        (operazione -> causa -> conteggio) e `cache` (nome -> statistiche, con hit rate).
+    """
+    with _lock:
+        fasi = {chiave: tuple(contatori) for chiave, contatori in _fasi.items()}
+        errori = dict(_errori)
+    risultato = {"attiva": attiva, "fasi": {}, "errori": {}, "cache": {}}
+    for (operazione, fase), (chiamate, secondi) in sorted(fasi.items()):
+        risultato["fasi"].setdefault(operazione, {})[fase] = {
+            "chiamate": chiamate, "secondi": secondi, "secondi_medi": secondi / chiamate}
+    for (operazione, causa), conteggio in sorted(errori.items()):
+        risultato["errori"].setdefault(operazione, {})[causa] = conteggio
+    for nome, cache in sorted(_cache.items()):
+        risultato["cache"][nome] = cache.statistiche()
+    return risultato
+
+
+def esporta_json(indentazione=2):
+    """Restituisce l'istantanea delle metriche in formato JSON."""
+    return json.dumps(istantanea(), indent=indentazione)
+
+
+def esporta_prometheus():
+    """Restituisce l'istantanea delle metriche nel formato testuale di Prometheus.
+
+    Returns:
+        str: Metriche `codicefiscale_fase_chiamate_total`, `codicefiscale_fase_secondi_total`,
+        `codicefiscale_errori_total` e `codicefiscale_cache_*` con le relative etichette.
+    """
+    dati = istantanea()
+    metriche = [
+        ("fase_chiamate_total", "counter", "Chiamate per operazione e fase.",
+         [({"operazione": operazione, "fase": fase}, valori["chiamate"])
+          for operazione, fasi in dati["fasi"].items() for fase, valori in fasi.items()]),
+        ("fase_secondi_total", "counter", "Secondi cumulati per operazione e fase.",
+         [({"operazione": operazione, "fase": fase}, valori["secondi"])
+          for operazione, fasi in dati["fasi"].items() for fase, valori in fasi.items()]),
+        ("errori_total", "counter", "Operazioni fallite per causa.",
+         [({"operazione": operazione, "causa": causa}, conteggio)
+          for operazione, cause in dati["errori"].items() for causa, conteggio in cause.items()]),
+        ("cache_hit_total", "counter", "Richieste servite dalla cache.",
+         [({"cache": nome}, statistiche["hit"]) for nome, statistiche in dati["cache"].items()]),
+        ("cache_miss_total", "counter", "Richieste non servite dalla cache.",
+         [({"cache": nome}, statistiche["miss"]) for nome, statistiche in dati["cache"].items()]),
+        ("cache_hit_rate", "gauge", "Frazione di richieste servite dalla cache.",
+         [({"cache": nome}, statistiche["hit_rate"]) for nome, statistiche in dati["cache"].items()]),
+    ]
+    righe = []
+    for nome, tipo, descrizione, campioni in metriche:
+        nome = f"{PREFISSO_METRICHE}_{nome}"
+        righe.append(f"# HELP {nome} {descrizione}")
+        righe.append(f"# TYPE {nome} {tipo}")
+        for etichette, valore in campioni:
+            testo_etichette = ",".join(f'{chiave}="{_escape_etichetta(valore_etichetta)}"'
+                                       for chiave, valore_etichetta in etichette.items())
+            righe.append(f"{nome}{{{testo_etichette}}} {valore}")
+    return "\n".join(righe) + "\n"
+
+
+def _escape_etichetta(valore):
+    return str(valore).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
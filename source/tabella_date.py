@@ -0,0 +1,125 @@
+import calendar
+import threading
+from datetime import date
+from source.codice_fiscale import DATA_MINIMA, LETTERE_MESE, VAL_SOMMARE_GIORNO_FEMM
+
+_tabella_corrente = None
+_lock_caricamento = threading.Lock()
+
+
+#########################
+# TABELLA SEGMENTI DATA #
+#########################
+class TabellaSegmentiData:
+    """Segmenti della data di nascita (AAMGG) precalcolati per ogni giorno da `DATA_MINIMA` al 31/12 di `anno_finale`.
+
+    La codifica diventa un accesso per indice (ordinale della data) e la decodifica un accesso a un
+    dizionario segmento -> date candidate, costruito solo al primo utilizzo.
+
+    Attributes:
+        data_finale (date): Ultimo giorno presente nella tabella.
+        segmenti_maschili (tuple[str, ...]): Segmento per ogni giorno, sesso 'M'.
+        segmenti_femminili (tuple[str, ...]): Segmento per ogni giorno, sesso 'F'.
+    """
+
+    def __init__(self, anno_finale):
+        self.data_finale = date(anno_finale, 12, 31)
+        self._ordinale_iniziale = DATA_MINIMA.toordinal()
+        giorni_maschili = [f"{giorno:02d}" for giorno in range(1, 32)]
+        giorni_femminili = [f"{giorno + VAL_SOMMARE_GIORNO_FEMM}" for giorno in range(1, 32)]
+        segmenti_maschili, segmenti_femminili = [], []
+        for anno in range(DATA_MINIMA.year, anno_finale + 1):
+            for mese, lettera_mese in enumerate(LETTERE_MESE, start=1):
+                prefisso = f"{anno % 100:02d}{lettera_mese}"
+                numero_giorni = calendar.monthrange(anno, mese)[1]
+                segmenti_maschili.extend([prefisso + giorno for giorno in giorni_maschili[:numero_giorni]])
+                segmenti_femminili.extend([prefisso + giorno for giorno in giorni_femminili[:numero_giorni]])
+        self.segmenti_maschili = tuple(segmenti_maschili)
+        self.segmenti_femminili = tuple(segmenti_femminili)
+        self._date_per_segmento = None
+        self._lock = threading.Lock()
+
+    def segmento(self, data_nascita, sesso):
+        """Restituisce il segmento di 5 caratteri della data di nascita, o None se fuori dalla tabella.
+
+        Args:
+            data_nascita (date): Data di nascita già validata.
+            sesso (str): Sesso già validato ('M' o 'F').
+
+        Returns:
+            str | None: Segmento AAMGG (giorno + 40 per il sesso femminile).
+        """
+        indice = data_nascita.toordinal() - self._ordinale_iniziale
+        if 0 <= indice < len(self.segmenti_maschili):
+            return (self.segmenti_femminili if sesso == "F" else self.segmenti_maschili)[indice]
+        return None
+
+    def date_candidate(self, segmento):
+        """Restituisce le date della tabella che hanno il segmento indicato, in ordine crescente.
+
+        Args:
+            segmento (str): Segmento AAMGG senza omocodia.
+
+        Returns:
+            tuple[date, ...]: Date candidate (al più una per secolo), vuota se il segmento non è valido.
+        """
+        date_per_segmento = self._date_per_segmento
+        if date_per_segmento is None:
+            with self._lock:
+                if self._date_per_segmento is None:
+                    self._date_per_segmento = self._costruisci_date_per_segmento()
+                date_per_segmento = self._date_per_segmento
+        return date_per_segmento.get(segmento, ())
+
+    def data_nascita(self, segmento, oggi):
+        """Restituisce la data di nascita più recente, non successiva a `oggi`, e il sesso di un segmento.
+
+        Args:
+            segmento (str): Segmento AAMGG senza omocodia.
+            oggi (date): Data di riferimento per dedurre il secolo.
+
+        Returns:
+            tuple[date, str] | None: Data di nascita e sesso, o None se la tabella non permette di
+            stabilirli (segmento non valido o `oggi` successivo a `data_finale`).
+        """
+        if oggi > self.data_finale:
+            return None
+        for data_nascita in reversed(self.date_candidate(segmento)):
+            if data_nascita <= oggi:
+                return data_nascita, "F" if segmento[3] >= "4" else "M"
+        return None
+
+    def _costruisci_date_per_segmento(self):
+        """Costruisce il dizionario inverso segmento -> date candidate.
+
+        Le date del Novecento hanno segmenti tutti distinti; quelle dal 2000 si aggiungono alle
+        date con le stesse ultime due cifre dell'anno.
+        """
+        giorni = list(map(date.fromordinal, range(self._ordinale_iniziale,
+                                                  self._ordinale_iniziale + len(self.segmenti_maschili))))
+        inizio_secolo = date(2000, 1, 1).toordinal() - self._ordinale_iniziale
+        date_per_segmento = dict(zip(self.segmenti_maschili[:inizio_secolo], zip(giorni)))
+        date_per_segmento.update(zip(self.segmenti_femminili[:inizio_secolo], zip(giorni)))
+        for segmenti in (self.segmenti_maschili, self.segmenti_femminili):
+            for segmento, giorno in zip(segmenti[inizio_secolo:], giorni[inizio_secolo:]):
+                date_per_segmento[segmento] = date_per_segmento.get(segmento, ()) + (giorno,)
+        return date_per_segmento
+
+
+####################
+# ACCESSO TABELLA #
+####################
+def tabella_segmenti_data():
+    """Restituisce la tabella dei segmenti data, costruendola al primo utilizzo fino alla fine dell'anno corrente.
+
+    Returns:
+        TabellaSegmentiData: Tabella corrente.
+    """
+    global _tabella_corrente
+    tabella = _tabella_corrente
+    if tabella is None or tabella.data_finale < date.today():
+        with _lock_caricamento:
+            if _tabella_corrente is None or _tabella_corrente.data_finale < date.today():
+                _tabella_corrente = TabellaSegmentiData(date.today().year)
+            tabella = _tabella_corrente
+    return tabella
@@ -0,0 +1,227 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+from functools import cached_property
+from source.tabelle import CODICE_CATASTALE_NON_DISPONIBILE, DIRECTORY_DATI, FILE_COMUNI, FILE_STATI, \
+    _carica_da_csv, _firma_file, _is_firma_aggiornata, imposta_tabella_codici_catastali
+
+
+############
+# COSTANTI #
+############
+FILE_TABELLA_MMAP = "tabelle_codici_catastali.idx"
+MAGIC = b"CFCC"
+VERSIONE_FORMATO = 1
+# magic, versione, larghezza denominazione, numero record, numero codici indicizzati, lunghezza metadati
+FORMATO_INTESTAZIONE = struct.Struct("<4sHHIII")
+FORMATO_INDICE_CODICI = struct.Struct("<4sI")
+LUNGHEZZA_CODICE = 4
+TIPO_COMUNE = b"C"
+TIPO_STATO = b"S"
+RIEMPIMENTO = b"\0"
+
+
+class _VistaOrdinata:
+    """Sequenza di sola lettura delle chiavi di una sezione a record fissi, per la ricerca con `bisect`."""
+
+    def __init__(self, buffer, inizio, numero, dimensione_record, lunghezza_chiave):
+        self._buffer = buffer
+        self._inizio = inizio
+        self._numero = numero
+        self._dimensione_record = dimensione_record
+        self._lunghezza_chiave = lunghezza_chiave
+
+    def __len__(self):
+        return self._numero
+
+    def __getitem__(self, indice):
+        offset = self._inizio + indice * self._dimensione_record
+        return self._buffer[offset:offset + self._lunghezza_chiave]
+
+
+#########################
+# TABELLA MEMORY-MAPPED #
+#########################
+class TabellaCodiciCatastaliMmap:
+    """Tabella dei codici catastali su file a record fissi, letta tramite `mmap`.
+
+    Il file contiene i record (denominazione, codice catastale, tipo) ordinati per denominazione e
+    un indice delle posizioni dei record ordinato per codice catastale. Le ricerche sono binarie
+    direttamente sulle pagine mappate, quindi più processi che aprono lo stesso file ne condividono
+    un'unica copia fisica in memoria. Espone la stessa interfaccia di `TabellaCodiciCatastali`.
+    """
+
+    def __init__(self, percorso):
+        self.percorso = percorso
+        with open(percorso, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, versione, larghezza, numero_record, numero_codici, lunghezza_metadati = \
+            FORMATO_INTESTAZIONE.unpack_from(self._mmap)
+        if magic != MAGIC or versione != VERSIONE_FORMATO:
+            raise ValueError(f"Formato della tabella dei codici catastali non supportato: {percorso}.")
+        inizio_metadati = FORMATO_INTESTAZIONE.size
+        self.metadati = json.loads(self._mmap[inizio_metadati:inizio_metadati + lunghezza_metadati])
+        # Stessi attributi di `TabellaCodiciCatastali`: i metadati sono le firme dei CSV compilati
+        self.directory = os.path.dirname(percorso)
+        self.firme = self.metadati
+        self.indice_storico = None
+
+        self._larghezza = larghezza
+        self._dimensione_record = larghezza + LUNGHEZZA_CODICE + len(TIPO_COMUNE)
+        self._inizio_record = inizio_metadati + lunghezza_metadati
+        self._inizio_indice_codici = self._inizio_record + numero_record * self._dimensione_record
+        self._denominazioni = _VistaOrdinata(self._mmap, self._inizio_record, numero_record,
+                                             self._dimensione_record, larghezza)
+        self._codici = _VistaOrdinata(self._mmap, self._inizio_indice_codici, numero_codici,
+                                      FORMATO_INDICE_CODICI.size, LUNGHEZZA_CODICE)
+
+    def __reduce__(self):
+        # Nei processi worker il file viene riaperto (e condiviso) invece di copiare i dati
+        return self.__class__, (self.percorso,)
+
+    def codice_catastale(self, denominazione):
+        """Restituisce il codice catastale di un comune o stato (denominazione in maiuscolo), o None."""
+        chiave = denominazione.encode("utf-8")
+        if len(chiave) > self._larghezza:
+            return None
+        chiave = chiave.ljust(self._larghezza, RIEMPIMENTO)
+        # A parità di denominazione gli stati seguono i comuni e prevalgono, come in `comuni | stati`
+        indice = bisect.bisect_right(self._denominazioni, chiave) - 1
+        if indice < 0 or self._denominazioni[indice] != chiave:
+            return None
+        offset = self._inizio_record + indice * self._dimensione_record + self._larghezza
+        return self._mmap[offset:offset + LUNGHEZZA_CODICE].decode("ascii")
+
+    def denominazione(self, codice_catastale):
+        """Restituisce la denominazione associata a un codice catastale (in maiuscolo), o None."""
+        chiave = codice_catastale.encode("ascii", errors="replace")
+        indice = bisect.bisect_left(self._codici, chiave)
+        if indice == len(self._codici) or self._codici[indice] != chiave:
+            return None
+        _, posizione = FORMATO_INDICE_CODICI.unpack_from(
+            self._mmap, self._inizio_indice_codici + indice * FORMATO_INDICE_CODICI.size)
+        return self._leggi_record(posizione)[0]
+
+    @cached_property
+    def comuni(self):
+        return {denominazione: codice for denominazione, codice, tipo in self._record() if tipo == TIPO_COMUNE}
+
+    @cached_property
+    def stati(self):
+        return {denominazione: codice for denominazione, codice, tipo in self._record() if tipo == TIPO_STATO}
+
+    @cached_property
+    def comuni_e_stati(self):
+        return self.comuni | self.stati
+
+    @cached_property
+    def denominazioni_per_codice(self):
+        return {codice: denominazione for denominazione, codice in self.comuni_e_stati.items()
+                if codice != CODICE_CATASTALE_NON_DISPONIBILE}
+
+    def _leggi_record(self, posizione):
+        offset = self._inizio_record + posizione * self._dimensione_record
+        record = self._mmap[offset:offset + self._dimensione_record]
+        return (record[:self._larghezza].rstrip(RIEMPIMENTO).decode("utf-8"),
+                record[self._larghezza:self._larghezza + LUNGHEZZA_CODICE].decode("ascii"),
+                record[self._larghezza + LUNGHEZZA_CODICE:])
+
+    def _record(self):
+        return (self._leggi_record(posizione) for posizione in range(len(self._denominazioni)))
+
+
+#####################
+# COMPILAZIONE FILE #
+#####################
+def compila_tabella_mmap(directory=DIRECTORY_DATI):
+    """Compila i CSV dei comuni e degli stati nel file a record fissi usato da `TabellaCodiciCatastaliMmap`.
+
+    Args:
+        directory (str, optional): Directory contenente i CSV; il file viene scritto nella stessa directory.
+
+    Returns:
+        str: Percorso del file scritto.
+    """
+    firme = {nome_file: _firma_file(os.path.join(directory, nome_file), con_hash=True)
+             for nome_file in (FILE_COMUNI, FILE_STATI)}
+    return _scrivi_tabella_mmap(directory, *_carica_da_csv(directory), firme)
+
+
+def _scrivi_tabella_mmap(directory, comuni, stati, firme):
+    """Scrive nella directory il file a record fissi di tabelle già lette, con le firme dei CSV come metadati.
+
+    Returns:
+        str: Percorso del file scritto.
+    """
+    record = sorted([(denominazione.encode("utf-8"), codice.encode("ascii"), TIPO_COMUNE)
+                     for denominazione, codice in comuni.items()]
+                    + [(denominazione.encode("utf-8"), codice.encode("ascii"), TIPO_STATO)
+                       for denominazione, codice in stati.items()],
+                    key=lambda record_: (record_[0], record_[2]))
+    larghezza = max(len(denominazione) for denominazione, _, _ in record)
+
+    # Come in `comuni | stati`, per ogni denominazione vale l'ultimo record (lo stato, se presente)
+    posizioni_per_denominazione = {denominazione: posizione
+                                   for posizione, (denominazione, _, _) in enumerate(record)}
+    posizioni_per_codice = {record[posizione][1]: posizione
+                            for posizione in posizioni_per_denominazione.values()
+                            if record[posizione][1] != CODICE_CATASTALE_NON_DISPONIBILE.encode("ascii")}
+    indice_codici = sorted(posizioni_per_codice.items())
+
+    metadati = json.dumps(firme).encode("utf-8")
+    percorso = os.path.join(directory, FILE_TABELLA_MMAP)
+    percorso_temporaneo = f"{percorso}.{os.getpid()}.tmp"
+    with open(percorso_temporaneo, "wb") as file:
+        file.write(FORMATO_INTESTAZIONE.pack(MAGIC, VERSIONE_FORMATO, larghezza, len(record),
+                                             len(indice_codici), len(metadati)))
+        file.write(metadati)
+        for denominazione, codice, tipo in record:
+            file.write(denominazione.ljust(larghezza, RIEMPIMENTO) + codice.ljust(LUNGHEZZA_CODICE, RIEMPIMENTO)
+                       + tipo)
+        for codice, posizione in indice_codici:
+            file.write(FORMATO_INDICE_CODICI.pack(codice, posizione))
+    # Il file viene sostituito atomicamente: i processi che lo hanno già mappato continuano a leggere la versione
+    # precedente
+    os.replace(percorso_temporaneo, percorso)
+    return percorso
+
+
+def apri_tabella_mmap(directory=DIRECTORY_DATI):
+    """Apre la tabella a record fissi, compilandola se manca o non corrisponde più ai CSV.
+
+    Args:
+        directory (str, optional): Directory contenente i CSV e il file compilato.
+
+    Returns:
+        TabellaCodiciCatastaliMmap: Tabella pronta per le ricerche.
+    """
+    percorso = os.path.join(directory, FILE_TABELLA_MMAP)
+    try:
+        tabella = TabellaCodiciCatastaliMmap(percorso)
+        if all(_is_firma_aggiornata(os.path.join(directory, nome_file), tabella.metadati.get(nome_file))
+               for nome_file in (FILE_COMUNI, FILE_STATI)):
+            return tabella
+    except (OSError, ValueError, struct.error):
+        pass
+    return TabellaCodiciCatastaliMmap(compila_tabella_mmap(directory))
+
+
+def usa_tabella_mmap(directory=DIRECTORY_DATI):
+    """Imposta la tabella a record fissi come backend delle ricerche di comuni e codici catastali.
+
+    Args:
+        directory (str, optional): Directory contenente i CSV e il file compilato.
+
+    Returns:
+        TabellaCodiciCatastaliMmap: Tabella impostata.
+    """
+    tabella = apri_tabella_mmap(directory)
+    imposta_tabella_codici_catastali(tabella)
+    return tabella
+
+
+if __name__ == "__main__":
+    print(f"Tabella scritta in {compila_tabella_mmap(*sys.argv[1:])}")
@@ -0,0 +1,279 @@
+import csv
+import marshal
+import os
+import sys
+import threading
+from datetime import date
+from source.utils import _crea_dict_denominazione_codice_catastale_da_csv
+
+
+############
+# COSTANTI #
+############
+DIRECTORY_DATI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+FILE_COMUNI = "tabella_comuni.csv"
+FILE_STATI = "tabella_stati.csv"
+FILE_SNAPSHOT = "tabelle_codici_catastali.marshal"
+VERSIONE_SNAPSHOT = 2
+COLONNA_DATA_COSTITUZIONE = "Data Costituzione"
+COLONNA_DATA_CESSAZIONE = "Data Cessazione"  # presente solo nelle tabelle che includono i comuni soppressi
+CODICE_CATASTALE_NON_DISPONIBILE = "n.d."
+
+_tabella_corrente = None
+_lock_caricamento = threading.Lock()
+
+
+#############################
+# TABELLA CODICI CATASTALI #
+#############################
+class TabellaCodiciCatastali:
+    """Tabelle dei comuni e degli stati con gli indici per la ricerca in entrambe le direzioni.
+
+    Attributes:
+        comuni (dict[str, str]): Denominazione del comune -> codice catastale.
+        stati (dict[str, str]): Denominazione dello stato -> codice catastale.
+        comuni_e_stati (dict[str, str]): Unione di `comuni` e `stati`.
+        denominazioni_per_codice (dict[str, str]): Codice catastale -> denominazione del comune o stato.
+        directory (str | None): Directory dei CSV da cui è stata caricata la tabella.
+        firme (dict[str, dict] | None): Firme dei CSV caricati (vedi `_firma_file`), per riconoscerne
+            le modifiche successive.
+        indice_storico (IndiceStoricoComuni | None): Indice storico dei comuni della stessa versione dei
+            CSV, caricato al primo utilizzo da `indice_storico_comuni`. Essendo legato alla tabella,
+            tabella e indice vengono sostituiti insieme con un solo assegnamento.
+    """
+
+    def __init__(self, comuni, stati, directory=None, firme=None, indice_storico=None):
+        self.comuni = comuni
+        self.stati = stati
+        self.directory = directory
+        self.firme = firme
+        self.indice_storico = indice_storico
+        self.comuni_e_stati = comuni | stati
+        self.denominazioni_per_codice = {
+            codice_catastale: denominazione
+            for denominazione, codice_catastale in self.comuni_e_stati.items()
+            if codice_catastale != CODICE_CATASTALE_NON_DISPONIBILE
+        }
+
+    def codice_catastale(self, denominazione):
+        """Restituisce il codice catastale di un comune o stato (denominazione in maiuscolo), o None."""
+        return self.comuni_e_stati.get(denominazione)
+
+    def denominazione(self, codice_catastale):
+        """Restituisce la denominazione associata a un codice catastale (in maiuscolo), o None."""
+        return self.denominazioni_per_codice.get(codice_catastale)
+
+
+####################
+# ACCESSO TABELLE #
+####################
+def tabella_codici_catastali():
+    """Restituisce la tabella dei codici catastali, caricandola al primo utilizzo.
+
+    Il caricamento avviene una sola volta anche con più thread concorrenti; le chiamate
+    successive non acquisiscono lock.
+
+    Returns:
+        TabellaCodiciCatastali: Tabella corrente.
+    """
+    global _tabella_corrente
+    tabella = _tabella_corrente
+    if tabella is None:
+        with _lock_caricamento:
+            if _tabella_corrente is None:
+                comuni, stati, firme = _carica_tabelle_e_firme(DIRECTORY_DATI)
+                _tabella_corrente = TabellaCodiciCatastali(comuni, stati, DIRECTORY_DATI, firme)
+            tabella = _tabella_corrente
+    return tabella
+
+
+def imposta_tabella_codici_catastali(tabella):
+    """Sostituisce la tabella corrente con una già pronta, senza leggere i file.
+
+    Usata per scegliere un backend alternativo (ad es. `TabellaCodiciCatastaliMmap`) o per
+    inizializzare i processi worker con la tabella del processo principale.
+
+    Args:
+        tabella (TabellaCodiciCatastali | TabellaCodiciCatastaliMmap): Tabella da usare per le ricerche.
+    """
+    global _tabella_corrente
+    with _lock_caricamento:
+        _tabella_corrente = tabella
+
+
+#######################
+# CARICAMENTO TABELLE #
+#######################
+def carica_tabelle(directory=DIRECTORY_DATI, usa_snapshot=True):
+    """Carica le tabelle dei comuni e degli stati, preferendo lo snapshot precompilato.
+
+    Lo snapshot viene usato solo se è aggiornato rispetto ai CSV (stessa dimensione e data di
+    modifica, oppure stesso hash del contenuto); in caso contrario si rileggono i CSV.
+
+    Args:
+        directory (str, optional): Directory contenente i CSV e lo snapshot. Default a `DIRECTORY_DATI`.
+        usa_snapshot (bool, optional): Se False, legge sempre i CSV. Default a True.
+
+    Returns:
+        tuple[dict[str, str], dict[str, str]]: Dizionari denominazione -> codice catastale di comuni e stati.
+    """
+    return _carica_tabelle_e_firme(directory, usa_snapshot)[:2]
+
+
+def _carica_tabelle_e_firme(directory, usa_snapshot=True):
+    """Come `carica_tabelle`, restituendo anche le firme dei CSV effettivamente caricati.
+
+    Con lo snapshot le firme sono quelle salvate alla compilazione; leggendo i CSV sono calcolate
+    prima della lettura, così una modifica successiva viene sempre riconosciuta.
+
+    Returns:
+        tuple[dict[str, str], dict[str, str], dict[str, dict]]: Comuni, stati e firme dei CSV.
+    """
+    if usa_snapshot:
+        snapshot = _leggi_snapshot(directory)
+        if snapshot is not None:
+            comuni, stati, _, firme = snapshot
+            return comuni, stati, firme
+    firme = {nome_file: _firma_file(os.path.join(directory, nome_file), con_hash=True)
+             for nome_file in (FILE_COMUNI, FILE_STATI)}
+    return (*_carica_da_csv(directory), firme)
+
+
+def carica_periodi_comuni(directory=DIRECTORY_DATI, usa_snapshot=True):
+    """Carica le righe con i periodi di validità dei comuni, preferendo lo snapshot precompilato.
+
+    Args:
+        directory (str, optional): Directory contenente i CSV e lo snapshot. Default a `DIRECTORY_DATI`.
+        usa_snapshot (bool, optional): Se False, legge sempre il CSV dei comuni. Default a True.
+
+    Returns:
+        list[tuple[str, str, str, int, int]]: Denominazione (in maiuscolo), codice catastale, sigla della
+        provincia, data di costituzione e data di cessazione come ordinali di `date` (0 se assente o non
+        valida), così lo snapshot non richiede di rileggere le date.
+    """
+    if usa_snapshot:
+        snapshot = _leggi_snapshot(directory)
+        if snapshot is not None:
+            return snapshot[2]
+    return _carica_periodi_da_csv(directory)
+
+
+def compila_snapshot(directory=DIRECTORY_DATI):
+    """Compila i CSV dei comuni e degli stati, con i periodi di validità dei comuni, in uno snapshot binario.
+
+    Args:
+        directory (str, optional): Directory contenente i CSV; lo snapshot viene scritto nella stessa directory.
+
+    Returns:
+        str: Percorso dello snapshot scritto.
+    """
+    firme = {nome_file: _firma_file(os.path.join(directory, nome_file), con_hash=True)
+             for nome_file in (FILE_COMUNI, FILE_STATI)}
+    comuni, stati, periodi = _carica_da_csv_con_periodi(directory)
+    percorso_snapshot = os.path.join(directory, FILE_SNAPSHOT)
+    percorso_temporaneo = f"{percorso_snapshot}.{os.getpid()}.tmp"
+    with open(percorso_temporaneo, "wb") as file:
+        marshal.dump((VERSIONE_SNAPSHOT, firme, comuni, stati, periodi), file)
+    os.replace(percorso_temporaneo, percorso_snapshot)
+    return percorso_snapshot
+
+
+def _carica_da_csv(directory):
+    """Legge le tabelle dei comuni e degli stati direttamente dai CSV."""
+    return (_crea_dict_denominazione_codice_catastale_da_csv(os.path.join(directory, FILE_COMUNI)),
+            _crea_dict_denominazione_codice_catastale_da_csv(os.path.join(directory, FILE_STATI)))
+
+
+def _carica_da_csv_con_periodi(directory):
+    """Come `_carica_da_csv`, restituendo anche i periodi dei comuni con una sola lettura del loro CSV.
+
+    Returns:
+        tuple[dict[str, str], dict[str, str], list[tuple[str, str, str, int, int]]]: Comuni, stati e
+        periodi di validità dei comuni (vedi `carica_periodi_comuni`).
+    """
+    periodi = _carica_periodi_da_csv(directory)
+    # Stesse righe e stesso ordine di `_crea_dict_denominazione_codice_catastale_da_csv`: vale l'ultima riga
+    comuni = {denominazione: codice_catastale for denominazione, codice_catastale, *_ in periodi}
+    return comuni, _crea_dict_denominazione_codice_catastale_da_csv(os.path.join(directory, FILE_STATI)), periodi
+
+
+def _carica_periodi_da_csv(directory):
+    """Legge dal CSV dei comuni le righe dei periodi di validità (vedi `carica_periodi_comuni`)."""
+    periodi = []
+    with open(os.path.join(directory, FILE_COMUNI), mode='r', encoding='latin1') as file:
+        for row in csv.DictReader(file, delimiter=';'):
+            denominazione = (row.get("Denominazione Italiana") or "").upper()
+            codice_catastale = row.get("Codice Catastale")
+            if denominazione and codice_catastale:  # Salta le righe incomplete
+                periodi.append((denominazione, codice_catastale, row.get("Sigla Provincia") or "",
+                                _ordinale_data(row.get(COLONNA_DATA_COSTITUZIONE)),
+                                _ordinale_data(row.get(COLONNA_DATA_CESSAZIONE))))
+    return periodi
+
+
+def _ordinale_data(valore):
+    """Converte una data GG/MM/AAAA della tabella dei comuni nel suo ordinale, 0 se assente o non valida."""
+    try:
+        return date(int(valore[6:10]), int(valore[3:5]), int(valore[:2])).toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+def _carica_da_snapshot(directory):
+    """Legge le tabelle dallo snapshot, se esiste ed è aggiornato rispetto ai CSV.
+
+    Returns:
+        tuple[dict[str, str], dict[str, str]] | None: Tabelle di comuni e stati, o None se lo snapshot
+        manca, è di una versione diversa o non corrisponde più ai CSV.
+    """
+    snapshot = _leggi_snapshot(directory)
+    return None if snapshot is None else snapshot[:2]
+
+
+def _leggi_snapshot(directory):
+    """Restituisce comuni, stati, periodi e firme dei CSV dallo snapshot, o None se assente o non aggiornato."""
+    try:
+        with open(os.path.join(directory, FILE_SNAPSHOT), "rb") as file:
+            versione, firme, *tabelle = marshal.loads(file.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if versione != VERSIONE_SNAPSHOT or not all(
+            _is_firma_aggiornata(os.path.join(directory, nome_file), firme.get(nome_file))
+            for nome_file in (FILE_COMUNI, FILE_STATI)):
+        return None
+    return (*tabelle, firme)
+
+
+def _firma_file(percorso, con_hash=False):
+    """Restituisce dimensione, data di modifica e, opzionalmente, hash SHA-256 di un file."""
+    stat = os.stat(percorso)
+    firma = {"dimensione": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if con_hash:
+        import hashlib  # import ritardato: serve solo alla compilazione e ai controlli di uno snapshot modificato
+
+        with open(percorso, "rb") as file:
+            firma["sha256"] = hashlib.sha256(file.read()).hexdigest()
+    return firma
+
+
+def _is_firma_aggiornata(percorso, firma_salvata):
+    """Verifica che un file corrisponda alla firma salvata nello snapshot.
+
+    Il confronto su dimensione e data di modifica evita di leggere il file; se la data è cambiata
+    (ad es. dopo un checkout) si ricade sul confronto dell'hash del contenuto.
+    """
+    if not firma_salvata:
+        return False
+    try:
+        firma = _firma_file(percorso)
+    except OSError:
+        return False
+    if firma["dimensione"] != firma_salvata["dimensione"]:
+        return False
+    if firma["mtime_ns"] == firma_salvata["mtime_ns"]:
+        return True
+    return _firma_file(percorso, con_hash=True)["sha256"] == firma_salvata["sha256"]
+
+
+if __name__ == "__main__":
+    print(f"Snapshot scritto in {compila_snapshot(*sys.argv[1:])}")
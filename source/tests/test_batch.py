@@ -0,0 +1,83 @@
+import pytest
+from source.batch import CAMPO_ANAGRAFICA, ERRORE_TIPO_NON_VALIDO, MESSAGGIO_ANAGRAFICA_NON_VALIDA, \
+    ErroreCodiceFiscale, decodifica_codici_fiscali, genera_codici_fiscali, valida_codici_fiscali
+from source.codice_fiscale import ERRORE_CARATTERE_CONTROLLO, ERRORE_GIORNO, ERRORE_LUNGHEZZA, ERRORE_MESE
+
+
+################################
+# TEST PER GENERAZIONE MASSIVA #
+################################
+def test_genera_codici_fiscali_da_dizionari_e_sequenze():
+    anagrafiche = [
+        {"cognome": "Rossi", "nome": "Mario", "sesso": "M", "data_nascita": "01/01/1985", "comune": "Roma"},
+        ("Bianchi", "Lara", "F", "20/11/1998", "Milano"),
+    ]
+    assert list(genera_codici_fiscali(anagrafiche)) == ["RSSMRA85A01H501Z", "BNCLRA98S60F205E"]
+
+
+@pytest.mark.parametrize("anagrafica, campo, messaggio", [
+    (("R", "Mario", "M", "01/01/1985", "Roma"), "cognome", "Cognome non valido"),
+    (("Rossi", "M@rio", "M", "01/01/1985", "Roma"), "nome", "Nome non valido"),
+    (("Rossi", "Mario", "X", "01/01/1985", "Roma"), "sesso", "Sesso non valido"),
+    (("Rossi", "Mario", "M", "31/02/1985", "Roma"), "data_nascita", "Data di nascita non valida"),
+    (("Rossi", "Mario", "M", "01/01/1985", "Gotham"), "comune", "Comune/Stato non valido"),
+    ({"cognome": "Rossi", "nome": "Mario", "sesso": "M", "data_nascita": "01/01/1985"}, "comune",
+     "Campo 'comune' mancante"),
+])
+def test_genera_codici_fiscali_errore_strutturato(anagrafica, campo, messaggio):
+    (risultato,) = genera_codici_fiscali([anagrafica])
+    assert isinstance(risultato, ErroreCodiceFiscale)
+    assert risultato.campo == campo
+    assert risultato.messaggio.startswith(messaggio)
+
+
+@pytest.mark.parametrize("anagrafica", [("Rossi", "Mario"), None, 42,
+                                        ("Rossi", "Mario", "M", "01/01/1985", "Roma", "RM", "X")])
+def test_genera_codici_fiscali_anagrafica_malformata(anagrafica):
+    risultati = list(genera_codici_fiscali([anagrafica, ("Rossi", "Mario", "M", "01/01/1985", "Roma")]))
+    assert risultati[0] == (CAMPO_ANAGRAFICA, MESSAGGIO_ANAGRAFICA_NON_VALIDA)
+    assert risultati[1] == "RSSMRA85A01H501Z"
+
+
+def test_genera_codici_fiscali_lazy():
+    def anagrafiche():
+        yield ("Rossi", "Mario", "M", "01/01/1985", "Roma")
+        raise AssertionError("Il generatore non deve consumare l'input in anticipo.")
+
+    assert next(genera_codici_fiscali(anagrafiche())) == "RSSMRA85A01H501Z"
+
+
+################################
+# TEST PER VALIDAZIONE MASSIVA #
+################################
+def test_valida_codici_fiscali():
+    risultati = list(valida_codici_fiscali(["rssmra85a01h501z", "RSSMRA85M01H501A", None]))
+    assert risultati[0] == "RSSMRA85A01H501Z"
+    assert risultati[1] == ErroreCodiceFiscale(
+        "codice_fiscale", "Codice fiscale non valido. Il carattere di controllo non corrisponde.")
+    assert risultati[2].campo == "codice_fiscale"
+
+
+###############################
+# TEST PER DECODIFICA MASSIVA #
+###############################
+def test_decodifica_codici_fiscali_colonnare():
+    codici = ["RSSMRA85A01H501Z", "BNCLRA98S60F205E", "RSSMRA85M01H501A", "RSSMRAURALMHRLMJ", None]
+    blocchi = list(decodifica_codici_fiscali(codici, dimensione_blocco=3))
+    assert [len(blocco["anno"]) for blocco in blocchi] == [3, 2]
+
+    colonne = {nome: [valore for blocco in blocchi for valore in blocco[nome]] for nome in blocchi[0]}
+    assert colonne["codice_errore"] == [0, 0, ERRORE_CARATTERE_CONTROLLO, 0, ERRORE_TIPO_NON_VALIDO]
+    assert colonne["anno"] == [1985, 1998, 0, 1985, 0]
+    assert colonne["mese"] == [1, 11, 0, 1, 0]
+    assert colonne["giorno"] == [1, 20, 0, 1, 0]
+    assert bytes(colonne["sesso"]) == b"MF-M-"
+    assert colonne["codice_catastale"] == ["H501", "F205", None, "H501", None]
+    assert colonne["luogo_nascita"] == ["ROMA", "MILANO", None, "ROMA", None]
+
+
+def test_decodifica_codici_fiscali_date_inesistenti():
+    # Formalmente validi, ma 31 febbraio e mese 'Z' non formano una data: errore come in decodifica_codice_fiscale
+    blocco = next(decodifica_codici_fiscali(["RSSMRA85B31H501B", "RSSMRA85Z01H501V", "RSS"]))
+    assert list(blocco["codice_errore"]) == [ERRORE_GIORNO, ERRORE_MESE, ERRORE_LUNGHEZZA]
+    assert blocco["luogo_nascita"] == [None, None, None]
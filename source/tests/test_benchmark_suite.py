@@ -0,0 +1,31 @@
+import json
+import pytest
+from source.benchmarks.suite import BENCHMARK, confronta_risultati, esegui_suite, main
+
+
+def _risultati(**durate):
+    return {"risultati": {nome: {"operazioni": 10, "durata_migliore": durata} for nome, durata in durate.items()}}
+
+
+def test_esegui_suite_senza_avvio():
+    risultati = esegui_suite(20, ripetizioni=1, includi_avvio=False)
+    assert list(risultati["risultati"]) == list(BENCHMARK)
+    assert risultati["metadati"]["numero_record"] == 20
+    assert risultati["risultati"]["genera_codice_fiscale"]["operazioni"] == 20
+    assert risultati["risultati"]["formatta_stringa"]["operazioni"] == 40
+    json.dumps(risultati)
+
+
+def test_confronta_risultati_segnala_regressioni():
+    confronti = confronta_risultati(_risultati(a=1.0, b=1.0, solo_base=1.0), _risultati(a=1.05, b=1.5), soglia=0.1)
+    assert [(confronto["nome"], confronto["regressione"]) for confronto in confronti] == [("a", False), ("b", True)]
+    assert confronti[1]["rapporto"] == pytest.approx(1.5)
+
+
+def test_main_confronta_codice_di_uscita(tmp_path, capsys):
+    base, nuovi = tmp_path / "base.json", tmp_path / "nuovi.json"
+    base.write_text(json.dumps(_risultati(a=1.0)))
+    nuovi.write_text(json.dumps(_risultati(a=2.0)))
+    assert main(["confronta", str(base), str(nuovi)]) == 1
+    assert main(["confronta", str(base), str(nuovi), "--soglia", "1.5"]) == 0
+    assert "REGRESSIONE" in capsys.readouterr().out
@@ -0,0 +1,73 @@
+import threading
+import pytest
+from source.cache import DIMENSIONE_CACHE_PREDEFINITA, CacheLRU
+from source.codice_fiscale import (codifica_cognome, codifica_nome, configura_cache_codifiche,
+                                   statistiche_cache_codifiche, svuota_cache_codifiche)
+
+
+##################
+# TEST CACHE LRU #
+##################
+def test_cache_lru_hit_miss_evizioni():
+    cache = CacheLRU(2)
+    assert cache.ottieni("a", str.upper) == "A"
+    assert cache.ottieni("b", str.upper) == "B"
+    assert cache.ottieni("a", str.upper) == "A"  # "a" diventa la più recente
+    cache.ottieni("c", str.upper)                # rimuove "b"
+    cache.ottieni("b", str.upper)                # rimuove "a"
+    statistiche = cache.statistiche()
+    assert (statistiche["hit"], statistiche["miss"], statistiche["evizioni"]) == (1, 4, 2)
+    assert statistiche["voci"] == 2 and statistiche["hit_rate"] == pytest.approx(0.2)
+
+
+def test_cache_lru_non_memorizza_eccezioni():
+    cache = CacheLRU(4)
+    with pytest.raises(ValueError):
+        cache.ottieni("x", int)
+    assert len(cache) == 0
+
+
+def test_cache_lru_disattivata_e_ridimensionata():
+    cache = CacheLRU(0)
+    cache.ottieni("a", str.upper)
+    cache.ottieni("a", str.upper)
+    assert cache.statistiche()["miss"] == 2 and len(cache) == 0
+    cache.ridimensiona(3)
+    for chiave in "abcd":
+        cache.ottieni(chiave, str.upper)
+    cache.ridimensiona(1)
+    assert len(cache) == 1 and cache.statistiche()["evizioni"] == 3
+    with pytest.raises(ValueError):
+        cache.ridimensiona(-1)
+
+
+def test_cache_lru_thread_concorrenti():
+    cache = CacheLRU(8)
+    thread = [threading.Thread(target=lambda: [cache.ottieni(i % 16, str) for i in range(2000)]) for _ in range(4)]
+    for t in thread:
+        t.start()
+    for t in thread:
+        t.join()
+    statistiche = cache.statistiche()
+    assert statistiche["hit"] + statistiche["miss"] == 8000 and len(cache) == 8
+
+
+##########################################
+# TEST CACHE DELLE CODIFICHE ANAGRAFICHE #
+##########################################
+def test_cache_codifiche_cognome_nome():
+    svuota_cache_codifiche()
+    try:
+        assert [codifica_cognome("Rossi") for _ in range(3)] == ["RSS"] * 3
+        assert codifica_nome("Gianfranco") == "GFR"
+        with pytest.raises(ValueError):
+            codifica_nome("M4rio")
+        statistiche = statistiche_cache_codifiche()
+        assert (statistiche["cognome"]["hit"], statistiche["cognome"]["miss"]) == (2, 1)
+        assert statistiche["nome"]["miss"] == 2 and statistiche["nome"]["voci"] == 1
+        configura_cache_codifiche(0)
+        assert codifica_cognome("Rossi") == "RSS"
+        assert statistiche_cache_codifiche()["cognome"]["voci"] == 0
+    finally:
+        configura_cache_codifiche(DIMENSIONE_CACHE_PREDEFINITA)
+        svuota_cache_codifiche()
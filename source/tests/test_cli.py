@@ -0,0 +1,115 @@
+import io
+import json
+import pytest
+from source.cli import esegui, main
+
+
+ANAGRAFICHE_CSV = (
+    "SURNAME;nome;sesso;data_nascita;comune\n"
+    "Rossi;Mario;M;01/01/1985;Roma\n"
+    "Bianchi;Lara;F;20/11/1998;Gotham\n"
+    "Giorgi;Maria;F;10/08/1985;Lecce\n"
+)
+
+
+#####################################
+# TEST PER GENERAZIONE DA FILE CSV #
+#####################################
+@pytest.mark.parametrize("workers, dimensione_chunk", [(1, 1000), (2, 1)])
+def test_esegui_generate_csv(workers, dimensione_chunk):
+    output = io.StringIO()
+    riepilogo = esegui("generate", io.StringIO(ANAGRAFICHE_CSV), output, mappatura={"cognome": "SURNAME"},
+                       workers=workers, dimensione_chunk=dimensione_chunk)
+    righe = output.getvalue().splitlines()
+    assert righe[0] == "SURNAME;nome;sesso;data_nascita;comune;codice_fiscale;campo_errore;errore"
+    assert righe[1].endswith(";RSSMRA85A01H501Z;;")
+    assert ";comune;Comune/Stato non valido." in righe[2]
+    assert righe[3].endswith(";GRGMRA85M50E506R;;")
+    assert riepilogo["record"] == 3
+    assert riepilogo["errori_per_campo"] == {"comune": 1}
+
+
+def test_esegui_generate_csv_su_output_precedente():
+    output = io.StringIO()
+    esegui("generate", io.StringIO(ANAGRAFICHE_CSV), output, mappatura={"cognome": "SURNAME"})
+    output_precedente = output.getvalue().replace("RSSMRA85A01H501Z", "OLD")
+    output = io.StringIO()
+    esegui("generate", io.StringIO(output_precedente), output, mappatura={"cognome": "SURNAME"})
+    righe = output.getvalue().splitlines()
+    assert righe[0] == "SURNAME;nome;sesso;data_nascita;comune;codice_fiscale;campo_errore;errore"
+    assert righe[1:] == output_precedente.replace("OLD", "RSSMRA85A01H501Z").splitlines()[1:]
+
+
+def test_esegui_generate_csv_con_provincia():
+    input_csv = io.StringIO("cognome;nome;sesso;data_nascita;comune;prov\n"
+                            "Rossi;Mario;M;01/01/1980;Castro;LE\n"
+                            "Rossi;Mario;M;01/01/1980;Castro;\n")
+    output = io.StringIO()
+    riepilogo = esegui("generate", input_csv, output, mappatura={"provincia": "prov"})
+    righe = output.getvalue().splitlines()
+    assert righe[1].endswith(";RSSMRA80A01M261X;;")
+    assert ";comune;Comune ambiguo." in righe[2]
+    assert riepilogo["errori_per_campo"] == {"comune": 1}
+
+
+######################################
+# TEST PER VALIDAZIONE DA FILE JSONL #
+######################################
+def test_esegui_validate_jsonl():
+    input_jsonl = io.StringIO('{"cf": "RSSMRA85A01H501Z"}\n\n{"cf": "RSSMRA85A01H501A"}\n')
+    output = io.StringIO()
+    riepilogo = esegui("validate", input_jsonl, output, formato="jsonl", mappatura={"codice_fiscale": "cf"})
+    righe = [json.loads(riga) for riga in output.getvalue().splitlines()]
+    assert righe[0] == {"cf": "RSSMRA85A01H501Z", "valido": True, "campo_errore": None, "errore": None}
+    assert righe[1]["valido"] is False
+    assert righe[1]["errore"] == "Codice fiscale non valido. Il carattere di controllo non corrisponde."
+    assert riepilogo["errori"] == 1
+
+
+@pytest.mark.parametrize("comando, colonna, valore_errore", [("validate", "valido", False),
+                                                             ("generate", "codice_fiscale", None)])
+def test_esegui_jsonl_righe_malformate_non_interrompono(comando, colonna, valore_errore):
+    input_jsonl = io.StringIO('{"codice_fiscale": "RSSMRA85A01H501Z"}\n{"codice_fiscale": \n[1, 2]\n"x"\n'
+                              '{"codice_fiscale": "RSSMRA85A01H501Z"}\n')
+    output = io.StringIO()
+    riepilogo = esegui(comando, input_jsonl, output, formato="jsonl")
+    righe = [json.loads(riga) for riga in output.getvalue().splitlines()]
+    assert len(righe) == 5 and riepilogo["record"] == 5
+    assert [riga.get("riga") for riga in righe] == [None, 2, 3, 4, None]
+    for riga in righe[1:4]:
+        assert riga[colonna] is valore_errore
+        assert riga["campo_errore"] == "riga"
+        assert riga["errore"].startswith(f"Riga {riga['riga']}: ")
+    assert riepilogo["errori_per_campo"]["riga"] == 3
+
+
+def test_main_mappatura_non_valida():
+    with pytest.raises(SystemExit):
+        main(["generate", "--map", "codice=X"])
+
+
+def test_main_metriche_e_profilo(tmp_path, capsys):
+    percorso = tmp_path / "anagrafiche.csv"
+    percorso.write_text(ANAGRAFICHE_CSV.replace("SURNAME", "cognome"), encoding="utf-8")
+    assert main(["generate", str(percorso), "--metrics", "prometheus", "--profile"]) == 0
+    errori = capsys.readouterr().err
+    assert 'codicefiscale_errori_total{operazione="genera",causa="comune"} 1' in errori
+    assert "function calls" in errori
+
+
+def test_main_generate_deduplicato_con_cache(tmp_path, capsys):
+    percorso = tmp_path / "anagrafiche.csv"
+    percorso.write_text(ANAGRAFICHE_CSV.replace("SURNAME", "cognome") + "ROSSI;mario;m;1985-01-01;ROMA\n",
+                        encoding="utf-8")
+    cache = str(tmp_path / "cache.sqlite")
+    assert main(["generate", str(percorso), "--dedup-cache", cache]) == 0
+    output, errori = capsys.readouterr()
+    assert output.splitlines()[4].endswith(";RSSMRA85A01H501Z;;")
+    assert "Deduplicazione: 3 calcolati, 0 dalla cache su disco, 1 riutilizzati" in errori
+    assert main(["generate", str(percorso), "--dedup-cache", cache]) == 0
+    assert "Deduplicazione: 1 calcolati, 2 dalla cache su disco, 1 riutilizzati" in capsys.readouterr().err
+
+
+def test_main_dedup_richiede_un_worker():
+    with pytest.raises(SystemExit):
+        main(["generate", "--dedup", "--workers", "2"])
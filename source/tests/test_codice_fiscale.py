@@ -1,5 +1,6 @@
 import pytest
 from source.codice_fiscale import *
+from source.codice_fiscale import _calcola_carattere_controllo_riferimento
 
 
 #######################################
@@ -51,7 +52,8 @@ def test_codifica_nome(nome, expected):
     ("01/01/2000", "F", "00A41"),  # Donna, +40 sul giorno
     ("15/07/1995", "M", "95L15"),  # Uomo, mese luglio
     ("10/10/1980", "F", "80R50"),  # Donna, giorno 10 -> 50
-    ("29/02/2020", "M", "20B29")   # Uomo, anno bisestile
+    ("29/02/2020", "M", "20B29"),  # Uomo, anno bisestile
+    ("2005-12-31", "F", "05T71"),  # Donna, formato ISO
 ])
 def test_codifica_data_nascita(data_nascita, sesso, expected):
     assert codifica_data_nascita(data_nascita, sesso) == expected
@@ -81,4 +83,90 @@ def test_codifica_comune(comune, expected):
     ("GRGMRA85M10L219", "T"),  # Codice parziale per "Giorgi Maria", maschio, 10/08/1985, Lecce
 ])
 def test_calcola_carattere_controllo(codice_senza_controllo, expected):
-    assert calcola_carattere_controllo(codice_senza_controllo) == expected
\ No newline at end of file
+    assert calcola_carattere_controllo(codice_senza_controllo) == expected
+
+##############################
+# TEST PER DECODIFICA COMUNE #
+##############################
+@pytest.mark.parametrize("codice_catastale, expected", [
+    ("H501", "ROMA"),             # Codice nazionale per Roma
+    ("f205", "MILANO"),           # Codice in minuscolo
+    ("Z100", "ALBANIA"),          # Codice di uno stato estero
+])
+def test_decodifica_comune(codice_catastale, expected):
+    assert decodifica_comune(codice_catastale) == expected
+
+
+@pytest.mark.parametrize("codice_catastale", [
+    "X501", "n.d.", ""
+])
+def test_decodifica_comune_non_valido(codice_catastale):
+    with pytest.raises(ValueError, match="Codice catastale non valido"):
+        decodifica_comune(codice_catastale)
+
+
+@pytest.mark.parametrize("codice_senza_controllo", ["rssmra85m01h501", "RSSMRA85M01H50!", "RSSMRA85M01H5É1"])
+def test_calcola_carattere_controllo_carattere_non_valido(codice_senza_controllo):
+    with pytest.raises(KeyError):
+        calcola_carattere_controllo(codice_senza_controllo)
+
+
+def test_calcola_carattere_controllo_equivalente_al_riferimento():
+    caratteri = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    for i in range(len(caratteri)):
+        codice_senza_controllo = (caratteri[i:] + caratteri[:i])[:15]
+        assert (calcola_carattere_controllo(codice_senza_controllo)
+                == _calcola_carattere_controllo_riferimento(codice_senza_controllo))
+
+
+#####################
+# TEST PER OMOCODIA #
+#####################
+@pytest.mark.parametrize("codice_fiscale, expected", [
+    ("RSSMRA85A01H50MR", "RSSMRA85A01H501Z"),  # Sostituzione dell'ultima cifra
+    ("rssmrauralmhrlmj", "RSSMRA85A01H501Z"),  # Tutte le cifre sostituite, in minuscolo
+    ("RSSMRA85A01H501Z", "RSSMRA85A01H501Z"),  # Codice non omocodico
+])
+def test_normalizza_omocodia(codice_fiscale, expected):
+    assert normalizza_omocodia(codice_fiscale) == expected
+
+
+def test_varianti_omocodiche():
+    varianti = varianti_omocodiche("RSSMRA85A01H501Z")
+    assert len(set(varianti)) == 127
+    assert varianti[0] == "RSSMRA85A01H50MR"
+    assert "RSSMRA85A01H501Z" not in varianti
+    assert all(is_valido_codice_fiscale(variante) for variante in varianti)
+    assert {normalizza_omocodia(variante) for variante in varianti} == {"RSSMRA85A01H501Z"}
+    assert varianti_omocodiche(varianti[42]) == varianti
+
+
+def test_normalizza_omocodia_lunghezza_non_valida():
+    with pytest.raises(ValueError, match="Deve essere lungo 16 caratteri"):
+        normalizza_omocodia("RSSMRA85A01H50M")
+
+
+######################################
+# TEST PER DECODIFICA CODICE FISCALE #
+######################################
+@pytest.mark.parametrize("codice_fiscale, oggi, expected", [
+    ("RSSMRA85A01H501Z", None, (date(1985, 1, 1), "M", "H501", "ROMA")),
+    ("bnclra98s60f205e", None, (date(1998, 11, 20), "F", "F205", "MILANO")),
+    ("RSSMRAURALMHRLMJ", None, (date(1985, 1, 1), "M", "H501", "ROMA")),       # Codice omocodico
+    ("CRSRLD00A01F205F", date(2024, 1, 1), (date(2000, 1, 1), "M", "F205", "MILANO")),
+    ("CRSRLD00A01F205F", date(1999, 12, 31), (date(1900, 1, 1), "M", "F205", "MILANO")),  # 2000 sarebbe futuro
+])
+def test_decodifica_codice_fiscale(codice_fiscale, oggi, expected):
+    assert decodifica_codice_fiscale(codice_fiscale, oggi) == expected
+
+
+@pytest.mark.parametrize("codice_fiscale, expected_error", [
+    ("RSSMRA85A01H501A", "Codice fiscale non valido. Il carattere di controllo non corrisponde."),
+    ("RSSMRA85F01H501" + calcola_carattere_controllo("RSSMRA85F01H501"), "Codice fiscale non valido. Posizione 9"),
+    ("RSSMRA85B30H501" + calcola_carattere_controllo("RSSMRA85B30H501"), "Codice fiscale non valido. Posizioni 10-11"),
+    ("RSSMRA85A35H501" + calcola_carattere_controllo("RSSMRA85A35H501"), "Codice fiscale non valido. Posizioni 10-11"),
+])
+def test_decodifica_codice_fiscale_non_valido(codice_fiscale, expected_error):
+    with pytest.raises(ValueError) as excinfo:
+        decodifica_codice_fiscale(codice_fiscale)
+    assert str(excinfo.value).startswith(expected_error)
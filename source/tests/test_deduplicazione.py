@@ -0,0 +1,106 @@
+import pytest
+from source import deduplicazione
+from source.batch import CAMPO_ANAGRAFICA, ErroreCodiceFiscale, genera_codici_fiscali
+from source.benchmarks.dati import genera_anagrafiche
+from source.deduplicazione import CacheCodiciFiscaliSqlite, GeneratoreDeduplicato, genera_codici_fiscali_deduplicati
+
+
+ANAGRAFICHE_EQUIVALENTI = [
+    ("Rossi", "Mario", "M", "01/01/1985", "Roma"),
+    ("ROSSI ", "mario", "m", "1985-01-01", "roma"),
+    {"cognome": "Rossi", "nome": "Mario", "sesso": "M", "data_nascita": "01/01/1985", "comune": "ROMA"},
+    ("Rossi", "Mario", "M", "01/01/1985", "Roma"),
+]
+
+
+####################################
+# TEST PER GENERAZIONE DEDUPLICATA #
+####################################
+def test_anagrafiche_equivalenti_calcolate_una_volta():
+    generatore = GeneratoreDeduplicato()
+    assert list(generatore.genera(ANAGRAFICHE_EQUIVALENTI)) == ["RSSMRA85A01H501Z"] * 4
+    statistiche = generatore.statistiche()
+    assert statistiche["righe"] == 4
+    assert statistiche["calcolate"] == 1
+    assert statistiche["riutilizzate"] == 3
+    assert statistiche["rapporto_deduplicazione"] == 4
+
+
+def test_risultati_identici_alla_generazione_massiva():
+    anagrafiche = genera_anagrafiche(300, seme=7, percentuale_errori=0.2) * 2
+    anagrafiche.append(("R", "Mario", "M", "01/01/1985", "Roma"))
+    attesi = list(genera_codici_fiscali(anagrafiche))
+    assert list(genera_codici_fiscali_deduplicati(anagrafiche)) == attesi
+    assert any(isinstance(risultato, ErroreCodiceFiscale) for risultato in attesi)
+
+
+def test_cognome_non_valido_non_confuso_con_equivalente_normalizzato():
+    # " A" è valido (due caratteri) ma "A" no, anche se la forma normalizzata coincide
+    risultati = list(genera_codici_fiscali_deduplicati([(" A", "Mario", "M", "01/01/1985", "Roma"),
+                                                        ("A", "Mario", "M", "01/01/1985", "Roma")]))
+    assert isinstance(risultati[0], str)
+    assert risultati[1].campo == "cognome"
+
+
+def test_comuni_omonimi_distinti_dalla_provincia():
+    anagrafiche = [("Rossi", "Mario", "M", "01/01/1980", "Castro", provincia) for provincia in ("BG", "LE", None)]
+    risultati = list(genera_codici_fiscali_deduplicati(anagrafiche * 2))
+    assert risultati == list(genera_codici_fiscali(anagrafiche * 2))
+    assert [risultato[11:15] for risultato in risultati[:2]] == ["C337", "M261"]
+    assert risultati[2].campo == "comune"
+
+
+def test_valori_non_hashable_restituiscono_errore():
+    (risultato,) = genera_codici_fiscali_deduplicati([(["Rossi"], "Mario", "M", "01/01/1985", "Roma")])
+    assert risultato.campo == "cognome"
+
+
+def test_anagrafiche_malformate_restituiscono_errore():
+    risultati = list(genera_codici_fiscali_deduplicati([("Rossi", "Mario"), None, ANAGRAFICHE_EQUIVALENTI[0]]))
+    assert [risultato.campo for risultato in risultati[:2]] == [CAMPO_ANAGRAFICA] * 2
+    assert risultati[2] == "RSSMRA85A01H501Z"
+
+
+def test_duplicati_normalizzati_non_rivalidati(monkeypatch):
+    chiamate = []
+    originale = deduplicazione._componenti_canoniche
+    monkeypatch.setattr(deduplicazione, "_componenti_canoniche",
+                        lambda valori, oggi: chiamate.append(valori) or originale(valori, oggi))
+    anagrafiche = [("Rossi", "Mario", "M", "01/01/1985", "Roma"), ("ROSSI", "mario", "m", "01/01/1985", "ROMA")]
+    assert list(genera_codici_fiscali_deduplicati(anagrafiche)) == ["RSSMRA85A01H501Z"] * 2
+    assert len(chiamate) == 1
+
+
+#########################
+# TEST PER CACHE SQLITE #
+#########################
+def test_cache_sqlite_persistente_tra_esecuzioni(tmp_path):
+    percorso = str(tmp_path / "cache.sqlite")
+    with CacheCodiciFiscaliSqlite(percorso) as cache:
+        generatore = GeneratoreDeduplicato(cache)
+        list(generatore.genera(ANAGRAFICHE_EQUIVALENTI))
+        assert generatore.statistiche()["calcolate"] == 1
+    with CacheCodiciFiscaliSqlite(percorso) as cache:
+        generatore = GeneratoreDeduplicato(cache)
+        assert list(generatore.genera(ANAGRAFICHE_EQUIVALENTI)) == ["RSSMRA85A01H501Z"] * 4
+        statistiche = generatore.statistiche()
+    assert statistiche["calcolate"] == 0
+    assert statistiche["da_cache_disco"] == 1
+    assert statistiche["secondi_calcolo"] == 0  # la canonicalizzazione delle righe lette dal disco è sovraccarico
+
+
+def test_cache_sqlite_limitata_elimina_le_meno_recenti(tmp_path):
+    with CacheCodiciFiscaliSqlite(str(tmp_path / "cache.sqlite"), dimensione_massima=2) as cache:
+        cache.salva({"a": "A"})
+        cache.salva({"b": "B"})
+        assert cache.cerca(["a"]) == {"a": "A"}
+        cache.salva({"c": "C", "a": "A"})
+        assert len(cache) == 2
+        assert cache.cerca(["a", "b", "c"]) == {"a": "A", "c": "C"}
+    with CacheCodiciFiscaliSqlite(str(tmp_path / "cache.sqlite"), dimensione_massima=2) as cache:
+        assert len(cache) == 2
+
+
+def test_cache_sqlite_dimensione_non_valida(tmp_path):
+    with pytest.raises(ValueError):
+        CacheCodiciFiscaliSqlite(str(tmp_path / "cache.sqlite"), dimensione_massima=0)
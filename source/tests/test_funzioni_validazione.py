@@ -1,8 +1,13 @@
 # tests/test_funzioni_validazione.py
 
+import re
 import pytest
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import random
 from source.codice_fiscale import is_valido_codice_fiscale, valida_cognome, valida_nome, valida_sesso, valida_data_nascita, valida_comune
+from source.codice_fiscale import (CODICE_FISCALE_VALIDO, ERRORE_CARATTERE_CONTROLLO, ERRORE_CODICE_CATASTALE,
+                                   ERRORE_COGNOME, ERRORE_GIORNO, ERRORE_LUNGHEZZA, ERRORE_MESE,
+                                   codice_errore_codice_fiscale, _codice_errore_codice_fiscale_riferimento)
 
 
 #######################################
@@ -12,6 +17,8 @@ from source.codice_fiscale import is_valido_codice_fiscale, valida_cognome, vali
     "RSSMRA85A01H501Z",  # Codice fiscale corretto 1 "Rossi", "Mario", "M", "01/01/1985", "Roma"
     "CLDSCH69D55H294C",  # Codice fiscale corretto 2 "Claudia", "Sanchi", "F", "15/04/1969", "Rimini"
     "CRSRLD00A01F205F",  # Codice fiscale corretto 3 "Cristiano", "Ronaldo", "M", "01/01/2000", "Milano"
+    "RSSMRA85A01H50MR",  # Codice omocodico: ultima cifra del codice catastale sostituita
+    "RSSMRAURALMHRLMJ",  # Codice omocodico: tutte le cifre sostituite
 ])
 def test_is_valido_codice_fiscale_valido(codice_fiscale):
     """Testa codici fiscali validi per verificare che la funzione ritorni True."""
@@ -26,7 +33,10 @@ def test_is_valido_codice_fiscale_valido(codice_fiscale):
     ("RSSMRA85101H501Z", "Codice fiscale non valido. Posizione 9 deve essere una lettere per mese"), # Posizione 9 '1' non lettera
     ("RSSMRA85M99H501Z", "Codice fiscale non valido. Posizioni 10-11 devono rappresentare un numero tra 01 e 71"), # Posizione 10-11 '99' fuori range
     ("RSSMRA85M01X501Z", "Codice fiscale non valido. Posizioni 12-15 devono rappresentare un valido codice catastale"), # 'X510' non è un codice catastale
-    ("RSSMRA85M01H501A", "Codice fiscale non valido. Il carattere di controllo non corrisponde.") # Carattere di controllo 'A' non valido
+    ("RSSMRA85M01H501A", "Codice fiscale non valido. Il carattere di controllo non corrisponde."), # Carattere di controllo 'A' non valido
+    ("RSSMRA8WM01H501Z", "Codice fiscale non valido. Posizioni 7-8 devono essere numeri per anno"), # 'W' non è una lettera omocodica
+    ("RSSMRA85MVVH501Z", "Codice fiscale non valido. Posizioni 10-11 devono rappresentare un numero tra 01 e 71"), # 'VV' -> 99
+    ("RSSMRA85M01H50MZ", "Codice fiscale non valido. Il carattere di controllo non corrisponde."), # Omocodico senza ricalcolo
 ])
 def test_is_valido_codice_fiscale_non_valido(codice_fiscale, expected_error):
     """Testa codici fiscali non validi per verificare che venga sollevato l'errore corretto."""
@@ -35,6 +45,35 @@ def test_is_valido_codice_fiscale_non_valido(codice_fiscale, expected_error):
     assert str(excinfo.value).startswith(expected_error)
 
 
+@pytest.mark.parametrize("codice_fiscale, expected", [
+    ("RSSMRA85A01H501Z", CODICE_FISCALE_VALIDO),
+    ("rssmra85a01h501z", CODICE_FISCALE_VALIDO),     # minuscole ammesse come nella validazione originale
+    ("RSSMRA85A01H50mr", CODICE_FISCALE_VALIDO),
+    ("RSSMRA85M01H50", ERRORE_LUNGHEZZA),
+    ("RSSMRA85M01H5012Z", ERRORE_LUNGHEZZA),
+    ("RSSMRA85A00H501Z", ERRORE_GIORNO),
+    ("RSSMRA85A72H501Z", ERRORE_GIORNO),
+    ("RSSMRA85A99H5!1Z", ERRORE_GIORNO),             # il giorno viene controllato prima del codice catastale
+    ("RSSMRA85A01H5!1Z", ERRORE_CODICE_CATASTALE),
+    ("RSSMRA85A01H501?", ERRORE_CARATTERE_CONTROLLO),
+    ("ÀSSMRA85A01H501Z", ERRORE_COGNOME),            # caratteri non ASCII non ammessi
+    ("RSSMRA85À01H501Z", ERRORE_MESE),
+])
+def test_codice_errore_codice_fiscale(codice_fiscale, expected):
+    assert codice_errore_codice_fiscale(codice_fiscale) == expected
+
+
+def test_codice_errore_coerente_con_riferimento():
+    generatore = random.Random(0)
+    caratteri = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabclmv"
+    for _ in range(2000):
+        codice = list("RSSMRA85A01H501Z")
+        for _ in range(generatore.randint(1, 2)):
+            codice[generatore.randrange(16)] = generatore.choice(caratteri)
+        codice = "".join(codice)
+        assert codice_errore_codice_fiscale(codice) == _codice_errore_codice_fiscale_riferimento(codice), codice
+
+
 ################################
 # TEST PER VALIDAZIONE COGNOMI #
 ################################
@@ -106,6 +145,10 @@ def test_valida_sesso_non_valido(sesso):
 @pytest.mark.parametrize("data_nascita, expected", [
     ("01/01/2000", "01/01/2000"),
     ("29/02/2020", "29/02/2020"),
+    ("1/2/1985", "01/02/1985"),  # forma non canonica, letta con strptime
+    ("1985-02-01", "01/02/1985"),
+    (date(1985, 2, 1), "01/02/1985"),
+    (datetime(1985, 2, 1, 12, 30), "01/02/1985"),
     ((datetime.today() - timedelta(days=1)).strftime("%d/%m/%Y"),
      (datetime.today() - timedelta(days=1)).strftime("%d/%m/%Y")),
 ])
@@ -122,6 +165,21 @@ def test_valida_data_nascita_non_valida(data_nascita):
         valida_data_nascita(data_nascita)
 
 
+@pytest.mark.parametrize("data_nascita, messaggio", [
+    ("31/02/2000", "Il formato deve essere del tipo 'DD/MM/YYYY'."),
+    ("00/01/2000", "Il formato deve essere del tipo 'DD/MM/YYYY'."),
+    ("01/13/2000", "Il formato deve essere del tipo 'DD/MM/YYYY'."),
+    ("0a/01/2000", "Il formato deve essere del tipo 'DD/MM/YYYY'."),
+    ("2000-02-30", "Il formato deve essere del tipo 'DD/MM/YYYY'."),
+    ("31/12/1899", "Sono valide solo le date che partono dal 01/01/1900."),
+    ("1899-12-31", "Sono valide solo le date che partono dal 01/01/1900."),
+    ("02/01/2020", "Deve essere antecedente alla data odierna."),
+])
+def test_valida_data_nascita_messaggi(data_nascita, messaggio):
+    with pytest.raises(ValueError, match=re.escape(messaggio)):
+        valida_data_nascita(data_nascita, oggi=date(2020, 1, 1))
+
+
 ###############################
 # TEST PER VALIDAZIONE COMUNE #
 ###############################
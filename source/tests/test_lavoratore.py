@@ -0,0 +1,98 @@
+import threading
+import time
+import pytest
+from source.codice_fiscale import genera_codice_fiscale
+from source.lavoratore import LavoratoreSfondo, valida_file_codici_fiscali
+
+
+CODICE_VALIDO = genera_codice_fiscale("Rossi", "Mario", "M", "01/01/1990", "Roma")
+
+
+@pytest.fixture
+def lavoratore():
+    lavoratore = LavoratoreSfondo()
+    yield lavoratore
+    lavoratore.ferma(timeout=5)
+
+
+def _attendi(lavoratore, compito, timeout=5):
+    """Simula il polling di `root.after` finché il compito non è terminato."""
+    scadenza = time.monotonic() + timeout
+    while not compito.terminato:
+        assert time.monotonic() < scadenza
+        lavoratore.elabora_eventi()
+        time.sleep(0.001)
+
+
+def test_risultato_consegnato_nel_thread_chiamante(lavoratore):
+    thread_esecuzione, thread_callback, risultati = [], [], []
+
+    def funzione(x):
+        thread_esecuzione.append(threading.current_thread())
+        return x * 2
+
+    def al_completamento(risultato):
+        thread_callback.append(threading.current_thread())
+        risultati.append(risultato)
+
+    compito = lavoratore.invia(funzione, 21, al_completamento=al_completamento)
+    _attendi(lavoratore, compito)
+    assert risultati == [42]
+    assert thread_esecuzione[0] is not threading.current_thread()
+    assert thread_callback == [threading.current_thread()]
+
+
+def test_errore_consegnato_al_callback(lavoratore):
+    errori = []
+    compito = lavoratore.invia(int, "x", in_caso_di_errore=errori.append)
+    _attendi(lavoratore, compito)
+    assert isinstance(errori[0], ValueError)
+
+
+def test_errore_senza_callback_risollevato(lavoratore):
+    compito = lavoratore.invia(int, "x")
+    with pytest.raises(ValueError):
+        _attendi(lavoratore, compito)
+
+
+def test_compito_annullato_non_eseguito(lavoratore):
+    sblocca = threading.Event()
+    eseguiti = []
+    lavoratore.invia(sblocca.wait)
+    compito = lavoratore.invia(eseguiti.append, 1, al_completamento=eseguiti.append)
+    compito.annulla()
+    sblocca.set()
+    _attendi(lavoratore, compito)
+    assert eseguiti == []
+
+
+def test_elabora_eventi_limita_gli_eventi_per_ciclo(lavoratore):
+    compiti = [lavoratore.invia(abs, -i) for i in range(5)]
+    while not lavoratore._eventi.qsize() == 5:
+        time.sleep(0.001)
+    assert lavoratore.elabora_eventi(massimo=2) == 2
+    assert lavoratore.elabora_eventi() == 3
+    assert all(compito.terminato for compito in compiti)
+
+
+def test_valida_file_con_progresso(lavoratore, tmp_path):
+    percorso = tmp_path / "codici.txt"
+    percorso.write_text("codice_fiscale\n" + f"{CODICE_VALIDO}\n" * 5 + "\nXXX\n", encoding="utf-8")
+    progressi, riepiloghi = [], []
+    compito = lavoratore.invia(valida_file_codici_fiscali, str(percorso), al_progresso=lambda *p: progressi.append(p),
+                               al_completamento=riepiloghi.append)
+    _attendi(lavoratore, compito)
+    riepilogo = riepiloghi[0]
+    assert (riepilogo["totale"], riepilogo["validi"], riepilogo["non_validi"]) == (6, 5, 1)
+    assert riepilogo["errori"][0][:2] == (8, "XXX")
+    assert progressi[-1] == (6, 6)
+
+
+def test_valida_file_interrotto(tmp_path):
+    percorso = tmp_path / "codici.txt"
+    percorso.write_text(f"{CODICE_VALIDO}\n" * 10, encoding="utf-8")
+    annullamento = threading.Event()
+    riepilogo = valida_file_codici_fiscali(str(percorso), progresso=lambda *_: annullamento.set(),
+                                           annullamento=annullamento, dimensione_blocco=3)
+    assert riepilogo["interrotto"]
+    assert riepilogo["elaborati"] == 3
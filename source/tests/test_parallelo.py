@@ -0,0 +1,54 @@
+import multiprocessing
+import pytest
+from source import parallelo, storico_comuni, tabelle
+from source.batch import ErroreCodiceFiscale
+from source.parallelo import elabora_chunk, genera_codici_fiscali_in_parallelo, suddividi_in_chunk, \
+    valida_codici_fiscali_in_parallelo
+
+
+def _tabelle_gia_caricate(chunk):
+    tabella = tabelle._tabella_corrente
+    return [(tabella is not None, tabella is not None and tabella.indice_storico is not None) for _ in chunk]
+
+
+##################################
+# TEST PER SUDDIVISIONE IN CHUNK #
+##################################
+def test_suddividi_in_chunk():
+    assert list(suddividi_in_chunk(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(suddividi_in_chunk([], 3)) == []
+
+
+###################################
+# TEST PER ELABORAZIONE PARALLELA #
+###################################
+@pytest.mark.parametrize("workers, dimensione_chunk", [(1, 2), (2, 1), (3, 2)])
+def test_genera_codici_fiscali_in_parallelo_mantiene_ordine(workers, dimensione_chunk):
+    anagrafiche = [
+        ("Rossi", "Mario", "M", "01/01/1985", "Roma"),
+        ("Martini", "Mattia", "M", "09/04/1925", "Milano"),
+        ("Bianchi", "Lara", "F", "20/11/1998", "Gotham"),
+        ("Giorgi", "Maria", "F", "10/08/1985", "Lecce"),
+    ]
+    risultati = list(genera_codici_fiscali_in_parallelo(anagrafiche, workers, dimensione_chunk))
+    assert risultati[:2] == ["RSSMRA85A01H501Z", "MRTMTT25D09F205Z"]
+    assert isinstance(risultati[2], ErroreCodiceFiscale) and risultati[2].campo == "comune"
+    assert risultati[3] == "GRGMRA85M50E506R"
+
+
+def test_valida_codici_fiscali_in_parallelo():
+    codici = ["RSSMRA85A01H501Z", "RSSMRA85M01H501A", "CLDSCH69D55H294C"] * 5
+    risultati = list(valida_codici_fiscali_in_parallelo(codici, workers=2, dimensione_chunk=4))
+    assert len(risultati) == 15
+    assert risultati[::3] == ["RSSMRA85A01H501Z"] * 5
+    assert all(isinstance(risultato, ErroreCodiceFiscale) for risultato in risultati[1::3])
+
+
+@pytest.mark.parametrize("metodo_avvio", ["fork", "spawn"])
+def test_elabora_chunk_worker_ricevono_tabella_e_indice_storico(monkeypatch, metodo_avvio):
+    if metodo_avvio not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"metodo di avvio '{metodo_avvio}' non disponibile")
+    monkeypatch.setattr(parallelo, "_contesto_multiprocessing", lambda: multiprocessing.get_context(metodo_avvio))
+    storico_comuni.imposta_indice_storico_comuni(None)  # caricato di nuovo da elabora_chunk prima del pool
+    risultati = [esito for blocco in elabora_chunk(_tabelle_gia_caricate, [[1], [2]], workers=2) for esito in blocco]
+    assert risultati == [(True, True)] * 2
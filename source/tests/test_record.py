@@ -0,0 +1,44 @@
+import pytest
+from source.batch import genera_codici_fiscali
+from source.codice_fiscale import genera_codice_fiscale
+from source.record import Anagrafica, CodiciFiscali
+
+CODICI = ["RSSMRA85A01H501Z", "CLDSCH69D55H294C", "CRSRLD00A01F205F"]
+
+
+##############################
+# TEST PER RECORD ANAGRAFICA #
+##############################
+def test_anagrafica_accettata_dalle_funzioni_di_generazione():
+    anagrafica = Anagrafica("Rossi", "Mario", "M", "01/01/1985", "Roma")
+    assert genera_codice_fiscale(*anagrafica) == "RSSMRA85A01H501Z"
+    assert genera_codice_fiscale(**anagrafica._asdict()) == "RSSMRA85A01H501Z"
+    assert list(genera_codici_fiscali([anagrafica])) == ["RSSMRA85A01H501Z"]
+    assert not hasattr(anagrafica, "__dict__")
+
+
+###############################
+# TEST PER CONTENITORE CODICI #
+###############################
+def test_codici_fiscali_sequenza():
+    codici = CodiciFiscali(CODICI)
+    assert len(codici) == 3
+    assert list(codici) == CODICI
+    assert codici[1] == CODICI[1] and codici[-1] == CODICI[-1]
+    assert codici[:2] == CODICI[:2]
+    assert len(codici.buffer) == 48
+    with pytest.raises(IndexError):
+        codici[3]
+
+
+def test_codici_fiscali_lunghezza_non_valida():
+    with pytest.raises(ValueError, match="Deve essere lungo 16 caratteri"):
+        CodiciFiscali(["RSSMRA85A01H501"])
+
+
+def test_codici_fiscali_come_array_numpy():
+    pytest.importorskip("numpy")
+    from source.vettoriale import valida_codici_fiscali_array
+
+    maschera, _ = valida_codici_fiscali_array(CodiciFiscali(CODICI + ["RSSMRA85A01H501A"]).come_array_numpy())
+    assert maschera.tolist() == [True, True, True, False]
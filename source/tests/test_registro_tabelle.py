@@ -0,0 +1,137 @@
+import os
+import shutil
+import threading
+import pytest
+from datetime import date
+from source.codice_fiscale import codifica_comune
+from source.registro_tabelle import RegistroTabelle, confronta_tabelle
+from source.storico_comuni import indice_storico_comuni
+from source.tabella_mmap import TabellaCodiciCatastaliMmap, usa_tabella_mmap
+from source.tabelle import DIRECTORY_DATI, FILE_COMUNI, FILE_STATI, imposta_tabella_codici_catastali, \
+    tabella_codici_catastali
+
+RIGA_NUOVO_COMUNE = "X999;XX;COMUNE DI PROVA;;;;;;;01/01/2000;;\n"
+
+
+@pytest.fixture
+def directory_dati(tmp_path):
+    for nome_file in (FILE_COMUNI, FILE_STATI):
+        shutil.copy(os.path.join(DIRECTORY_DATI, nome_file), tmp_path)
+    tabella_originale = tabella_codici_catastali()
+    yield str(tmp_path)
+    imposta_tabella_codici_catastali(tabella_originale)
+
+
+def _aggiungi_riga(directory, riga):
+    with open(os.path.join(directory, FILE_COMUNI), "a", encoding="latin1") as file:
+        file.write(riga)
+
+
+###################################
+# TEST PER DIFFERENZE TRA TABELLE #
+###################################
+def test_confronta_tabelle():
+    vecchia = {"A": "1", "B": "2", "C": "3"}
+    nuova = {"A": "1", "B": "20", "D": "4"}
+    differenze = confronta_tabelle(vecchia, nuova)
+    assert differenze.aggiunte == {"D": "4"}
+    assert differenze.rimosse == {"C": "3"}
+    assert differenze.modificate == {"B": ("2", "20")}
+    assert differenze.numero_righe == 3
+
+
+##################################
+# TEST PER RICARICAMENTO TABELLE #
+##################################
+def test_nessun_ricaricamento_senza_modifiche(directory_dati):
+    registro = RegistroTabelle(directory_dati)
+    tabella = tabella_codici_catastali()
+    assert registro.controlla() is None
+    os.utime(os.path.join(directory_dati, FILE_COMUNI), ns=(0, 0))  # solo la data di modifica cambia
+    assert registro.controlla() is None
+    assert tabella_codici_catastali() is tabella
+    assert registro.metriche()["controlli"] == 2 and registro.metriche()["ricaricamenti"] == 0
+
+
+def test_ricaricamento_sostituisce_tabella_e_indice(directory_dati):
+    registro = RegistroTabelle(directory_dati)
+    tabella = tabella_codici_catastali()
+    _aggiungi_riga(directory_dati, RIGA_NUOVO_COMUNE)
+    differenze = registro.controlla()
+    assert differenze["comuni"].aggiunte == {"COMUNE DI PROVA": "X999"}
+    assert differenze["stati"].numero_righe == 0
+    nuova_tabella = tabella_codici_catastali()
+    assert nuova_tabella is not tabella
+    assert tabella.codice_catastale("COMUNE DI PROVA") is None  # la tabella precedente non cambia
+    assert nuova_tabella.indice_storico is not None  # pubblicato insieme alla tabella
+    assert indice_storico_comuni(nuova_tabella).codice_catastale("COMUNE DI PROVA", date(2010, 1, 1)) == "X999"
+    assert codifica_comune("Comune di prova") == "X999"
+    assert codifica_comune("Comune di prova", "01/01/2010") == "X999"
+    metriche = registro.metriche()
+    assert metriche["ricaricamenti"] == 1 and metriche["righe_aggiunte"] == 1
+    assert metriche["righe_cambiate_totali"] == 1 and metriche["durata_ultimo_ricaricamento"] > 0
+    assert registro.controlla() is None
+
+
+def test_firme_registrate_al_caricamento(directory_dati):
+    RegistroTabelle(directory_dati)
+    tabella = tabella_codici_catastali()
+    assert tabella.directory == directory_dati
+    _aggiungi_riga(directory_dati, RIGA_NUOVO_COMUNE)  # modifica dopo il caricamento, prima del nuovo registro
+    registro = RegistroTabelle(directory_dati)
+    assert tabella_codici_catastali() is tabella
+    assert registro.controlla()["comuni"].aggiunte == {"COMUNE DI PROVA": "X999"}
+    assert codifica_comune("Comune di prova") == "X999"
+
+
+def test_ricaricamento_mantiene_il_backend_mmap(directory_dati):
+    tabella = usa_tabella_mmap(directory_dati)
+    registro = RegistroTabelle(directory_dati)
+    assert tabella_codici_catastali() is tabella
+    _aggiungi_riga(directory_dati, RIGA_NUOVO_COMUNE)
+    assert registro.controlla()["comuni"].aggiunte == {"COMUNE DI PROVA": "X999"}
+    nuova_tabella = tabella_codici_catastali()
+    assert isinstance(nuova_tabella, TabellaCodiciCatastaliMmap) and nuova_tabella is not tabella
+    assert nuova_tabella.indice_storico is not None
+    assert tabella.codice_catastale("COMUNE DI PROVA") is None  # la mappatura precedente resta valida
+    assert codifica_comune("Comune di prova", "01/01/2010") == "X999"
+    assert registro.controlla() is None
+
+
+def test_errore_di_lettura_mantiene_la_tabella(directory_dati):
+    registro = RegistroTabelle(directory_dati)
+    tabella = tabella_codici_catastali()
+    os.remove(os.path.join(directory_dati, FILE_STATI))
+    assert registro.controlla() is None
+    assert tabella_codici_catastali() is tabella
+    assert registro.metriche()["errori"] == 1 and "FileNotFoundError" in registro.metriche()["ultimo_errore"]
+
+
+def test_lettori_concorrenti_durante_il_ricaricamento(directory_dati):
+    registro = RegistroTabelle(directory_dati)
+    registro.avvia(intervallo=0.01)
+    letture_errate = []
+    fine = threading.Event()
+
+    def leggi():
+        while not fine.wait(0.0001):
+            tabella = tabella_codici_catastali()
+            if tabella.codice_catastale("ROMA") != "H501" or len(tabella.comuni_e_stati) < 8000:
+                letture_errate.append(tabella)
+
+    lettori = [threading.Thread(target=leggi) for _ in range(2)]
+    for lettore in lettori:
+        lettore.start()
+    _aggiungi_riga(directory_dati, RIGA_NUOVO_COMUNE)
+    try:
+        for _ in range(500):
+            if tabella_codici_catastali().codice_catastale("COMUNE DI PROVA") == "X999":
+                break
+            threading.Event().wait(0.01)
+    finally:
+        fine.set()
+        registro.ferma()
+        for lettore in lettori:
+            lettore.join()
+    assert tabella_codici_catastali().codice_catastale("COMUNE DI PROVA") == "X999"
+    assert letture_errate == []
@@ -0,0 +1,56 @@
+import pytest
+from source.ricerca_comuni import IndiceComuni, indice_comuni, suggerisci_comuni
+
+DENOMINAZIONI = ["REGGIO NELL'EMILIA", "REGGIO DI CALABRIA", "REGGIOLO", "ROMA", "CANTU'", "SAN GIOVANNI ROTONDO",
+                 "SAN GIOVANNI LUPATOTO", "SANT'ELENA", "FRANCIA"]
+
+
+@pytest.fixture(scope="module")
+def indice():
+    return IndiceComuni(DENOMINAZIONI)
+
+
+#################################
+# TEST PER RICERCA PER PREFISSO #
+#################################
+@pytest.mark.parametrize("testo, expected", [
+    ("reggio", ["REGGIO DI CALABRIA", "REGGIOLO", "REGGIO NELL'EMILIA"]),  # ordine delle chiavi senza spazi
+    ("Reggio nell", ["REGGIO NELL'EMILIA"]),
+    ("cantù", ["CANTU'"]),           # accenti e apostrofi ignorati
+    ("sant e", ["SANT'ELENA"]),
+    ("", []),
+    ("milano", []),
+])
+def test_cerca_prefisso(indice, testo, expected):
+    assert indice.cerca_prefisso(testo) == expected
+
+
+def test_cerca_prefisso_limite(indice):
+    assert indice.cerca_prefisso("r", limite=2) == ["REGGIO DI CALABRIA", "REGGIOLO"]
+
+
+####################################
+# TEST PER RICERCA PER SOMIGLIANZA #
+####################################
+@pytest.mark.parametrize("testo, expected", [
+    ("regio emilia", "REGGIO NELL'EMILIA"),
+    ("san giovani rotondo", "SAN GIOVANNI ROTONDO"),
+    ("frncia", "FRANCIA"),
+])
+def test_cerca_simili(indice, testo, expected):
+    assert indice.cerca_simili(testo)[0] == expected
+
+
+def test_cerca_simili_soglia(indice):
+    assert indice.cerca_simili("xyz") == []
+
+
+def test_suggerisci_prefissi_prima_dei_simili(indice):
+    suggerimenti = indice.suggerisci("reggio emilia", limite=3)
+    assert suggerimenti[0] == "REGGIO NELL'EMILIA" and len(suggerimenti) == len(set(suggerimenti))
+
+
+def test_suggerisci_comuni_tabella_corrente():
+    assert indice_comuni() is indice_comuni()
+    assert suggerisci_comuni("l aquila")[0] == "L'AQUILA"
+    assert "MILANO" in suggerisci_comuni("milan")
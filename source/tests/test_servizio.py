@@ -0,0 +1,148 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from source.servizio import RaggruppatoreRichieste, ServizioCodiceFiscale
+
+ANAGRAFICA = {"cognome": "Rossi", "nome": "Mario", "sesso": "M", "data_nascita": "01/01/1985", "comune": "Roma"}
+
+
+async def _richiesta(porta, metodo, percorso, corpo=None, intestazioni=""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", porta)
+    dati = b"" if corpo is None else (corpo if isinstance(corpo, bytes) else json.dumps(corpo).encode())
+    writer.write(f"{metodo} {percorso} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(dati)}\r\n"
+                 f"Connection: close\r\n{intestazioni}\r\n".encode() + dati)
+    risposta = await reader.read()
+    writer.close()
+    testa, _, corpo_risposta = risposta.partition(b"\r\n\r\n")
+    return int(testa.split()[1]), json.loads(corpo_risposta), testa.decode()
+
+
+def _con_servizio(test, **opzioni):
+    async def esegui():
+        servizio = ServizioCodiceFiscale(porta=0, **opzioni)
+        await servizio.avvia()
+        try:
+            return await test(servizio)
+        finally:
+            await servizio.chiudi()
+    return asyncio.run(esegui())
+
+
+#####################################
+# TEST PER RAGGRUPPAMENTO RICHIESTE #
+#####################################
+def test_raggruppatore_riunisce_richieste_concorrenti():
+    lotti = []
+
+    def raddoppia(valori):
+        lotti.append(list(valori))
+        return [valore * 2 for valore in valori]
+
+    async def esegui():
+        raggruppatore = RaggruppatoreRichieste(raddoppia, None, finestra=0.01, dimensione_massima=4)
+        return await asyncio.gather(*(raggruppatore.elabora(i) for i in range(6)))
+
+    assert asyncio.run(esegui()) == [0, 2, 4, 6, 8, 10]
+    assert lotti == [[0, 1, 2, 3], [4, 5]]
+
+
+def test_raggruppatore_propaga_eccezioni():
+    def fallisce(valori):
+        raise RuntimeError("errore del lotto")
+
+    async def esegui():
+        raggruppatore = RaggruppatoreRichieste(fallisce, None, finestra=0.001)
+        return await asyncio.gather(raggruppatore.elabora(1), return_exceptions=True)
+
+    assert isinstance(asyncio.run(esegui())[0], RuntimeError)
+
+
+##########################
+# TEST PER SERVIZIO HTTP #
+##########################
+def test_genera_e_valida():
+    async def test(servizio):
+        return await asyncio.gather(
+            _richiesta(servizio.porta, "POST", "/genera", ANAGRAFICA),
+            _richiesta(servizio.porta, "POST", "/genera", dict(ANAGRAFICA, comune="Atlantide")),
+            _richiesta(servizio.porta, "POST", "/valida", {"codice_fiscale": "rssmra85a01h501z"}),
+            _richiesta(servizio.porta, "POST", "/valida", {"codice_fiscale": "RSSMRA85A01H501A"}),
+        )
+
+    genera, genera_errore, valido, non_valido = _con_servizio(test)
+    assert genera[:2] == (200, {"codice_fiscale": "RSSMRA85A01H501Z"})
+    assert genera_errore[0] == 422 and genera_errore[1]["campo"] == "comune"
+    assert valido[:2] == (200, {"valido": True, "codice_fiscale": "RSSMRA85A01H501Z"})
+    assert non_valido[1] == {"valido": False,
+                             "errore": "Codice fiscale non valido. Il carattere di controllo non corrisponde."}
+
+
+def test_richieste_non_valide():
+    async def test(servizio):
+        return [risposta[0] for risposta in await asyncio.gather(
+            _richiesta(servizio.porta, "POST", "/genera", b"{non json"),
+            _richiesta(servizio.porta, "POST", "/genera", [ANAGRAFICA]),
+            _richiesta(servizio.porta, "GET", "/genera"),
+            _richiesta(servizio.porta, "GET", "/inesistente"),
+            _richiesta(servizio.porta, "POST", "/valida", b"x" * 70000),
+        )]
+
+    assert _con_servizio(test) == [400, 400, 405, 404, 413]
+
+
+def test_salute_e_backpressure():
+    async def test(servizio):
+        risposte = await asyncio.gather(*(_richiesta(servizio.porta, "POST", "/genera", ANAGRAFICA)
+                                          for _ in range(8)))
+        return risposte, await _richiesta(servizio.porta, "GET", "/salute")
+
+    risposte, salute = _con_servizio(test, limite_richieste=2, finestra=0.05)
+    stati = sorted(stato for stato, _, _ in risposte)
+    assert stati.count(200) == 2 and stati.count(503) == 6
+    assert all("Retry-After: 1" in testa for stato, _, testa in risposte if stato == 503)
+    assert salute[0] == 200
+    assert salute[1]["stato"] == "ok" and salute[1]["rifiutate"] == 6 and salute[1]["lotti"] == 1
+
+
+def test_connessione_persistente():
+    async def test(servizio):
+        reader, writer = await asyncio.open_connection("127.0.0.1", servizio.porta)
+        stati = []
+        for _ in range(3):
+            writer.write(b"GET /salute HTTP/1.1\r\nHost: test\r\n\r\n")
+            testa = await reader.readuntil(b"\r\n\r\n")
+            lunghezza = int(next(riga for riga in testa.split(b"\r\n") if riga.startswith(b"Content-Length"))
+                            .split(b":")[1])
+            await reader.readexactly(lunghezza)
+            stati.append(int(testa.split()[1]))
+        writer.close()
+        return stati
+
+    assert _con_servizio(test) == [200, 200, 200]
+
+
+def test_errore_inatteso_restituisce_500():
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.shutdown()  # run_in_executor solleva RuntimeError
+
+    async def test(servizio):
+        risposte = await asyncio.wait_for(asyncio.gather(
+            _richiesta(servizio.porta, "POST", "/genera", ANAGRAFICA),
+            _richiesta(servizio.porta, "POST", "/valida", {"codice_fiscale": "RSSMRA85A01H501Z"}),
+        ), timeout=5)
+        return risposte, servizio.salute()
+
+    risposte, salute = _con_servizio(test, executor=executor)
+    assert [risposta[:2] for risposta in risposte] == [(500, {"errore": "Errore interno del servizio."})] * 2
+    assert salute["in_corso"] == 0
+
+
+def test_connessione_inattiva_chiusa_dopo_il_timeout():
+    async def test(servizio):
+        reader, writer = await asyncio.open_connection("127.0.0.1", servizio.porta)
+        writer.write(b"POST /genera HTTP/1.1\r\n")  # richiesta mai completata
+        dati = await asyncio.wait_for(reader.read(), timeout=5)
+        writer.close()
+        return dati
+
+    assert _con_servizio(test, timeout_lettura=0.05) == b""
@@ -0,0 +1,93 @@
+from datetime import date
+import pytest
+from source.batch import genera_codici_fiscali
+from source.codice_fiscale import (ErroreComuneAmbiguo, codifica_comune, decodifica_codice_fiscale, genera_codice_fiscale,
+                                   is_valido_codice_fiscale)
+from source.storico_comuni import carica_indice_storico_comuni, indice_storico_comuni
+from source.tabelle import FILE_COMUNI
+
+CSV_COMUNI = (
+    "Codice Catastale;Sigla Provincia;Denominazione Italiana;Data Costituzione;Data Cessazione\n"
+    "A001;AA;VECCHIO;01/01/1900;01/01/1950\n"
+    "A002;AA;NUOVO;01/01/1950;\n"
+    "A003;AA;VECCHIO;01/01/1950;\n"
+    "B001;BB;OMONIMO;17/03/1861;\n"
+    "B002;CC;OMONIMO;01/01/1970;\n"
+)
+
+
+@pytest.fixture
+def indice(tmp_path):
+    (tmp_path / FILE_COMUNI).write_text(CSV_COMUNI, encoding="latin1")
+    return carica_indice_storico_comuni(str(tmp_path))
+
+
+##################################
+# TEST PER INDICE STORICO COMUNI #
+##################################
+@pytest.mark.parametrize("denominazione, data_nascita, expected", [
+    ("VECCHIO", date(1920, 5, 1), "A001"),
+    ("VECCHIO", date(1949, 12, 31), "A001"),
+    ("VECCHIO", date(1950, 1, 1), "A003"),   # la cessazione è esclusa
+    ("VECCHIO", None, "A003"),
+    ("NUOVO", date(1920, 5, 1), "A002"),      # nascita precedente alla costituzione: codice più recente
+    ("OMONIMO", date(1960, 1, 1), "B001"),
+    ("OMONIMO", date(1980, 1, 1), "B002"),
+    ("INESISTENTE", date(1980, 1, 1), None),
+])
+def test_codice_catastale_alla_data(indice, denominazione, data_nascita, expected):
+    assert indice.codice_catastale(denominazione, data_nascita) == expected
+
+
+def test_collisioni(indice):
+    collisioni = indice.collisioni()
+    assert list(collisioni) == ["OMONIMO"]
+    assert [periodo.codice_catastale for periodo in collisioni["OMONIMO"]] == ["B001", "B002"]
+
+
+######################################
+# TEST PER CODIFICA COMUNE ALLA DATA #
+######################################
+def test_codifica_comune_alla_data():
+    assert codifica_comune("Castro", "01/01/1970") == "C337"  # prima del 1975 esiste solo CASTRO (BG)
+    assert codifica_comune("Castro", date(1980, 1, 1), "BG") == "C337"
+    assert codifica_comune("Castro", date(1980, 1, 1), " le ") == "M261"
+    assert codifica_comune("Castro", provincia="LE") == "M261"
+    assert codifica_comune("Palau", date(1980, 1, 1)) == "Z734"  # gli stati prevalgono sui comuni omonimi
+    assert genera_codice_fiscale("Rossi", "Mario", "M", "01/01/1970", "Castro")[11:15] == "C337"
+    assert list(genera_codici_fiscali([("Rossi", "Mario", "M", "01/01/1970", "Castro")]))[0][11:15] == "C337"
+    assert "CASTRO" in indice_storico_comuni().collisioni()
+
+
+@pytest.mark.parametrize("comune, data_nascita", [("Castro", None), ("Castro", date(1980, 1, 1)),
+                                                  ("Livo", None), ("Samone", "01/01/1990")])
+def test_codifica_comune_ambiguo(comune, data_nascita):
+    with pytest.raises(ErroreComuneAmbiguo) as errore:
+        codifica_comune(comune, data_nascita)
+    assert errore.value.comune == comune.upper()
+    assert len(errore.value.province) == 2
+
+
+def test_codifica_comune_provincia_non_corrispondente():
+    with pytest.raises(ValueError, match="provincia MI"):
+        codifica_comune("Castro", date(1980, 1, 1), "MI")
+    assert codifica_comune("Roma", provincia="RM") == "H501"
+
+
+def test_genera_comune_ambiguo_con_provincia():
+    assert genera_codice_fiscale("Rossi", "Mario", "M", "01/01/1980", "Castro", provincia="LE")[11:15] == "M261"
+    risultati = list(genera_codici_fiscali([("Rossi", "Mario", "M", "01/01/1980", "Castro"),
+                                            ("Rossi", "Mario", "M", "01/01/1980", "Castro", "BG"),
+                                            {"cognome": "Rossi", "nome": "Mario", "sesso": "M",
+                                             "data_nascita": "01/01/1980", "comune": "Castro", "provincia": "LE"}]))
+    assert risultati[0].campo == "comune" and risultati[0].messaggio.startswith("Comune ambiguo")
+    assert [risultato[11:15] for risultato in risultati[1:]] == ["C337", "M261"]
+
+
+def test_codice_storico_riconosciuto_in_validazione():
+    # "SAN TEODORO" ha due codici validi (ME e SS): la tabella corrente ne conserva uno solo
+    codice_fiscale = genera_codice_fiscale("Martini", "Stefano", "M", "02/06/1948", "San Teodoro")
+    assert codice_fiscale[11:15] == "I328"
+    assert is_valido_codice_fiscale(codice_fiscale)
+    assert decodifica_codice_fiscale(codice_fiscale).luogo_nascita == "SAN TEODORO"
+    assert indice_storico_comuni().denominazione("I328") == "SAN TEODORO"
@@ -0,0 +1,97 @@
+import json
+import random
+import string
+import pytest
+from source import strumentazione
+from source.benchmarks.dati import genera_codici_fiscali_sintetici
+from source.batch import genera_codici_fiscali
+from source.codice_fiscale import _codice_errore_strumentato, codice_errore_codice_fiscale, genera_codice_fiscale, \
+    is_valido_codice_fiscale, varianti_omocodiche
+
+
+@pytest.fixture
+def strumentazione_attiva():
+    strumentazione.azzera_strumentazione()
+    strumentazione.attiva_strumentazione()
+    yield
+    strumentazione.disattiva_strumentazione()
+    strumentazione.azzera_strumentazione()
+
+
+def test_disattivata_non_registra():
+    strumentazione.azzera_strumentazione()
+    genera_codice_fiscale("Rossi", "Mario", "M", "01/01/1985", "Roma")
+    assert strumentazione.istantanea()["fasi"] == {}
+
+
+def test_fasi_ed_errori_di_generazione(strumentazione_attiva):
+    assert genera_codice_fiscale("Rossi", "Mario", "M", "01/01/1985", "Roma") == "RSSMRA85A01H501Z"
+    with pytest.raises(ValueError):
+        genera_codice_fiscale("Rossi", "Mario", "M", "01/01/1985", "Gotham")
+    dati = strumentazione.istantanea()
+    fasi = dati["fasi"]["genera"]
+    assert fasi["totale"]["chiamate"] == 2
+    assert fasi["comune"]["chiamate"] == 2
+    assert fasi["carattere_controllo"]["chiamate"] == 1
+    assert set(fasi) >= {"cognome", "nome", "sesso", "data_nascita", "codifica_data"}
+    assert dati["errori"] == {"genera": {"comune": 1}}
+    assert {"codifica_cognome", "codifica_nome"} <= set(dati["cache"])
+
+
+def test_errori_di_validazione_per_causa(strumentazione_attiva):
+    for codice in ("RSSMRA85A01H501Z", "RSSMRA85A01H501A", "RSS", "RSSMRA85A01H501Z"[:15] + "1"):
+        try:
+            is_valido_codice_fiscale(codice)
+        except ValueError:
+            pass
+    dati = strumentazione.istantanea()
+    assert dati["errori"]["valida"] == {"carattere_controllo": 2, "lunghezza": 1}
+    fasi = dati["fasi"]["valida"]
+    assert fasi["totale"]["chiamate"] == fasi["formato"]["chiamate"] == 4
+    # "RSS" si ferma al formato; gli altri arrivano fino al carattere di controllo
+    assert fasi["data"]["chiamate"] == fasi["comune"]["chiamate"] == fasi["carattere_controllo"]["chiamate"] == 3
+
+
+@pytest.mark.parametrize("codice_fiscale", [
+    "RSSMRA85A01H501Z", "rssmra85a01h501z", "RSSMRA85A01H50LZ", "RSSMRA85A01H501A", "RSS", "R55MRA85A01H501Z",
+    "RSSMRA8XA01H501Z", "RSSMRA85AX1H501Z", "RSSMRA85A72H501Z", "RSSMRA85A01Z000Z", "RSSMRA85A01H50Z",
+])
+def test_validazione_strumentata_come_passaggio_singolo(strumentazione_attiva, codice_fiscale):
+    assert _codice_errore_strumentato(codice_fiscale) == codice_errore_codice_fiscale(codice_fiscale)
+
+
+def test_validazione_strumentata_come_passaggio_singolo_su_codici_alterati(strumentazione_attiva):
+    generatore = random.Random(0)
+    codici = []
+    for codice in genera_codici_fiscali_sintetici(500, 0):
+        codici += [codice, generatore.choice(varianti_omocodiche(codice)), codice[:generatore.randrange(16)]]
+        posizione = generatore.randrange(16)
+        carattere = generatore.choice(string.ascii_letters + string.digits)
+        codici.append(codice[:posizione] + carattere + codice[posizione + 1:])
+    assert [_codice_errore_strumentato(codice) for codice in codici] == \
+        [codice_errore_codice_fiscale(codice) for codice in codici]
+
+
+def test_batch_strumentato_restituisce_errori_strutturati(strumentazione_attiva):
+    hit_iniziali = strumentazione.istantanea()["cache"]["codifica_cognome"]["hit"]
+    risultati = list(genera_codici_fiscali([("Zanzottera", "Mario", "M", "01/01/1985", "Roma"),
+                                            ("Zanzottera", "Mario", "M", "31/02/1985", "Roma"),
+                                            ("Zanzottera", "Mario", "M", "01/01/1985", "Gotham"),
+                                            ("Zanzottera", "Mario")]))
+    assert risultati[0] == "ZNZMRA85A01H501U"
+    assert risultati[1].campo == "data_nascita" and risultati[1].messaggio.startswith("Data di nascita non valida")
+    assert risultati[2].campo == "comune"
+    assert risultati[3].campo == "anagrafica"
+    dati = strumentazione.istantanea()
+    assert dati["errori"] == {"genera": {"data_nascita": 1, "comune": 1}}
+    # Le righe non valide non vengono ricalcolate sul percorso non strumentato
+    assert dati["cache"]["codifica_cognome"]["hit"] - hit_iniziali == 2
+
+
+def test_esportazioni(strumentazione_attiva):
+    genera_codice_fiscale("Rossi", "Mario", "M", "01/01/1985", "Roma")
+    assert json.loads(strumentazione.esporta_json())["fasi"]["genera"]["totale"]["chiamate"] == 1
+    testo = strumentazione.esporta_prometheus()
+    assert "# TYPE codicefiscale_fase_chiamate_total counter" in testo
+    assert 'codicefiscale_fase_chiamate_total{operazione="genera",fase="totale"} 1' in testo
+    assert 'codicefiscale_cache_hit_rate{cache="codifica_cognome"}' in testo
@@ -0,0 +1,50 @@
+from datetime import date, timedelta
+import pytest
+from source.batch import decodifica_codici_fiscali, genera_codici_fiscali
+from source.codice_fiscale import _decodifica_data_nascita, codifica_data_nascita, genera_codice_fiscale
+from source.tabella_date import TabellaSegmentiData, tabella_segmenti_data
+
+
+@pytest.fixture(scope="module")
+def tabella():
+    return TabellaSegmentiData(2030)
+
+
+##################################
+# TEST PER TABELLA SEGMENTI DATA #
+##################################
+def test_segmento_uguale_alla_codifica(tabella):
+    oggi = date(2031, 1, 1)
+    giorno = date(1900, 1, 1)
+    while giorno <= tabella.data_finale:
+        for sesso in ("M", "F"):
+            assert tabella.segmento(giorno, sesso) == codifica_data_nascita(giorno, sesso, oggi), giorno
+        giorno += timedelta(days=1)
+    assert tabella.segmento(date(2031, 1, 1), "M") is None
+
+
+@pytest.mark.parametrize("oggi", [date(1999, 12, 31), date(2005, 1, 1), date(2030, 12, 31)])
+def test_data_nascita_uguale_alla_decodifica(tabella, oggi):
+    for segmento in set(tabella.segmenti_maschili) | set(tabella.segmenti_femminili):
+        try:
+            atteso = _decodifica_data_nascita(segmento, oggi)
+        except ValueError:
+            atteso = None
+        assert tabella.data_nascita(segmento, oggi) == atteso, segmento
+
+
+def test_date_candidate(tabella):
+    assert tabella.date_candidate("05A41") == (date(1905, 1, 1), date(2005, 1, 1))
+    assert tabella.date_candidate("00B29") == (date(2000, 2, 29),)
+    assert tabella.date_candidate("00B30") == ()
+    assert tabella.data_nascita("05A01", date(2031, 1, 1)) is None  # oltre la fine della tabella
+
+
+def test_funzioni_massive_usano_tabella_corrente():
+    assert tabella_segmenti_data() is tabella_segmenti_data()
+    assert tabella_segmenti_data().data_finale == date(date.today().year, 12, 31)
+    anagrafica = ("Bianchi", "Anna", "F", "29/02/2000", "Milano")
+    codici = list(genera_codici_fiscali([anagrafica]))
+    assert codici == [genera_codice_fiscale(*anagrafica)]
+    blocco = next(decodifica_codici_fiscali(codici))
+    assert (blocco["anno"][0], blocco["mese"][0], blocco["giorno"][0], blocco["sesso"]) == (2000, 2, 29, b"F")
@@ -0,0 +1,84 @@
+import os
+import pickle
+import shutil
+import pytest
+from source import tabelle
+from source.codice_fiscale import codifica_comune, is_valido_codice_fiscale, valida_comune
+from source.tabella_mmap import FILE_TABELLA_MMAP, TabellaCodiciCatastaliMmap, apri_tabella_mmap, \
+    compila_tabella_mmap, usa_tabella_mmap
+from source.tabelle import DIRECTORY_DATI, FILE_COMUNI, FILE_STATI, TabellaCodiciCatastali, carica_tabelle
+
+
+@pytest.fixture(scope="module")
+def tabelle_confronto(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("dati")
+    for nome_file in (FILE_COMUNI, FILE_STATI):
+        shutil.copy(os.path.join(DIRECTORY_DATI, nome_file), directory)
+    tabella_mmap = TabellaCodiciCatastaliMmap(compila_tabella_mmap(str(directory)))
+    return tabella_mmap, TabellaCodiciCatastali(*carica_tabelle(usa_snapshot=False))
+
+
+@pytest.fixture
+def backend_mmap(tmp_path):
+    for nome_file in (FILE_COMUNI, FILE_STATI):
+        shutil.copy(os.path.join(DIRECTORY_DATI, nome_file), tmp_path)
+    tabella_precedente = tabelle.tabella_codici_catastali()
+    yield usa_tabella_mmap(str(tmp_path))
+    tabelle.imposta_tabella_codici_catastali(tabella_precedente)
+
+
+########################################
+# TEST PER RICERCHE SULLA TABELLA MMAP #
+########################################
+def test_ricerca_per_denominazione_equivalente(tabelle_confronto):
+    tabella_mmap, tabella_dict = tabelle_confronto
+    for denominazione in tabella_dict.comuni_e_stati:
+        assert tabella_mmap.codice_catastale(denominazione) == tabella_dict.codice_catastale(denominazione)
+
+
+def test_ricerca_per_codice_equivalente(tabelle_confronto):
+    tabella_mmap, tabella_dict = tabelle_confronto
+    for codice_catastale in tabella_dict.denominazioni_per_codice:
+        assert tabella_mmap.denominazione(codice_catastale) == tabella_dict.denominazione(codice_catastale)
+
+
+@pytest.mark.parametrize("chiave", ["ATLANTIDE", "", "A" * 100, "ZZZZZZZZZ"])
+def test_ricerca_denominazione_assente(tabelle_confronto, chiave):
+    assert tabelle_confronto[0].codice_catastale(chiave) is None
+
+
+@pytest.mark.parametrize("chiave", ["X501", "n.d.", "", "A0", "Z99999"])
+def test_ricerca_codice_assente(tabelle_confronto, chiave):
+    assert tabelle_confronto[0].denominazione(chiave) is None
+
+
+def test_tabelle_complete_equivalenti(tabelle_confronto):
+    tabella_mmap, tabella_dict = tabelle_confronto
+    assert tabella_mmap.comuni == tabella_dict.comuni
+    assert tabella_mmap.stati == tabella_dict.stati
+    assert tabella_mmap.denominazioni_per_codice == tabella_dict.denominazioni_per_codice
+
+
+def test_serializzazione_riapre_il_file(tabelle_confronto):
+    tabella_mmap = pickle.loads(pickle.dumps(tabelle_confronto[0]))
+    assert tabella_mmap.codice_catastale("ROMA") == "H501"
+
+
+###################################
+# TEST PER BACKEND DELLE RICERCHE #
+###################################
+def test_backend_mmap_usato_dalle_funzioni_di_codifica(backend_mmap):
+    assert tabelle.tabella_codici_catastali() is backend_mmap
+    assert valida_comune("Milano") == "MILANO"
+    assert codifica_comune("Roma") == "H501"
+    assert is_valido_codice_fiscale("RSSMRA85A01H501Z") is True
+
+
+def test_file_non_aggiornato_viene_ricompilato(tmp_path):
+    for nome_file in (FILE_COMUNI, FILE_STATI):
+        shutil.copy(os.path.join(DIRECTORY_DATI, nome_file), tmp_path)
+    compila_tabella_mmap(str(tmp_path))
+    with open(tmp_path / FILE_COMUNI, "a", encoding="latin1") as file:
+        file.write("Z999;XX;COMUNE DI PROVA;;;;;;;01/01/2000;;\n")
+    assert apri_tabella_mmap(str(tmp_path)).codice_catastale("COMUNE DI PROVA") == "Z999"
+    assert os.path.exists(tmp_path / FILE_TABELLA_MMAP)
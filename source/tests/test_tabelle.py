@@ -0,0 +1,78 @@
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from source import codice_fiscale
+from source.tabelle import DIRECTORY_DATI, FILE_COMUNI, FILE_STATI, _carica_da_csv, _carica_da_csv_con_periodi, \
+    _carica_da_snapshot, carica_periodi_comuni, carica_tabelle, compila_snapshot, tabella_codici_catastali
+
+
+@pytest.fixture
+def directory_dati(tmp_path):
+    for nome_file in (FILE_COMUNI, FILE_STATI):
+        shutil.copy(os.path.join(DIRECTORY_DATI, nome_file), tmp_path)
+    return str(tmp_path)
+
+
+###################################
+# TEST PER SNAPSHOT DELLE TABELLE #
+###################################
+def test_snapshot_equivalente_ai_csv(directory_dati):
+    compila_snapshot(directory_dati)
+    assert _carica_da_snapshot(directory_dati) == carica_tabelle(directory_dati, usa_snapshot=False)
+
+
+def test_lettura_unica_dei_comuni_equivalente_ai_csv():
+    comuni, stati, periodi = _carica_da_csv_con_periodi(DIRECTORY_DATI)
+    comuni_csv, stati_csv = _carica_da_csv(DIRECTORY_DATI)
+    assert list(comuni.items()) == list(comuni_csv.items()) and stati == stati_csv
+    assert periodi == carica_periodi_comuni(DIRECTORY_DATI, usa_snapshot=False)
+
+
+def test_snapshot_assente(directory_dati):
+    assert _carica_da_snapshot(directory_dati) is None
+    comuni, stati = carica_tabelle(directory_dati)
+    assert comuni["ROMA"] == "H501" and stati["ALBANIA"] == "Z100"
+
+
+def test_snapshot_valido_dopo_cambio_data_modifica(directory_dati):
+    compila_snapshot(directory_dati)
+    os.utime(os.path.join(directory_dati, FILE_COMUNI), ns=(0, 0))
+    assert _carica_da_snapshot(directory_dati) is not None
+
+
+def test_snapshot_non_aggiornato_ricade_sul_csv(directory_dati):
+    compila_snapshot(directory_dati)
+    percorso_comuni = os.path.join(directory_dati, FILE_COMUNI)
+    with open(percorso_comuni, "a", encoding="latin1") as file:
+        file.write("Z999;XX;COMUNE DI PROVA;;;;;;;01/01/2000;;\n")
+    assert _carica_da_snapshot(directory_dati) is None
+    comuni, _ = carica_tabelle(directory_dati)
+    assert comuni["COMUNE DI PROVA"] == "Z999"
+
+
+###########################################
+# TEST PER CARICAMENTO LAZY DELLE TABELLE #
+###########################################
+def test_import_non_carica_le_tabelle():
+    codice = ("import source.codice_fiscale as cf, source.tabelle as t; "
+              "cf.calcola_carattere_controllo('RSSMRA85A01H501'); assert t._tabella_corrente is None; "
+              "assert cf.COMUNI_E_STATI_COD_CATASTALI['ROMA'] == 'H501'; assert t._tabella_corrente is not None")
+    directory_progetto = os.path.dirname(os.path.dirname(DIRECTORY_DATI))
+    subprocess.run([sys.executable, "-c", codice], cwd=directory_progetto, check=True)
+
+
+def test_tabella_caricata_una_sola_volta_con_piu_thread():
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        tabelle = list(executor.map(lambda _: tabella_codici_catastali(), range(32)))
+    assert all(tabella is tabelle[0] for tabella in tabelle)
+
+
+def test_costanti_del_modulo_compatibili():
+    assert codice_fiscale.COMUNI_E_STATI_COD_CATASTALI == (codice_fiscale.COMUNI_COD_CATASTALI
+                                                           | codice_fiscale.STATI_COD_CATASTALI)
+    assert codice_fiscale.CODICI_CATASTALI_DENOMINAZIONI["H501"] == "ROMA"
+    with pytest.raises(AttributeError):
+        codice_fiscale.TABELLA_INESISTENTE
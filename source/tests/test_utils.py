@@ -0,0 +1,34 @@
+import random
+import pytest
+from source.utils import _formatta_stringa, _rimuovi_accenti, _rimuovi_accenti_nfd
+
+
+##############################
+# TEST PER RIMOZIONE ACCENTI #
+##############################
+@pytest.mark.parametrize("stringa, expected", [
+    ("Rossi", "Rossi"),
+    ("Niccolò", "Niccolo"),
+    ("D'ÀLÌ", "D'ALI"),
+    ("Ćosić", "Cosic"),
+    ("e\u0301", "e"),  # accento combinante già decomposto
+    ("Ǻ", "A"),         # lettera con più accenti
+    ("Ærø", "Ærø"),     # lettere senza decomposizione
+])
+def test_rimuovi_accenti(stringa, expected):
+    assert _rimuovi_accenti(stringa) == expected
+
+
+def test_rimuovi_accenti_uguale_a_decomposizione_unicode():
+    caratteri = [chr(codice) for codice in range(0x3000) if not 0xD800 <= codice < 0xE000]
+    for carattere in caratteri:
+        assert _rimuovi_accenti(carattere) == _rimuovi_accenti_nfd(carattere), hex(ord(carattere))
+    generatore = random.Random(0)
+    alfabeto = "aeiouAEIOU 'àèéìòùÀÈÉÌÒÙçÇñÑäöüßøǽ̈ǺḉẞΩ"
+    for _ in range(2000):
+        stringa = ''.join(generatore.choices(alfabeto, k=generatore.randint(0, 12)))
+        assert _rimuovi_accenti(stringa) == _rimuovi_accenti_nfd(stringa), stringa
+
+
+def test_formatta_stringa():
+    assert _formatta_stringa("De Sanctìs") == "DESANCTIS"
@@ -0,0 +1,105 @@
+import random
+import string
+import pytest
+from source import vettoriale
+from source.benchmarks.dati import genera_codici_fiscali_sintetici
+from source.codice_fiscale import CODICE_FISCALE_VALIDO, ERRORE_CARATTERE_CONTROLLO, MESSAGGI_ERRORE_CODICE_FISCALE, \
+    calcola_carattere_controllo, is_valido_codice_fiscale, varianti_omocodiche
+from source.vettoriale import calcola_caratteri_controllo, valida_codici_fiscali_array
+
+PREFISSI = ["RSSMRA85M01H501", "MRTMTT25D09F205", "BLTTLR98S20F205", "GRGMRA85M10L219"]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(vettoriale, "np", None)
+    return request.param
+
+
+###################################################
+# TEST PER CALCOLO VETTORIALE CARATTERE CONTROLLO #
+###################################################
+def test_calcola_caratteri_controllo(backend):
+    assert calcola_caratteri_controllo(PREFISSI) == "QZCT"
+    assert calcola_caratteri_controllo([]) == ""
+
+
+def test_calcola_caratteri_controllo_array_numpy():
+    np = pytest.importorskip("numpy")
+    prefissi = np.array([prefisso.encode() for prefisso in PREFISSI * 100], dtype="S15")
+    assert calcola_caratteri_controllo(prefissi) == "".join(map(calcola_carattere_controllo, PREFISSI * 100))
+
+
+@pytest.mark.parametrize("prefisso", ["rssmra85m01h501", "RSSMRA85M01H5É1"])
+def test_calcola_caratteri_controllo_carattere_non_valido(backend, prefisso):
+    with pytest.raises(KeyError):
+        calcola_caratteri_controllo(PREFISSI + [prefisso])
+
+
+def test_calcola_caratteri_controllo_lunghezza_non_valida():
+    pytest.importorskip("numpy")
+    with pytest.raises(ValueError):
+        calcola_caratteri_controllo(PREFISSI + ["RSSMRA85M01H50"])
+
+
+##############################################
+# TEST PER VALIDAZIONE VETTORIALE DEI CODICI #
+##############################################
+def _codice_errore_scalare(codice_fiscale):
+    try:
+        is_valido_codice_fiscale(codice_fiscale)
+    except ValueError as e:
+        return next(codice for codice, messaggio in MESSAGGI_ERRORE_CODICE_FISCALE.items() if messaggio == str(e))
+    return CODICE_FISCALE_VALIDO
+
+
+def _codici_alterati(numero, seme=0):
+    generatore = random.Random(seme)
+    alfabeto = string.ascii_letters + string.digits + " -!"
+    codici = []
+    for codice in genera_codici_fiscali_sintetici(numero, seme):
+        scelta = generatore.random()
+        if scelta < 0.6:
+            if generatore.random() < 0.3:
+                codice = generatore.choice(varianti_omocodiche(codice))
+            for _ in range(generatore.randint(1, 2)):
+                posizione = generatore.randrange(16)
+                codice = codice[:posizione] + generatore.choice(alfabeto) + codice[posizione + 1:]
+        elif scelta < 0.7:
+            codice = codice[:generatore.randrange(16)]
+        elif scelta < 0.8:
+            codice = codice.lower()
+        codici.append(codice)
+    return codici
+
+
+def test_valida_codici_fiscali_array_parita_con_validazione_scalare():
+    np = pytest.importorskip("numpy")
+    codici = _codici_alterati(3000) + ["RSSMRA85M00H501Z", "RSSMRA85M72H501Z", "RSSMRA85M71H501Z", ""]
+    codici += varianti_omocodiche("RSSMRA85A01H501Z") + ["RSSMRA85A01H5L1Z", "RSSMRA85AQVH501Z", "RSSMRA85ALLH501Z"]
+    maschera, codici_errore = valida_codici_fiscali_array(codici)
+    attesi = [_codice_errore_scalare(codice) for codice in codici]
+    assert codici_errore.tolist() == attesi
+    assert maschera.tolist() == [atteso == CODICE_FISCALE_VALIDO for atteso in attesi]
+    assert set(attesi) == set(range(CODICE_FISCALE_VALIDO, ERRORE_CARATTERE_CONTROLLO + 1))
+
+    array_bytes = np.array([codice.encode("ascii") for codice in codici], dtype="S16")
+    assert valida_codici_fiscali_array(array_bytes)[1].tolist() == attesi
+
+
+@pytest.mark.parametrize("codice", ["MRTSFN48H02I328M", "RSSMRA70A01C337B"])
+def test_valida_codici_fiscali_array_codici_catastali_storici_e_omonimi(codice):
+    pytest.importorskip("numpy")
+    assert _codice_errore_scalare(codice) == CODICE_FISCALE_VALIDO
+    maschera, codici_errore = valida_codici_fiscali_array([codice])
+    assert codici_errore.tolist() == [CODICE_FISCALE_VALIDO]
+    assert maschera.tolist() == [True]
+
+
+def test_valida_codici_fiscali_array_senza_numpy(monkeypatch):
+    monkeypatch.setattr(vettoriale, "np", None)
+    with pytest.raises(ImportError):
+        valida_codici_fiscali_array(["RSSMRA85A01H501Z"])
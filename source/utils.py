@@ -8,6 +8,13 @@ import unicodedata
 ############
 VOCALI = {'A', 'E', 'I', 'O', 'U'}
 CONSONANTI = {'B', 'C', 'D', 'F', 'G', 'H', 'J', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'X', 'Y', 'Z'}
+# Lettere accentate di Latin-1 e Latin Extended-A/B -> lettera senza accento, ricavate dalla decomposizione NFD
+TRADUZIONE_ACCENTI = {
+    codice: base for codice, base in (
+        (codice, ''.join(c for c in unicodedata.normalize('NFD', chr(codice)) if unicodedata.category(c) != 'Mn'))
+        for codice in range(0xC0, 0x250))
+    if base != chr(codice) and base.isascii()
+}
 
 
 ######################
@@ -54,6 +61,26 @@ def _formatta_stringa(stringa: str) -> str:
 
 
 def _rimuovi_accenti(stringa: str) -> str:
+    """Rimuove gli accenti da una stringa.
+
+    Le stringhe ASCII sono restituite senza modifiche e le lettere accentate più comuni sono
+    convertite con `TRADUZIONE_ACCENTI`; la decomposizione Unicode è usata solo per gli altri caratteri.
+
+    Args:
+        stringa (str): La stringa da cui rimuovere gli accenti.
+
+    Returns:
+        str: La stringa senza accenti.
+    """
+    if stringa.isascii():
+        return stringa
+    stringa = stringa.translate(TRADUZIONE_ACCENTI)
+    if stringa.isascii():
+        return stringa
+    return _rimuovi_accenti_nfd(stringa)
+
+
+def _rimuovi_accenti_nfd(stringa: str) -> str:
     """Rimuove gli accenti da una stringa usando la decomposizione Unicode.
 
     Args:
@@ -0,0 +1,197 @@
+from source.codice_fiscale import CODICE_FISCALE_VALIDO, ERRORE_ANNO, ERRORE_CARATTERE_CONTROLLO, \
+    ERRORE_CODICE_CATASTALE, ERRORE_COGNOME, ERRORE_GIORNO, ERRORE_LUNGHEZZA, ERRORE_MESE, ERRORE_NOME, \
+    LETTERE_OMOCODIA, POSIZIONI_OMOCODIA, \
+    TABELLA_VALORI_DISPARI, TABELLA_VALORI_PARI, VALORE_CARATTERE_NON_VALIDO, VAL_MODULO_CARATTERE_CONTROLLO, \
+    calcola_carattere_controllo
+from source.storico_comuni import indice_storico_comuni
+from source.tabelle import tabella_codici_catastali
+
+try:
+    import numpy as np
+except ImportError:  # numpy è una dipendenza opzionale
+    np = None
+
+
+############
+# COSTANTI #
+############
+LUNGHEZZA_PREFISSO = 15
+LUNGHEZZA_CODICE_FISCALE = 16
+# Un codice catastale (lettera + 3 cifre) è rappresentato dall'intero indice_lettera * 1000 + numero
+NUMERO_CODICI_CATASTALI_POSSIBILI = 26 * 1000
+
+_cache_codici_catastali = (None, None, None)
+LETTERE_CONTROLLO = b"ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+################################
+# CARATTERE DI CONTROLLO BATCH #
+################################
+def calcola_caratteri_controllo(prefissi):
+    """Calcola i caratteri di controllo di un intero blocco di codici senza carattere di controllo.
+
+    Con numpy disponibile il calcolo è vettoriale: i prefissi sono convertiti in una matrice di
+    byte (n x 15) e i valori di tutti i caratteri sono letti con un'unica indicizzazione nelle
+    tabelle a 256 elementi. Senza numpy si ricade su `calcola_carattere_controllo`.
+
+    Args:
+        prefissi (Sequence[str] | numpy.ndarray): Codici di 15 caratteri (stringhe, oppure array numpy 'S15'/'U15').
+
+    Returns:
+        str: Stringa in cui il carattere i-esimo è il carattere di controllo dell'i-esimo prefisso.
+
+    Raises:
+        KeyError: Se un prefisso contiene caratteri diversi da cifre e lettere maiuscole.
+        ValueError: Se, con numpy, un prefisso non è lungo 15 caratteri.
+    """
+    if np is None:
+        return "".join(map(calcola_carattere_controllo, prefissi))
+    try:
+        matrice = _matrice_byte(prefissi, LUNGHEZZA_PREFISSO)
+    except UnicodeEncodeError:
+        # Caratteri non ASCII: il calcolo per singolo codice solleva lo stesso errore della versione scalare
+        return "".join(map(calcola_carattere_controllo, prefissi))
+
+    valori_pari = _TABELLA_PARI_NP[matrice[:, 1::2]]
+    valori_dispari = _TABELLA_DISPARI_NP[matrice[:, ::2]]
+    if (valori_pari == VALORE_CARATTERE_NON_VALIDO).any() or (valori_dispari == VALORE_CARATTERE_NON_VALIDO).any():
+        # Il calcolo per singolo codice individua il carattere non valido e solleva l'errore
+        for riga in matrice:
+            calcola_carattere_controllo(riga.tobytes().decode("ascii"))
+    somme = valori_pari.sum(axis=1, dtype=np.uint16) + valori_dispari.sum(axis=1, dtype=np.uint16)
+    return _LETTERE_CONTROLLO_NP[somme % VAL_MODULO_CARATTERE_CONTROLLO].tobytes().decode("ascii")
+
+
+#####################################
+# VALIDAZIONE VETTORIALE DEI CODICI #
+#####################################
+def valida_codici_fiscali_array(codici_fiscali):
+    """Valida un intero array di codici fiscali con operazioni vettoriali numpy.
+
+    Esegue gli stessi controlli di `is_valido_codice_fiscale` (lunghezza, lettere e cifre nelle
+    rispettive posizioni, giorno tra 1 e 71, codice catastale esistente e carattere di controllo),
+    nello stesso ordine, e per ogni codice riporta il primo controllo fallito. Come nella versione
+    scalare, i codici omocodici sono accettati. I caratteri non ASCII sono considerati non validi
+    in qualsiasi posizione.
+
+    Args:
+        codici_fiscali (numpy.ndarray | Sequence[str]): Codici da validare, ad es. `np.array(..., dtype='S16')`.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: Maschera booleana dei codici validi e array uint8 dei codici di
+        errore (`CODICE_FISCALE_VALIDO` o una delle costanti `ERRORE_*` di `source.codice_fiscale`), da
+        convertire in messaggi con `MESSAGGI_ERRORE_CODICE_FISCALE`.
+
+    Raises:
+        ImportError: Se numpy non è installato.
+    """
+    if np is None:
+        raise ImportError("valida_codici_fiscali_array richiede numpy.")
+
+    array = codici_fiscali if isinstance(codici_fiscali, np.ndarray) else np.asarray(codici_fiscali, dtype=str)
+    array = array.reshape(-1)
+    if array.dtype.kind == "U":
+        lunghezze = np.char.str_len(array)
+        array = np.char.encode(array, "ascii", "replace")
+    elif array.dtype.kind == "S":
+        lunghezze = np.char.str_len(array)
+    else:
+        raise TypeError("I codici fiscali devono essere stringhe o bytes.")
+
+    matrice = np.zeros((len(array), LUNGHEZZA_CODICE_FISCALE), dtype=np.uint8)
+    if len(array) and array.dtype.itemsize:
+        colonne = min(array.dtype.itemsize, LUNGHEZZA_CODICE_FISCALE)
+        matrice[:, :colonne] = np.ascontiguousarray(array).view(np.uint8).reshape(len(array), -1)[:, :colonne]
+    # Normalizzazione in maiuscolo, come in is_valido_codice_fiscale
+    matrice -= ((matrice >= ord("a")) & (matrice <= ord("z"))).astype(np.uint8) * (ord("a") - ord("A"))
+
+    # Le lettere omocodiche delle posizioni numeriche tornano cifre; il carattere di controllo usa la matrice originale
+    matrice_base = matrice.copy()
+    matrice_base[:, POSIZIONI_OMOCODIA] = _TABELLA_OMOCODIA_NP[matrice[:, POSIZIONI_OMOCODIA]]
+
+    lettere = (matrice >= ord("A")) & (matrice <= ord("Z"))
+    cifre = (matrice_base >= ord("0")) & (matrice_base <= ord("9"))
+    valori = matrice_base.astype(np.int32)
+    giorni = (valori[:, 9] - ord("0")) * 10 + (valori[:, 10] - ord("0"))
+    catastale_ben_formato = lettere[:, 11] & cifre[:, 12:15].all(axis=1)
+    indici_catastali = np.where(catastale_ben_formato,
+                                (valori[:, 11] - ord("A")) * 1000 + (valori[:, 12] - ord("0")) * 100
+                                + (valori[:, 13] - ord("0")) * 10 + (valori[:, 14] - ord("0")), 0)
+    somme = (_TABELLA_PARI_NP[matrice[:, 1:15:2]].sum(axis=1, dtype=np.uint16)
+             + _TABELLA_DISPARI_NP[matrice[:, 0:15:2]].sum(axis=1, dtype=np.uint16))
+    caratteri_controllo = _LETTERE_CONTROLLO_NP[somme % VAL_MODULO_CARATTERE_CONTROLLO]
+
+    # np.select sceglie la prima condizione vera: l'ordine è quello dei controlli scalari
+    codici_errore = np.select(
+        [
+            lunghezze != LUNGHEZZA_CODICE_FISCALE,
+            ~lettere[:, 0:3].all(axis=1),
+            ~lettere[:, 3:6].all(axis=1),
+            ~cifre[:, 6:8].all(axis=1),
+            ~lettere[:, 8],
+            ~(cifre[:, 9:11].all(axis=1) & (giorni >= 1) & (giorni <= 71)),
+            ~(catastale_ben_formato & _codici_catastali_validi_np()[indici_catastali]),
+            caratteri_controllo != matrice[:, 15],
+        ],
+        [ERRORE_LUNGHEZZA, ERRORE_COGNOME, ERRORE_NOME, ERRORE_ANNO, ERRORE_MESE, ERRORE_GIORNO,
+         ERRORE_CODICE_CATASTALE, ERRORE_CARATTERE_CONTROLLO],
+        default=CODICE_FISCALE_VALIDO,
+    ).astype(np.uint8)
+    return codici_errore == CODICE_FISCALE_VALIDO, codici_errore
+
+
+def _codici_catastali_validi_np():
+    """Restituisce la tabella booleana dei codici catastali riconosciuti dalla validazione scalare.
+
+    Comprende i codici della tabella corrente e quelli dell'indice storico (periodi cessati e comuni
+    omonimi), ed è ricostruita se la tabella o l'indice correnti cambiano.
+    """
+    global _cache_codici_catastali
+    tabella = tabella_codici_catastali()
+    indice = indice_storico_comuni(tabella)
+    tabella_in_cache, indice_in_cache, validi = _cache_codici_catastali
+    if tabella_in_cache is not tabella or indice_in_cache is not indice:
+        validi = np.zeros(NUMERO_CODICI_CATASTALI_POSSIBILI, dtype=bool)
+        for codici in (tabella.denominazioni_per_codice, indice.codici_catastali()):
+            for codice in codici:
+                if len(codice) == 4 and "A" <= codice[0] <= "Z" and codice[1:].isdigit():
+                    validi[(ord(codice[0]) - ord("A")) * 1000 + int(codice[1:])] = True
+        _cache_codici_catastali = (tabella, indice, validi)
+    return validi
+
+
+def _matrice_byte(codici, lunghezza):
+    """Converte i codici in una matrice numpy di byte ASCII con una riga per codice.
+
+    Args:
+        codici (Sequence[str] | numpy.ndarray): Codici da convertire.
+        lunghezza (int): Lunghezza attesa di ciascun codice.
+
+    Returns:
+        numpy.ndarray: Matrice uint8 di forma (numero codici, lunghezza).
+
+    Raises:
+        ValueError: Se un codice non ha la lunghezza attesa.
+        UnicodeEncodeError: Se un codice contiene caratteri non ASCII.
+    """
+    array = codici if isinstance(codici, np.ndarray) else np.asarray(codici, dtype=str)
+    if array.size == 0:
+        return np.empty((0, lunghezza), dtype=np.uint8)
+    if array.dtype.kind == "U":
+        array = np.char.encode(array, "ascii")
+    if array.dtype.kind != "S" or array.dtype.itemsize != lunghezza:
+        raise ValueError(f"I codici devono essere lunghi {lunghezza} caratteri.")
+    matrice = np.ascontiguousarray(array).view(np.uint8).reshape(-1, lunghezza)
+    # Gli array 'S' completano con byte nulli i codici più corti
+    if not matrice[:, -1].all():
+        raise ValueError(f"I codici devono essere lunghi {lunghezza} caratteri.")
+    return matrice
+
+
+if np is not None:
+    _TABELLA_PARI_NP = np.frombuffer(TABELLA_VALORI_PARI, dtype=np.uint8)
+    _TABELLA_DISPARI_NP = np.frombuffer(TABELLA_VALORI_DISPARI, dtype=np.uint8)
+    _LETTERE_CONTROLLO_NP = np.frombuffer(LETTERE_CONTROLLO, dtype=np.uint8)
+    _TABELLA_OMOCODIA_NP = np.arange(256, dtype=np.uint8)
+    _TABELLA_OMOCODIA_NP[np.frombuffer(LETTERE_OMOCODIA.encode("ascii"), dtype=np.uint8)] = \
+        np.frombuffer(b"0123456789", dtype=np.uint8)